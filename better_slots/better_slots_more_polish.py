@@ -28,14 +28,16 @@ from tkinter import *
 import random
 import time
 
-# The number of rollers in the slot machine
-NUMBER_OF_ROLLERS = 5
-# Needs 5 colours
-ROLLER_COLOURS = ["cyan", "lime", "red", "yellow", "black"]
-# a list containing the values of each colours streak. Example:
-# ROLLER_COLOURS[0] streak would net the player 10 times their bet.
-# Also needs 5 multipliers to work
-WINNING_COLOURS = [10, 5, 3, 2, 0]
+from slot_engine import NUMBER_OF_ROLLERS, ROLLER_COLOURS, WINNING_COLOURS, \
+    SlotMachine
+
+# frames per second the roller animation aims for
+TARGET_FRAME_RATE = 60
+# seconds between two turns of the rollers in the spin animation
+ROLL_STEP_TIME = 0.0033
+# milliseconds the losing dialogue waits after getting caught tampering
+LOST_DIALOGUE_DELAY = 5000
+
 # all the dialogue in a neat dictionary so that it's not cluttering up the code
 DIALOGUE = {
     "GREETING": "Welcome to the most satisfying slot machine experience! \n\n"
@@ -69,123 +71,139 @@ DIALOGUE = {
 }
 
 
-class Roller:
+class AnimationScheduler:
     """
-    This class models a roller in a slot machine. It can be rotated, read,
-    and get stuck, in which case it can no longer be rotated.
-
-    "Nudging" the roller is also possible, being an "unofficial" (illegal) way
-    to turn the roller.
+    Runs animations from the Tk event loop with after() callbacks instead of
+    sleeping, so the window keeps answering input while they play.
+
+    An animation is a list of steps that are due one step_time apart. Each
+    frame applies every step that has come due and renders them once, and
+    the next frame is asked for at the next tick of the target frame rate.
+    If the display is too slow to keep up, frames are skipped and the next
+    frame catches up on more steps, so the animation still takes as long as
+    its steps.
     """
 
-    def __init__(self):
-        self.__roller_panels = []
-        self.__stuck = False
-        self.__nudged_up = 0
-        self.__nudged_down = 0
+    def __init__(self, root_window, frame_rate=TARGET_FRAME_RATE):
+        """Initializes a scheduler with nothing playing
 
-        # for each of the roller's colours make a panel with that colour
-        for panel_number in range(0, 5):
+        :param root_window: Tk, window whose event loop runs the frames
+        :param frame_rate: int, frames per second to aim for
+        """
 
-            # finds a random int that's not in roller_panels yet
-            next_panel = random.randint(0, 4)
-            while next_panel in self.__roller_panels:
-                next_panel = random.randint(0, 4)
+        self.__root_window = root_window
+        self.__frame_time = 1 / frame_rate
 
-            # appends the found int to roller_panels
-            self.__roller_panels.append(next_panel)
+        self.__job = None
+        self.__steps = []
+        self.__steps_done = 0
+        self.__step_time = 0
+        self.__start_time = 0
+        self.__next_frame_time = 0
+        self.__apply_step = None
+        self.__render = None
+        self.__on_finish = None
 
-    def nudge(self, direction="DOWN"):
-        """For nudging the roller down. Kind of like roll_down, but needs to
-        successfully execute three times to work
+    def is_running(self):
+        """Checks if an animation is playing
 
-        :param direction: str, which way to nudge the roller. "DOWN" OR "UP"
-        :return:
+        :return: bool, True if a frame is waiting to be run
         """
 
-        # does nothing if the roller is stuck
-        if self.is_stuck():
-            return
+        return self.__job is not None
 
-        # random number to determine whether the roller will get stuck
-        stuck_rng = random.randint(0, 100)
+    def animate(self, steps, step_time, apply_step, render, on_finish):
+        """Starts an animation. An animation that is already playing is
+        stopped where it is
 
-        # if the random int is less than or equal to 10, the roller gets stuck
-        if stuck_rng <= 10:
-            self.__stuck = True
-            return
-
-        # adds a nudge to the applicable counter and then tries to roll the
-        # roller. If the roller is rolled, the nudge counter is set to 0 so
-        # that more nudges can be executed
-        if direction == "DOWN":
-            self.__nudged_down += 1
+        :param steps: list, steps of the animation in order
+        :param step_time: float, seconds between two steps
+        :param apply_step: function, called with each step when it is due
+        :param render: function, called once per frame with the list of
+        steps applied in the frame
+        :param on_finish: function, called without parameters after the last
+        step has been rendered
+        :return:
+        """
 
-            if self.__nudged_down > 2:
-                self.roll(direction="DOWN")
-                self.__nudged_down = 0
+        self.cancel()
 
-        elif direction == "UP":
-            self.__nudged_up += 1
+        self.__steps = steps
+        self.__steps_done = 0
+        self.__step_time = step_time
+        self.__apply_step = apply_step
+        self.__render = render
+        self.__on_finish = on_finish
 
-            if self.__nudged_up > 2:
-                self.roll(direction="UP")
-                self.__nudged_up = 0
+        self.__start_time = time.perf_counter()
+        self.__next_frame_time = self.__start_time
+        self.__job = self.__root_window.after(0, self.__frame)
 
-    def roll(self, direction="DOWN"):
-        """Roll the roller up one tick
+    def cancel(self):
+        """Stops the animation that is playing, if any. Steps that weren't
+        due yet are never applied
 
-        :param direction: str, UP or DOWN depending on which way to spin the
-        roller. "DOWN" OR "UP"
         :return:
         """
 
-        # if the roller is stuck, returns without doing anything
-        if self.is_stuck():
-            return
+        if self.__job is not None:
+            self.__root_window.after_cancel(self.__job)
+            self.__job = None
 
-        # makes a list that the new roller position will be stored in
-        new_panels = []
+    def __frame(self):
+        """Applies and renders the steps that have come due, then asks for
+        the next frame or finishes the animation
 
-        # appends the applicable panels to the new_panels list. Basically
-        # shifts all elements in the list one step and loops from last index
-        # to first
-        if direction == "DOWN":
-            for panel in range(0, len(ROLLER_COLOURS)):
-                new_panels.append(self.__roller_panels[
-                                      abs((panel - 1) % len(ROLLER_COLOURS))])
-        elif direction == "UP":
-            for panel in range(0, len(ROLLER_COLOURS)):
-                new_panels.append(self.__roller_panels[
-                                      (panel + 1) % len(ROLLER_COLOURS)])
+        :return:
+        """
 
-        self.__roller_panels = new_panels
+        self.__job = None
+        now = time.perf_counter()
 
-    def get_panels_state(self):
-        """Getter for the position of the roller panels
+        # the first step is due right away, and one more every step_time
+        steps_due = min(len(self.__steps),
+                        int((now - self.__start_time) / self.__step_time) + 1)
+        frame_steps = self.__steps[self.__steps_done:steps_due]
+        for step in frame_steps:
+            self.__apply_step(step)
+        self.__steps_done = steps_due
 
-        :return: list, list of ints that represent each panel on the roller
-        from 0 (highest) to 4 (lowest)
-        """
+        if frame_steps:
+            self.__render(frame_steps)
 
-        return self.__roller_panels
-
-    def is_stuck(self):
-        """Getter for roller's stuck state
+        if self.__steps_done == len(self.__steps):
+            self.__on_finish()
+            return
 
-        :return: bool, True if roller is stuck
-        """
+        # frames that were missed are skipped instead of run late
+        self.__next_frame_time += self.__frame_time
+        if self.__next_frame_time <= now:
+            self.__next_frame_time = now + self.__frame_time
 
-        return self.__stuck
+        delay = int((self.__next_frame_time - now) * 1000)
+        self.__job = self.__root_window.after(delay, self.__frame)
 
 
 class RootWindow:
+    """
+    The Tk window of the slot machine. The game itself is a SlotMachine, and
+    this class only shows its state and passes the player's clicks to it.
+    """
+
     def __init__(self):
         # create a seed out of time for random operations
         random.seed(time.time(), version=2)
 
+        # the rules, money and rollers of the game
+        self.__slot_machine = SlotMachine(NUMBER_OF_ROLLERS)
+
         self.__root_window = Tk()
 
+        # runs the spin animation from the event loop
+        self.__animation_scheduler = AnimationScheduler(self.__root_window)
+        # the waiting losing dialogue after getting caught, if any
+        self.__lost_dialogue_job = None
+
         # Padding for the actual widgets. Only visual.
         for _ in range(0, 5 * NUMBER_OF_ROLLERS + 16):
             self.__square = Label(height=1,
@@ -231,8 +249,7 @@ class RootWindow:
                                  columnspan=6)
 
         # user money related attributes
-        self.__user_money = 100
-        self.__user_money_field = Label(text=f"Money: {self.__user_money}Mk",
+        self.__user_money_field = Label(text="",
                                         bg="black",
                                         fg="lime")
         self.__user_money_field.grid(row=2,
@@ -240,9 +257,9 @@ class RootWindow:
                                      columnspan=10,
                                      sticky=W,
                                      ipadx=5)
+        self.update_user_money()
 
         # game operation related attributes
-        self.__payout_amount = 0
         self.__roll_button = Button(text="ROLL",
                                     border=2,
                                     relief=RAISED,
@@ -325,7 +342,8 @@ class RootWindow:
             current_row += 1
 
     def initialize_rollers(self):
-        """Initializes list of element "rollers"
+        """Initializes list of element "rollers" around the Roller objects
+        of the slot machine
 
         :return:
         """
@@ -333,10 +351,17 @@ class RootWindow:
         # initialize the "rollers" of the slot machine and add them to a list
         # for easy access when we need to alter them.
         self.__rollers = []
+        # what each roller's widgets show right now, so update_roller only
+        # sends Tk the attributes that changed. The panels are made with the
+        # colours the rollers start in
+        self.__shown_panels = []
+        self.__shown_stuck = []
         for roller_number in range(0, NUMBER_OF_ROLLERS):
             new_roller = self.create_roller(column=(4 * roller_number + 2),
                                             roller_number=roller_number)
             self.__rollers.append(new_roller)
+            self.__shown_panels.append(new_roller[0].get_panels_state())
+            self.__shown_stuck.append(False)
             if 0 <= roller_number < NUMBER_OF_ROLLERS - 1:
                 # this goes in between the rollers. It is not initialized in
                 # __init__ because it fits in this method better
@@ -370,8 +395,8 @@ class RootWindow:
             """
             self.nudge_roller(roller_number, "DOWN")
 
-        # make a Roller object for the interface roller object
-        roller_object = Roller()
+        # the Roller object of the slot machine this element shows
+        roller_object = self.__slot_machine.get_rollers()[roller_number]
 
         def create_roller_element(panel_number, border_size, relief_style):
             """Creates a roller panel element
@@ -384,7 +409,7 @@ class RootWindow:
             """
 
             return Label(bg=ROLLER_COLOURS[
-                roller_object.get_panels_state()[panel_number]],
+                roller_object.get_panel(panel_number)],
                 border=border_size,
                 relief=relief_style)
 
@@ -467,52 +492,59 @@ class RootWindow:
         :return:
         """
 
-        self.__rollers[roller_number][0].roll(direction)
+        self.__slot_machine.roll_roller(roller_number, direction)
         self.update_roller(roller_number)
 
     def roll_all_rollers(self):
-        """Makes all rollers spin a random number of times between 7 and 14
+        """Starts spinning all rollers in the order the slot machine decides.
+        The spin is animated by the scheduler, and finish_spin is called when
+        the rollers stop
+
+        :return:
+        """
+
+        self.__animation_scheduler.animate(self.__slot_machine.spin_steps(),
+                                           ROLL_STEP_TIME,
+                                           self.__slot_machine.roll_roller,
+                                           self.render_spin_frame,
+                                           self.finish_spin)
 
-        note to self: this method uses the update_idletasks method in Tk. From
-        what I understand it makes sure the roller panel graphics (empty text
-        widgets) are updated when the program changes their values by it's self
+    def render_spin_frame(self, frame_steps):
+        """Shows the rollers that turned during one frame of the spin
 
+        :param frame_steps: list, roller numbers that turned in the frame
         :return:
         """
 
-        number_of_rollers = len(self.__rollers)
-        sleep_time = 0.0033
-
-        # spins all rollers at least 14 times, plus some random times for
-        # granularity
-        for number_of_rolls in range(0, 14):
-            for roller in range(0, number_of_rollers):
-                self.roll_roller(roller)
-                time.sleep(sleep_time)
-                self.__root_window.update_idletasks()
-
-                granular_rolls = random.randint(0, 1)
-                for number_of_granular_rolls in range(1, granular_rolls):
-                    self.roll_roller(roller)
-                    time.sleep(sleep_time)
-                    self.__root_window.update_idletasks()
-
-        # also unlocks the screwdriver buttons
-        for roller in range(0, number_of_rollers):
+        for roller in set(frame_steps):
+            self.update_roller(roller)
+
+    def finish_spin(self):
+        """Lets the player act on the rollers once they have stopped
+
+        :return:
+        """
+
+        # unlocks the screwdriver buttons
+        for roller in range(0, len(self.__rollers)):
             self.__rollers[roller][7].configure(state=NORMAL)
             self.__rollers[roller][9].configure(state=NORMAL)
 
+        # enables the cash out option
+        self.__take_button.configure(state=NORMAL)
+
+        # updates dialogue
+        self.__dialogue_window.configure(text=DIALOGUE["SECOND INSTRUCTIONS"])
+
     def nudge_roller(self, roller_number, direction):
-        """Connects the Roller method "nudge" to self.__rollers
+        """Connects the SlotMachine method "nudge_roller" to self.__rollers
 
         :param roller_number: int, index of roller in self.__rollers
         :param direction: str, direction of nudge. "UP" or "DOWN"
         :return:
         """
 
-        self.__rollers[roller_number][0].nudge(direction)
-
-        if self.__rollers[roller_number][0].is_stuck():
+        if self.__slot_machine.nudge_roller(roller_number, direction):
             self.__rollers[roller_number][7].configure(state="disabled",
                                                        text="###",
                                                        background="grey")
@@ -532,110 +564,77 @@ class RootWindow:
         :return:
         """
 
+        roller_object = self.__rollers[roller_number][0]
+        shown_panels = self.__shown_panels[roller_number]
+
         # for each panel in the roller, change it's colour to the colour of the
-        # panel in the new state of the roller
+        # panel in the new state of the roller. Every configure is a round
+        # trip to Tk, so panels that already show their colour are skipped
         for panel in range(0, 5):
-            self.__rollers[roller_number][panel + 1].configure(
-                background=ROLLER_COLOURS[self.__rollers[roller_number]
-                                          [0].get_panels_state()[panel]])
-
-        if self.__rollers[roller_number][0].is_stuck():
+            new_panel = roller_object.get_panel(panel)
+            if new_panel != shown_panels[panel]:
+                self.__rollers[roller_number][panel + 1].configure(
+                    background=ROLLER_COLOURS[new_panel])
+                shown_panels[panel] = new_panel
+
+        if roller_object.is_stuck() and \
+                not self.__shown_stuck[roller_number]:
             self.__rollers[roller_number][6].configure(
                 text="STUCK!", foreground="red")
+            self.__shown_stuck[roller_number] = True
 
-        # also update the worth of the current streak since the streak changed
-        self.__payout_amount = self.determine_streak_worth()
-
-    def check_bet(self):
-        """Checks if the bet is valid. Also gives feedback based on truth state
+    def update_user_money(self):
+        """Shows the player's money from the slot machine
 
-        :return: bool, True if the bet is an int and the user can afford it
+        :return:
         """
 
-        # checks if the bet can be turned into an integer
-        try:
-            int(self.__bet_entry.get())
-        except ValueError:
-            self.__bet_feedback.configure(text="Must be int!")
-            return False
-
-        # checks if the user can afford the bet
-        if int(self.__bet_entry.get()) > self.__user_money:
-            self.__bet_feedback.configure(text="Can't afford bet!")
-            return False
-
-        # can't steal money from the machine yet ;)
-        if int(self.__bet_entry.get()) < 0:
-            self.__bet_feedback.configure(text="Bet can't be negative!")
-            return False
-
-        # if the method gets to this point, the bet is valid
-        self.__bet_feedback.configure(text="")
-        return True
+        self.__user_money_field.configure(
+            text=f"Money: {self.__slot_machine.get_user_money()}Mk")
 
     def charge_user(self):
-        """Checks if the bet is valid and charges the user according to the bet
+        """Checks if the bet is valid and charges the user according to the
+        bet. Also gives feedback on the bet
 
         :return:
         :raises: ValueError, if the bet is invalid
         """
 
-        # checks if the bet is valid to start with. If it's not, raises a
-        # ValueError
-        if not self.check_bet():
-            raise ValueError
+        # the slot machine checks the bet, and explains what is wrong with it
+        try:
+            self.__slot_machine.charge_user(self.__bet_entry.get())
+        except ValueError as bet_feedback:
+            self.__bet_feedback.configure(text=str(bet_feedback))
+            raise
 
-        # puts the bet amount in a variable, removes it from money and updates
-        # money display widget
-        bet_amount = int(self.__bet_entry.get())
-        self.__user_money -= bet_amount
-        self.__user_money_field.configure(text=f"Money: {self.__user_money}Mk")
+        # if the method gets to this point, the bet was valid
+        self.__bet_feedback.configure(text="")
+        self.update_user_money()
 
         # disables bet setting and rolling
         self.__bet_entry.configure(state=DISABLED)
         self.__roll_button.configure(state=DISABLED)
 
-    def determine_streak_worth(self):
-        """Determines how much the current streak of colours in the middle row
-        is worth considering the bet
+    def cash_out(self):
+        """Pays out the current streak through the slot machine, then resets
+        the buttons and rollers for the next round
 
-        :return: int, worth of streak
+        :return:
         """
 
-        # make a list of all the middle panel values to make handling them
-        # easier
-        list_of_middle_panels = []
-        for roller in range(0, len(self.__rollers)):
-            middle_panel = self.__rollers[roller][0].get_panels_state()[2]
-            list_of_middle_panels.append(middle_panel)
-
-        # if all panels aren't the same, the streak is worthless
-        for middle_panel in list_of_middle_panels:
-            if middle_panel != list_of_middle_panels[0]:
-                return 0
-
-        # all the panels are the same. Returns the worth of the streak
-        bet_entered = int(self.__bet_entry.get())
-        return WINNING_COLOURS[list_of_middle_panels[0]] * bet_entered
+        something_was_won = self.__slot_machine.cash_out()
+        self.end_round(something_was_won)
 
-    def cash_out(self):
-        """Adds payout amount to users balance, then sets payout to 0 and
-        disables the button
+    def end_round(self, something_was_won):
+        """Shows the result of a round and resets the buttons and rollers for
+        the next one
 
+        :param something_was_won: bool, True if the round paid anything
         :return:
         """
 
-        # a bool to determine whether the player actually won anything.
-        # used to determine what sort of dialogue is printed at the end.
-        nothing_was_won = (self.__payout_amount == 0)
-
-        # add the payout to users balance
-        self.__user_money += int(self.__payout_amount)
-        self.__user_money_field.configure(text=f"Money: {self.__user_money}Mk")
+        self.update_user_money()
         self.__user_money_field.update_idletasks()
-
-        # resets payouts
-        self.__payout_amount = 0
         self.__take_button.configure(state=DISABLED)
 
         # at this point the loop is basically done regarding this path.
@@ -646,13 +645,13 @@ class RootWindow:
         self.__crowbar_button.configure(state=DISABLED)
 
         # if the machine wasn't broken, gives some different dialogue
-        if nothing_was_won:
-            self.__dialogue_window.configure(text=DIALOGUE["NO WIN"])
-        else:
+        if something_was_won:
             self.__dialogue_window.configure(text=DIALOGUE["AGAIN"])
+        else:
+            self.__dialogue_window.configure(text=DIALOGUE["NO WIN"])
 
         # if the user runs out of money, informs the user that they lost
-        if self.__user_money == 0:
+        if self.__slot_machine.is_broke():
             self.__dialogue_window.configure(text=DIALOGUE["LOST"])
 
     def break_machine(self):
@@ -662,29 +661,30 @@ class RootWindow:
         :return:
         """
 
-        success_chance = random.randint(0, 100)
-        penalty = self.__user_money // 2
+        got_caught = self.__slot_machine.break_machine()
+        self.end_round(not got_caught)
 
-        if success_chance < 40:
-            self.__user_money -= penalty
-            self.__user_money_field.configure(text=f"Money: "
-                                                   f"{self.__user_money}Mk")
-            self.__payout_amount = 0
-            self.cash_out()
+        if got_caught:
             self.__dialogue_window.configure(text=DIALOGUE["CAUGHT TAMPERING"])
-            self.__root_window.update_idletasks()
 
             # if the user also ends up broke, waits a few seconds and displays
-            # losing dialogue
-            if self.__user_money == 0:
-                time.sleep(5)
-                self.__dialogue_window.configure(text=DIALOGUE["LOST"])
+            # losing dialogue. The window stays usable in the meantime
+            if self.__slot_machine.is_broke():
+                self.__lost_dialogue_job = self.__root_window.after(
+                    LOST_DIALOGUE_DELAY, self.show_lost_dialogue)
 
         else:
-            self.__payout_amount = int(self.__bet_entry.get())
-            self.cash_out()
             self.__dialogue_window.configure(text=DIALOGUE["NICELY TAMPERED"])
 
+    def show_lost_dialogue(self):
+        """Tells the player they have lost all their money
+
+        :return:
+        """
+
+        self.__lost_dialogue_job = None
+        self.__dialogue_window.configure(text=DIALOGUE["LOST"])
+
     def game_frame(self):
         """The frame of the game. Calls other functions to make the game work
 
@@ -697,14 +697,13 @@ class RootWindow:
         except ValueError:
             return
 
-        # starts the rollers
-        self.roll_all_rollers()
+        # a new round replaces the losing dialogue that was still waiting
+        if self.__lost_dialogue_job is not None:
+            self.__root_window.after_cancel(self.__lost_dialogue_job)
+            self.__lost_dialogue_job = None
 
-        # enables the cash out option
-        self.__take_button.configure(state=NORMAL)
-
-        # updates dialogue
-        self.__dialogue_window.configure(text=DIALOGUE["SECOND INSTRUCTIONS"])
+        # starts the rollers. The rest of the round is enabled once they stop
+        self.roll_all_rollers()
 
     def quit_command(self):
         """Quits the mainloop
@@ -712,6 +711,7 @@ class RootWindow:
         :return:
         """
 
+        self.__animation_scheduler.cancel()
         self.__root_window.destroy()
 
 
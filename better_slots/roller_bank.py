@@ -0,0 +1,85 @@
+"""
+Many slot machine rollers at once as NumPy arrays, for simulations that turn
+and read whole batches of rollers without a Roller object for each. Kept out
+of slot_engine.py, so the engine and the Tk window don't need NumPy.
+"""
+
+import numpy as np
+
+
+class RollerBank:
+    """
+    Many rollers as NumPy arrays, for turning and reading them all at once.
+    Works like Roller: a fixed panel order per roller and one offset array.
+    Rollers in a bank don't get stuck.
+    """
+
+    def __init__(self, permutations, offsets=None):
+        """Initializes a bank of rollers
+
+        :param permutations: numpy.ndarray, panel order of each roller, shape
+        (..., number of panels). Leading dimensions are for example spins and
+        rollers
+        :param offsets: numpy.ndarray, turns down each roller has taken, shape
+        of permutations without its last dimension. By default all zeros
+        """
+
+        self.__permutations = permutations
+        self.__number_of_panels = permutations.shape[-1]
+
+        if offsets is None:
+            offsets = np.zeros(permutations.shape[:-1], dtype=np.int64)
+        self.__offsets = offsets % self.__number_of_panels
+
+    def get_offsets(self):
+        """Getter for the offsets of the rollers
+
+        :return: numpy.ndarray, turns down modulo the number of panels
+        """
+
+        return self.__offsets
+
+    def rotate(self, steps):
+        """Turns every roller down at once. Negative steps turn up
+
+        :param steps: numpy.ndarray or int, turns of each roller, in the shape
+        of the offsets or broadcastable to it
+        :return:
+        """
+
+        self.__offsets = (self.__offsets + steps) % self.__number_of_panels
+
+    def get_panels(self, panel_number):
+        """Getter for the panel in view in one row of every roller
+
+        :param panel_number: int, row of the panels
+        :return: numpy.ndarray, panels in the shape of the offsets
+        """
+
+        rows = (panel_number - self.__offsets) % self.__number_of_panels
+        return np.take_along_axis(self.__permutations, rows[..., None],
+                                  axis=-1)[..., 0]
+
+    def get_panels_states(self):
+        """Getter for every panel in view of every roller
+
+        :return: numpy.ndarray, panels in the shape of the permutations
+        """
+
+        rows = (np.arange(self.__number_of_panels) -
+                self.__offsets[..., None]) % self.__number_of_panels
+        return np.take_along_axis(self.__permutations, rows, axis=-1)
+
+
+def rollers_to_bank(rollers):
+    """Copies the panels and offsets of Rollers into a RollerBank
+
+    :param rollers: list, Roller objects
+    :return: RollerBank, bank with one roller per Roller, in the same order
+    """
+
+    return RollerBank(
+        np.array([roller.get_permutation() for roller in rollers],
+                 dtype=np.int8),
+        np.array([roller.get_offset() for roller in rollers],
+                 dtype=np.int64))
@@ -0,0 +1,196 @@
+"""
+Estimates the return-to-player and hit frequency of a slot machine
+configuration by simulating spins with NumPy. Every spin gets a random panel
+order for each roller, like Roller does, and a spin offset, the number of
+times the roller turns during the spin. The colour that stops in the middle
+row and the payout are then worked out for a whole batch of spins at once,
+so tens of millions of spins take seconds instead of clicking ROLL.
+
+Return-to-player is the payout divided by the bet, and a hit is a spin that
+pays anything. Both are reported with confidence intervals, next to the
+exact values the configuration gives in theory.
+
+Usage: python rtp_estimator.py [--spins 10000000] [--rollers 5]
+       [--colours cyan lime red yellow black] [--multipliers 10 5 3 2 0]
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from roller_bank import RollerBank
+from slot_engine import NUMBER_OF_ROLLERS, ROLLER_COLOURS, WINNING_COLOURS, \
+    MINIMUM_ROLLS, MIDDLE_PANEL
+
+# spins simulated per batch. Each spin needs a byte per panel of every roller
+BATCH_SIZE = 1 << 20
+# z-score of the confidence intervals, 1.96 for 95 %
+CONFIDENCE_Z = 1.96
+
+
+def simulate_batch(random_generator, number_of_spins, number_of_rollers,
+                   multipliers):
+    """Simulates a batch of spins
+
+    :param random_generator: numpy.random.Generator, source of randomness
+    :param number_of_spins: int, number of spins in the batch
+    :param number_of_rollers: int, number of rollers in the machine
+    :param multipliers: numpy.ndarray, payout multiplier of each colour
+    :return: numpy.ndarray, payout per unit bet of each spin
+    """
+
+    number_of_colours = len(multipliers)
+
+    # a random panel order for every roller of every spin, like Roller makes
+    panels = np.broadcast_to(
+        np.arange(number_of_colours, dtype=np.int8),
+        (number_of_spins, number_of_rollers, number_of_colours))
+    panels = random_generator.permuted(panels, axis=2)
+
+    # every roller turns MINIMUM_ROLLS times down per spin, like in
+    # SlotMachine.spin_steps, so the offset is the same for every roller
+    rollers = RollerBank(panels)
+    rollers.rotate(np.full((number_of_spins, number_of_rollers),
+                           MINIMUM_ROLLS))
+    middle_panels = rollers.get_panels(MIDDLE_PANEL)
+
+    # only a streak of one colour across every roller pays
+    streaks = (middle_panels == middle_panels[:, :1]).all(axis=1)
+
+    return np.where(streaks, multipliers[middle_panels[:, 0]], 0)
+
+
+def exact_return_to_player(number_of_rollers, multipliers):
+    """Works out the return-to-player and hit frequency in theory. Every
+    colour is as likely to stop in the middle of each roller
+
+    :param number_of_rollers: int, number of rollers in the machine
+    :param multipliers: list, payout multiplier of each colour
+    :return: tuple, (return-to-player, hit frequency)
+    """
+
+    streak_chance = (1 / len(multipliers)) ** number_of_rollers
+
+    return streak_chance * sum(multipliers), \
+        streak_chance * sum(1 for multiplier in multipliers if multiplier > 0)
+
+
+def wilson_interval(successes, trials):
+    """Confidence interval of a proportion. Unlike mean +- z * error it
+    stays sensible for the rare hits of a slot machine
+
+    :param successes: int, number of successes
+    :param trials: int, number of trials
+    :return: tuple, (lower bound, upper bound)
+    """
+
+    proportion = successes / trials
+    z_squared = CONFIDENCE_Z ** 2
+    centre = (proportion + z_squared / (2 * trials)) / (1 + z_squared / trials)
+    spread = CONFIDENCE_Z / (1 + z_squared / trials) * math.sqrt(
+        proportion * (1 - proportion) / trials +
+        z_squared / (4 * trials ** 2))
+
+    return centre - spread, centre + spread
+
+
+def estimate(number_of_spins, number_of_rollers=NUMBER_OF_ROLLERS,
+             multipliers=None, seed=None, batch_size=BATCH_SIZE):
+    """Estimates the return-to-player and hit frequency of a configuration
+
+    :param number_of_spins: int, number of spins to simulate
+    :param number_of_rollers: int, number of rollers in the machine
+    :param multipliers: list, payout multiplier of each colour. By default
+    WINNING_COLOURS
+    :param seed: int, seed of the simulation. By default a random one
+    :param batch_size: int, spins simulated at once
+    :return: dict, return-to-player and hit frequency with their confidence
+    intervals
+    :raises: ValueError, if there are no spins, rollers or colours
+    """
+
+    if multipliers is None:
+        multipliers = WINNING_COLOURS
+
+    if number_of_spins < 1 or number_of_rollers < 1 or not multipliers:
+        raise ValueError("Needs at least one spin, roller and colour!")
+
+    random_generator = np.random.default_rng(seed)
+    multiplier_array = np.array(multipliers, dtype=np.int64)
+
+    # sums for the mean and variance of the payout, and the number of hits
+    payout_sum = 0
+    payout_square_sum = 0
+    hits = 0
+
+    spins_left = number_of_spins
+    while spins_left > 0:
+        batch_spins = min(batch_size, spins_left)
+        payouts = simulate_batch(random_generator, batch_spins,
+                                 number_of_rollers, multiplier_array)
+
+        payout_sum += int(payouts.sum())
+        payout_square_sum += int((payouts * payouts).sum())
+        hits += int(np.count_nonzero(payouts))
+        spins_left -= batch_spins
+
+    return_to_player = payout_sum / number_of_spins
+    variance = max(payout_square_sum / number_of_spins -
+                   return_to_player ** 2, 0)
+    standard_error = math.sqrt(variance / number_of_spins)
+
+    return {"spins": number_of_spins,
+            "return to player": return_to_player,
+            "return to player interval": (
+                return_to_player - CONFIDENCE_Z * standard_error,
+                return_to_player + CONFIDENCE_Z * standard_error),
+            "hit frequency": hits / number_of_spins,
+            "hit frequency interval": wilson_interval(hits,
+                                                      number_of_spins)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimate the return-to-player of a slot machine")
+    parser.add_argument("--spins", type=int, default=10000000)
+    parser.add_argument("--rollers", type=int, default=NUMBER_OF_ROLLERS)
+    parser.add_argument("--colours", nargs="+", default=ROLLER_COLOURS)
+    parser.add_argument("--multipliers", nargs="+", type=int,
+                        default=WINNING_COLOURS)
+    parser.add_argument("--seed", type=int, default=None)
+    arguments = parser.parse_args()
+
+    if len(arguments.colours) != len(arguments.multipliers):
+        print("Every colour needs a multiplier!")
+        return
+
+    start_time = time.perf_counter()
+    try:
+        result = estimate(arguments.spins, arguments.rollers,
+                          arguments.multipliers, arguments.seed)
+    except ValueError as error_message:
+        print(error_message)
+        return
+    elapsed_time = time.perf_counter() - start_time
+
+    exact_rtp, exact_hit_frequency = exact_return_to_player(
+        arguments.rollers, arguments.multipliers)
+    confidence = f"{math.erf(CONFIDENCE_Z / math.sqrt(2)):.0%}"
+
+    print(f"Simulated {result['spins']} spins in {elapsed_time:.2f} s.")
+    print(f"Return to player: {result['return to player']:.6f}, "
+          f"{confidence} interval "
+          f"{result['return to player interval'][0]:.6f} - "
+          f"{result['return to player interval'][1]:.6f} "
+          f"(exact {exact_rtp:.6f})")
+    print(f"Hit frequency:    {result['hit frequency']:.6f}, "
+          f"{confidence} interval "
+          f"{result['hit frequency interval'][0]:.6f} - "
+          f"{result['hit frequency interval'][1]:.6f} "
+          f"(exact {exact_hit_frequency:.6f})")
+
+
+if __name__ == "__main__":
+    main()
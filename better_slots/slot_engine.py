@@ -0,0 +1,437 @@
+"""
+The rules of the slot machine without any Tk. SlotMachine keeps the balance,
+the bet, the rollers and the payout, and RootWindow in
+better_slots_more_polish.py only shows its state and passes clicks to it.
+
+A Roller is a fixed order of panels and an offset that counts how far it
+has turned, so turning it any number of steps is one addition, and the panels
+in view are worked out from the offset only when they are read. RollerBank
+in roller_bank.py does the same for many rollers at once with NumPy arrays.
+
+Because nothing here needs a display, spins can be simulated as fast as the
+CPU allows:
+
+    python slot_engine.py [number of spins] [bet]
+"""
+
+import random
+import sys
+
+# The number of rollers in the slot machine
+NUMBER_OF_ROLLERS = 5
+# Needs 5 colours
+ROLLER_COLOURS = ["cyan", "lime", "red", "yellow", "black"]
+# a list containing the values of each colours streak. Example:
+# ROLLER_COLOURS[0] streak would net the player 10 times their bet.
+# Also needs 5 multipliers to work
+WINNING_COLOURS = [10, 5, 3, 2, 0]
+# money the player starts with
+STARTING_MONEY = 100
+# every roller spins at least this many times per spin
+MINIMUM_ROLLS = 14
+# index of the middle panel of a roller, the one the payout is read from
+MIDDLE_PANEL = 2
+
+
+class Roller:
+    """
+    This class models a roller in a slot machine. It can be rotated, read,
+    and get stuck, in which case it can no longer be rotated.
+
+    "Nudging" the roller is also possible, being an "unofficial" (illegal) way
+    to turn the roller.
+
+    The panels never move in __roller_panels. __offset counts the turns down
+    the roller has taken, so the panel in view in row p is
+    __roller_panels[(p - __offset) % number of panels].
+    """
+
+    def __init__(self):
+        self.__roller_panels = []
+        self.__offset = 0
+        self.__stuck = False
+        self.__nudged_up = 0
+        self.__nudged_down = 0
+
+        # for each of the roller's colours make a panel with that colour
+        for panel_number in range(0, 5):
+
+            # finds a random int that's not in roller_panels yet
+            next_panel = random.randint(0, 4)
+            while next_panel in self.__roller_panels:
+                next_panel = random.randint(0, 4)
+
+            # appends the found int to roller_panels
+            self.__roller_panels.append(next_panel)
+
+    def nudge(self, direction="DOWN"):
+        """For nudging the roller down. Kind of like roll_down, but needs to
+        successfully execute three times to work
+
+        :param direction: str, which way to nudge the roller. "DOWN" OR "UP"
+        :return:
+        """
+
+        # does nothing if the roller is stuck
+        if self.is_stuck():
+            return
+
+        # random number to determine whether the roller will get stuck
+        stuck_rng = random.randint(0, 100)
+
+        # if the random int is less than or equal to 10, the roller gets stuck
+        if stuck_rng <= 10:
+            self.__stuck = True
+            return
+
+        # adds a nudge to the applicable counter and then tries to roll the
+        # roller. If the roller is rolled, the nudge counter is set to 0 so
+        # that more nudges can be executed
+        if direction == "DOWN":
+            self.__nudged_down += 1
+
+            if self.__nudged_down > 2:
+                self.roll(direction="DOWN")
+                self.__nudged_down = 0
+
+        elif direction == "UP":
+            self.__nudged_up += 1
+
+            if self.__nudged_up > 2:
+                self.roll(direction="UP")
+                self.__nudged_up = 0
+
+    def roll(self, direction="DOWN", steps=1):
+        """Roll the roller a number of ticks. Only the offset changes, so any
+        number of ticks takes the same time
+
+        :param direction: str, UP or DOWN depending on which way to spin the
+        roller. "DOWN" OR "UP"
+        :param steps: int, number of ticks to roll
+        :return:
+        """
+
+        # if the roller is stuck, returns without doing anything
+        if self.is_stuck():
+            return
+
+        # rolling down brings the panel above into each row, rolling up the
+        # panel below
+        if direction == "DOWN":
+            self.__offset = (self.__offset + steps) % len(self.__roller_panels)
+        elif direction == "UP":
+            self.__offset = (self.__offset - steps) % len(self.__roller_panels)
+
+    def get_panel(self, panel_number):
+        """Getter for the panel in view in one row
+
+        :param panel_number: int, row of the panel from 0 (highest) to 4
+        (lowest)
+        :return: int, the panel, an index of ROLLER_COLOURS
+        """
+
+        return self.__roller_panels[(panel_number - self.__offset) %
+                                    len(self.__roller_panels)]
+
+    def get_panels_state(self):
+        """Getter for the position of the roller panels
+
+        :return: list, list of ints that represent each panel on the roller
+        from 0 (highest) to 4 (lowest)
+        """
+
+        return [self.get_panel(panel_number)
+                for panel_number in range(0, len(self.__roller_panels))]
+
+    def get_permutation(self):
+        """Getter for the order of the panels before any turns
+
+        :return: list, panels in the order they were made
+        """
+
+        return self.__roller_panels
+
+    def get_offset(self):
+        """Getter for how far the roller has turned
+
+        :return: int, turns down modulo the number of panels
+        """
+
+        return self.__offset
+
+    def is_stuck(self):
+        """Getter for roller's stuck state
+
+        :return: bool, True if roller is stuck
+        """
+
+        return self.__stuck
+
+
+class SlotMachine:
+    """
+    The state of one slot machine and its player: money, bet, rollers and
+    the payout of the current streak.
+    """
+
+    def __init__(self, number_of_rollers=NUMBER_OF_ROLLERS,
+                 money=STARTING_MONEY):
+        """Initializes a machine with new rollers and no bet
+
+        :param number_of_rollers: int, number of rollers in the machine
+        :param money: int, money the player starts with
+        """
+
+        self.__number_of_rollers = number_of_rollers
+        self.__user_money = money
+        self.__bet_amount = 0
+        # None while the rollers have moved since the payout was worked out
+        self.__payout_amount = 0
+
+        self.__rollers = []
+        self.initialize_rollers()
+
+    def initialize_rollers(self):
+        """Replaces the rollers with new randomly ordered ones
+
+        :return:
+        """
+
+        self.__rollers = [Roller()
+                          for _ in range(0, self.__number_of_rollers)]
+
+    def get_rollers(self):
+        """Getter for the rollers
+
+        :return: list, Roller objects from left to right
+        """
+
+        return self.__rollers
+
+    def get_user_money(self):
+        """Getter for the player's money
+
+        :return: int, money in marks
+        """
+
+        return self.__user_money
+
+    def get_bet_amount(self):
+        """Getter for the bet of the current spin
+
+        :return: int, bet in marks
+        """
+
+        return self.__bet_amount
+
+    def get_payout_amount(self):
+        """Getter for what cashing out would pay right now. The streak is only
+        worked out here, once the rollers have settled, and not on every turn
+
+        :return: int, payout in marks
+        """
+
+        if self.__payout_amount is None:
+            self.__payout_amount = self.determine_streak_worth()
+
+        return self.__payout_amount
+
+    def is_broke(self):
+        """Checks if the player has run out of money
+
+        :return: bool, True if the player has no money left
+        """
+
+        return self.__user_money == 0
+
+    def check_bet(self, bet_text):
+        """Checks if a bet is valid
+
+        :param bet_text: str, bet as the player typed it
+        :return: int, the bet
+        :raises: ValueError, with feedback for the player if the bet isn't an
+        int or the user can't afford it
+        """
+
+        # checks if the bet can be turned into an integer
+        try:
+            bet_amount = int(bet_text)
+        except ValueError:
+            raise ValueError("Must be int!")
+
+        # checks if the user can afford the bet
+        if bet_amount > self.__user_money:
+            raise ValueError("Can't afford bet!")
+
+        # can't steal money from the machine yet ;)
+        if bet_amount < 0:
+            raise ValueError("Bet can't be negative!")
+
+        return bet_amount
+
+    def charge_user(self, bet_text):
+        """Checks if the bet is valid and charges the user according to the bet
+
+        :param bet_text: str, bet as the player typed it
+        :return:
+        :raises: ValueError, if the bet is invalid
+        """
+
+        self.__bet_amount = self.check_bet(bet_text)
+        self.__user_money -= self.__bet_amount
+
+    def spin_steps(self):
+        """Decides the order the rollers turn in during a spin. Every roller
+        turns MINIMUM_ROLLS times, one roller after another
+
+        :return: list, roller numbers, one per turn of a roller
+        """
+
+        steps = []
+
+        # every roller turns once per round, for MINIMUM_ROLLS rounds
+        for number_of_rolls in range(0, MINIMUM_ROLLS):
+            for roller_number in range(0, self.__number_of_rollers):
+                steps.append(roller_number)
+
+        return steps
+
+    def roll_roller(self, roller_number, direction="DOWN"):
+        """Rolls the roller one turn in given direction
+
+        :param roller_number: int, index of the roller
+        :param direction: str, "UP" or "DOWN"
+        :return:
+        """
+
+        self.__rollers[roller_number].roll(direction)
+        self.__payout_amount = None
+
+    def roll_all_rollers(self):
+        """Spins every roller at once, without any animation
+
+        :return:
+        """
+
+        # the turns of each roller are added up first, so every roller only
+        # changes its offset once
+        turns = [0] * self.__number_of_rollers
+        for roller_number in self.spin_steps():
+            turns[roller_number] += 1
+
+        for roller, roller_turns in zip(self.__rollers, turns):
+            roller.roll(steps=roller_turns)
+
+        self.__payout_amount = None
+
+    def nudge_roller(self, roller_number, direction):
+        """Nudges a roller with the screwdriver
+
+        :param roller_number: int, index of the roller
+        :param direction: str, direction of nudge. "UP" or "DOWN"
+        :return: bool, True if the roller is stuck after the nudge
+        """
+
+        self.__rollers[roller_number].nudge(direction)
+        self.__payout_amount = None
+
+        return self.__rollers[roller_number].is_stuck()
+
+    def determine_streak_worth(self):
+        """Determines how much the current streak of colours in the middle row
+        is worth considering the bet
+
+        :return: int, worth of streak
+        """
+
+        # make a list of all the middle panel values to make handling them
+        # easier
+        list_of_middle_panels = [roller.get_panel(MIDDLE_PANEL)
+                                 for roller in self.__rollers]
+
+        # if all panels aren't the same, the streak is worthless
+        for middle_panel in list_of_middle_panels:
+            if middle_panel != list_of_middle_panels[0]:
+                return 0
+
+        # all the panels are the same. Returns the worth of the streak
+        return WINNING_COLOURS[list_of_middle_panels[0]] * self.__bet_amount
+
+    def cash_out(self):
+        """Adds payout amount to users balance, then sets payout to 0 and
+        gets new rollers for the next round
+
+        :return: bool, True if anything was won
+        """
+
+        payout_amount = self.get_payout_amount()
+
+        # used to determine what sort of dialogue is shown at the end
+        something_was_won = payout_amount != 0
+
+        # add the payout to users balance and resets payouts
+        self.__user_money += int(payout_amount)
+        self.__payout_amount = 0
+
+        self.initialize_rollers()
+
+        return something_was_won
+
+    def break_machine(self):
+        """Gets the player's bet out of the machine at the cost of a slight
+        chance of getting caught and losing some money. Cashes out either way
+
+        :return: bool, True if the player got caught
+        """
+
+        success_chance = random.randint(0, 100)
+        penalty = self.__user_money // 2
+
+        if success_chance < 40:
+            self.__user_money -= penalty
+            self.__payout_amount = 0
+            self.cash_out()
+            return True
+
+        self.__payout_amount = self.__bet_amount
+        self.cash_out()
+        return False
+
+    def play_spin(self, bet_text):
+        """Plays a whole round without nudging: bets, spins and cashes out
+
+        :param bet_text: str, bet as the player typed it
+        :return: int, payout of the round
+        :raises: ValueError, if the bet is invalid
+        """
+
+        self.charge_user(bet_text)
+        self.roll_all_rollers()
+        payout_amount = self.get_payout_amount()
+        self.cash_out()
+
+        return payout_amount
+
+
+def main():
+    number_of_spins = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    bet_amount = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    # the machine never runs out of money, so every spin can be played
+    slot_machine = SlotMachine(money=number_of_spins * bet_amount)
+    total_payout = 0
+    wins = 0
+
+    for _ in range(0, number_of_spins):
+        payout_amount = slot_machine.play_spin(str(bet_amount))
+        total_payout += payout_amount
+        if payout_amount > 0:
+            wins += 1
+
+    total_bet = number_of_spins * bet_amount
+    print(f"Spins: {number_of_spins}, wins: {wins}, "
+          f"return to player: {total_payout / max(total_bet, 1):.4f}")
+
+
+if __name__ == "__main__":
+    main()
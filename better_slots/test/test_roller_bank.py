@@ -0,0 +1,95 @@
+"""
+Tests that Roller and RollerBank turn like the rollers of SlotMachine.
+"""
+
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+
+import numpy as np
+
+# the modules of the slot machine import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from roller_bank import RollerBank, rollers_to_bank  # noqa: E402
+from slot_engine import MIDDLE_PANEL, NUMBER_OF_ROLLERS, Roller, \
+    SlotMachine  # noqa: E402
+
+
+class RollerTest(unittest.TestCase):
+
+    def test_offset_turns_like_moving_the_panels(self):
+        random.seed(1)
+        roller = Roller()
+        # the panels in view, moved one place per turn like a real roller
+        panels = list(roller.get_panels_state())
+
+        for _ in range(0, 100):
+            direction = random.choice(["UP", "DOWN"])
+            steps = random.randint(0, 12)
+            roller.roll(direction, steps)
+
+            for _ in range(0, steps):
+                if direction == "DOWN":
+                    # the panel above comes into each row
+                    panels.insert(0, panels.pop())
+                else:
+                    panels.append(panels.pop(0))
+
+            self.assertEqual(roller.get_panels_state(), panels)
+
+    def test_stuck_roller_does_not_turn(self):
+        random.seed(2)
+        roller = Roller()
+
+        # nudging until the roller gets stuck
+        while not roller.is_stuck():
+            roller.nudge("DOWN")
+        panels = roller.get_panels_state()
+        roller.roll("DOWN", 3)
+        roller.nudge("UP")
+
+        self.assertEqual(roller.get_panels_state(), panels)
+
+
+class RollerBankTest(unittest.TestCase):
+
+    def test_bank_turns_like_a_spin(self):
+        random.seed(3)
+        for _ in range(0, 20):
+            slot_machine = SlotMachine()
+            roller_bank = rollers_to_bank(slot_machine.get_rollers())
+
+            turns = Counter(slot_machine.spin_steps())
+            roller_bank.rotate(np.array([turns[roller_number] for
+                                         roller_number
+                                         in range(0, NUMBER_OF_ROLLERS)]))
+            slot_machine.roll_all_rollers()
+
+            self.assertEqual(roller_bank.get_panels_states().tolist(),
+                             [roller.get_panels_state() for roller
+                              in slot_machine.get_rollers()])
+            self.assertEqual(roller_bank.get_panels(MIDDLE_PANEL).tolist(),
+                             [roller.get_panel(MIDDLE_PANEL) for roller
+                              in slot_machine.get_rollers()])
+            self.assertEqual(roller_bank.get_offsets().tolist(),
+                             [roller.get_offset() for roller
+                              in slot_machine.get_rollers()])
+
+    def test_negative_steps_turn_up(self):
+        random.seed(4)
+        roller = Roller()
+        roller_bank = RollerBank(np.array([roller.get_permutation()]))
+
+        roller.roll("UP", 7)
+        roller_bank.rotate(-7)
+
+        self.assertEqual(roller_bank.get_panels_states().tolist(),
+                         [roller.get_panels_state()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the Tk-free slot machine rules of slot_engine.
+"""
+
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+
+# the modules of the slot machine import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from slot_engine import MIDDLE_PANEL, MINIMUM_ROLLS, NUMBER_OF_ROLLERS, \
+    STARTING_MONEY, WINNING_COLOURS, SlotMachine  # noqa: E402
+
+
+class SlotMachineTest(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(5)
+        self.slot_machine = SlotMachine()
+
+    def test_every_roller_turns_minimum_rolls_times(self):
+        self.assertEqual(Counter(self.slot_machine.spin_steps()),
+                         {roller_number: MINIMUM_ROLLS
+                          for roller_number in range(0, NUMBER_OF_ROLLERS)})
+
+    def test_invalid_bets(self):
+        for bet_text, error_text in [("ten", "Must be int!"),
+                                     (str(STARTING_MONEY + 1),
+                                      "Can't afford bet!"),
+                                     ("-1", "Bet can't be negative!")]:
+            with self.assertRaises(ValueError) as raised:
+                self.slot_machine.charge_user(bet_text)
+            self.assertEqual(str(raised.exception), error_text)
+
+        self.assertEqual(self.slot_machine.get_user_money(), STARTING_MONEY)
+
+    def test_spin_pays_the_streak_of_the_middle_row(self):
+        # a streak comes about once in 625 spins, so enough spins are played
+        # to see some
+        self.slot_machine = SlotMachine(money=20000)
+        wins = 0
+        for _ in range(0, 20000):
+            money_before = self.slot_machine.get_user_money()
+            self.slot_machine.charge_user("1")
+            self.slot_machine.roll_all_rollers()
+
+            middle_panels = {roller.get_panel(MIDDLE_PANEL) for roller
+                             in self.slot_machine.get_rollers()}
+            if len(middle_panels) == 1:
+                expected_payout = WINNING_COLOURS[middle_panels.pop()]
+            else:
+                expected_payout = 0
+            self.assertEqual(self.slot_machine.get_payout_amount(),
+                             expected_payout)
+
+            if self.slot_machine.cash_out():
+                wins += 1
+            self.assertEqual(self.slot_machine.get_user_money(),
+                             money_before - 1 + expected_payout)
+
+        self.assertGreater(wins, 0)
+
+    def test_roll_all_rollers_matches_the_steps(self):
+        # the same steps taken one roller turn at a time end in the same
+        # place
+        random.seed(6)
+        stepped_machine = SlotMachine()
+        random.seed(6)
+        spun_machine = SlotMachine()
+
+        random.seed(7)
+        for roller_number in stepped_machine.spin_steps():
+            stepped_machine.roll_roller(roller_number)
+        random.seed(7)
+        spun_machine.roll_all_rollers()
+
+        self.assertEqual([roller.get_panels_state()
+                          for roller in stepped_machine.get_rollers()],
+                         [roller.get_panels_state()
+                          for roller in spun_machine.get_rollers()])
+
+
+if __name__ == "__main__":
+    unittest.main()
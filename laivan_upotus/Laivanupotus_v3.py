@@ -12,6 +12,10 @@ Firstname Lastname      Leo Mandara
 Email                   x
 """
 
+import json
+import mmap
+import sys
+
 # all the ship types and their respective healths.
 SHIP_TYPES = {
     "battleship": 4,
@@ -26,6 +30,47 @@ BOARD_COLUMNS = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J"]
 NUMBER_OF_ROWS = 10
 QUIT_COMMAND = "Q"
 
+# boards with more cells than this store only the cells that are in use
+# (SparseBoard), because the masks of a BitBoard are as large as the board
+# and are copied whenever a cell changes
+SPARSE_BOARD_AREA = 1 << 16
+
+# size of the read buffer used when streaming ship files, in bytes
+READ_BUFFER_SIZE = 1024 * 1024
+
+# results of a single shot, returned by Board.shoot
+SHOT_MISS = "MISS"
+SHOT_HIT = "HIT"
+SHOT_SUNK = "SUNK"
+SHOT_ALREADY_SHOT = "ALREADY SHOT"
+
+# result of a command that isn't a coordinate on the board, in scripted games
+SHOT_INVALID = "INVALID"
+
+# command that prints the board in scripted games
+PRINT_COMMAND = "PRINT"
+
+
+def column_names(number_of_columns):
+    """Makes spreadsheet style column names: A to Z, then AA, AB and so on
+
+    :param number_of_columns: int, number of columns
+    :return: list, list of column names
+    """
+
+    names = []
+
+    for column_number in range(0, number_of_columns):
+        name = ""
+        # bijective base 26: there is no zero digit, so Z is followed by AA
+        remaining = column_number + 1
+        while remaining > 0:
+            remaining, letter_number = divmod(remaining - 1, 26)
+            name = chr(ord("A") + letter_number) + name
+        names.append(name)
+
+    return names
+
 
 class Ship:
 
@@ -40,6 +85,9 @@ class Ship:
         # how many hits the ship can sustain before sinking
         self.__ship_health = SHIP_TYPES[ship_type]
 
+        # functions to call with the ship when it sinks
+        self.__sink_listeners = []
+
     def get_ship_type(self):
         """Getter for ship type
 
@@ -71,13 +119,8 @@ class Ship:
         :return: bool, True if overlap is found
         """
 
-        overlap = False
-
-        for coordinate in self.get_coordinate_list():
-            if coordinate in other_ship.get_coordinate_list():
-                overlap = True
-
-        return overlap
+        return not set(self.get_coordinate_list()).isdisjoint(
+            other_ship.get_coordinate_list())
 
     def is_sunken(self):
         """Determines whether all ship parts have been sunken
@@ -87,14 +130,486 @@ class Ship:
 
         return self.get_ship_health() < 1
 
-    def take_damage(self):
-        """Reduces ship health by one
+    def add_sink_listener(self, listener):
+        """Adds a function to be called when the ship sinks
 
+        :param listener: function, called with the sunken Ship as parameter
+        :return:
+        """
+
+        self.__sink_listeners.append(listener)
+
+    def take_damage(self, index=None):
+        """Reduces ship health by one. If that sinks the ship, tells the sink
+        listeners about it
+
+        :param index: int, index of the hit cell. Not needed here, but ship
+        views of a Fleet (see fleet.py) count their damage per cell
         :return:
         """
 
         self.__ship_health -= 1
 
+        # only the hit that takes the last point of health sinks the ship
+        if self.__ship_health == 0:
+            for listener in self.__sink_listeners:
+                listener(self)
+
+
+class BitBoard:
+    """
+    Board engine that stores the state of the board as integer bitmasks, one
+    bit per cell. The index of a cell is row_number * width + column_number.
+
+    Shots, hits and ship occupancy each have their own mask, so hit tests,
+    "already shot" checks and win detection are single bitwise operations.
+    """
+
+    def __init__(self, width, height):
+        """Initializes an empty engine for a board of given size
+
+        :param width: int, number of columns
+        :param height: int, number of rows
+        """
+
+        self.__width = width
+        self.__height = height
+
+        # every cell that has been shot at
+        self.__shots = 0
+        # every shot cell that also had a ship in it
+        self.__hits = 0
+        # every cell that has a ship in it
+        self.__occupied = 0
+
+    def get_width(self):
+        """Getter for board width
+
+        :return: int, number of columns
+        """
+
+        return self.__width
+
+    def get_height(self):
+        """Getter for board height
+
+        :return: int, number of rows
+        """
+
+        return self.__height
+
+    def place_cell(self, index):
+        """Marks a cell as occupied by a ship
+
+        :param index: int, index of the cell
+        :return:
+        """
+
+        self.__occupied |= 1 << index
+
+    def place_cells(self, indices):
+        """Marks many cells as occupied by ships at once
+
+        Setting bits one by one copies the whole mask on every cell, so the
+        cells are gathered into a bitmap first and merged in a single step.
+
+        :param indices: iterable, indices of the cells
+        :return:
+        """
+
+        bitmap = bytearray((self.__width * self.__height + 7) // 8)
+        for index in indices:
+            bitmap[index >> 3] |= 1 << (index & 7)
+
+        self.__occupied |= int.from_bytes(bitmap, "little")
+
+    def is_occupied(self, index):
+        """Checks if a ship is in the cell
+
+        :param index: int, index of the cell
+        :return: bool, True if a ship is in the cell
+        """
+
+        return self.__occupied >> index & 1 == 1
+
+    def is_shot(self, index):
+        """Checks if the cell has already been shot at
+
+        :param index: int, index of the cell
+        :return: bool, True if the cell has been shot at
+        """
+
+        return self.__shots >> index & 1 == 1
+
+    def is_hit(self, index):
+        """Checks if the cell has been shot at and had a ship in it
+
+        :param index: int, index of the cell
+        :return: bool, True if the cell is a hit
+        """
+
+        return self.__hits >> index & 1 == 1
+
+    def shoot(self, index):
+        """Shoots a cell and records the shot
+
+        :param index: int, index of the cell
+        :return: bool, True if the shot hit a ship
+        """
+
+        cell_bit = 1 << index
+        self.__shots |= cell_bit
+
+        if self.__occupied & cell_bit:
+            self.__hits |= cell_bit
+            return True
+
+        return False
+
+    def set_shot(self, index, hit=False):
+        """Records a shot in a cell regardless of the ships on the board
+
+        :param index: int, index of the cell
+        :param hit: bool, True if the shot should be recorded as a hit
+        :return:
+        """
+
+        cell_bit = 1 << index
+        self.__shots |= cell_bit
+
+        if hit:
+            self.__hits |= cell_bit
+        else:
+            self.__hits &= ~cell_bit
+
+    def clear_shot(self, index):
+        """Removes a shot from a cell
+
+        :param index: int, index of the cell
+        :return:
+        """
+
+        cell_bit = 1 << index
+        self.__shots &= ~cell_bit
+        self.__hits &= ~cell_bit
+
+    def all_sunk(self):
+        """Checks if every occupied cell has been hit
+
+        :return: bool, True if there are no cells left to hit
+        """
+
+        return self.__occupied & ~self.__hits == 0
+
+    def get_shot_bitmap(self):
+        """Getter for the shot cells as a bitmap, one bit per cell starting
+        from the lowest bit of the first byte
+
+        :return: bytes, bitmap of the shot cells
+        """
+
+        return self.__shots.to_bytes((self.__width * self.__height + 7) // 8,
+                                     "little")
+
+    def get_hit_bitmap(self):
+        """Getter for the hit cells as a bitmap, laid out like
+        get_shot_bitmap
+
+        :return: bytes, bitmap of the hit cells
+        """
+
+        return self.__hits.to_bytes((self.__width * self.__height + 7) // 8,
+                                    "little")
+
+    def set_bitmaps(self, shot_bitmap, hit_bitmap):
+        """Replaces every shot with the shots of bitmaps laid out like
+        get_shot_bitmap
+
+        :param shot_bitmap: bytes, bitmap of the shot cells
+        :param hit_bitmap: bytes, bitmap of the hit cells
+        :return:
+        """
+
+        self.__shots = int.from_bytes(shot_bitmap, "little")
+        self.__hits = int.from_bytes(hit_bitmap, "little")
+
+
+class SparseBoard:
+    """
+    Board engine that only stores the cells that have been shot at or have a
+    ship in them, as sets of cell indices. Memory use grows with the activity
+    on the board instead of its area, which makes very large boards possible.
+
+    Works just like BitBoard, cell indices being row_number * width +
+    column_number.
+    """
+
+    def __init__(self, width, height):
+        """Initializes an empty engine for a board of given size
+
+        :param width: int, number of columns
+        :param height: int, number of rows
+        """
+
+        self.__width = width
+        self.__height = height
+
+        self.__shots = set()
+        self.__hits = set()
+        self.__occupied = set()
+
+    def get_width(self):
+        """Getter for board width
+
+        :return: int, number of columns
+        """
+
+        return self.__width
+
+    def get_height(self):
+        """Getter for board height
+
+        :return: int, number of rows
+        """
+
+        return self.__height
+
+    def place_cell(self, index):
+        """Marks a cell as occupied by a ship
+
+        :param index: int, index of the cell
+        :return:
+        """
+
+        self.__occupied.add(index)
+
+    def place_cells(self, indices):
+        """Marks many cells as occupied by ships at once
+
+        :param indices: iterable, indices of the cells
+        :return:
+        """
+
+        self.__occupied.update(indices)
+
+    def is_occupied(self, index):
+        """Checks if a ship is in the cell
+
+        :param index: int, index of the cell
+        :return: bool, True if a ship is in the cell
+        """
+
+        return index in self.__occupied
+
+    def is_shot(self, index):
+        """Checks if the cell has already been shot at
+
+        :param index: int, index of the cell
+        :return: bool, True if the cell has been shot at
+        """
+
+        return index in self.__shots
+
+    def is_hit(self, index):
+        """Checks if the cell has been shot at and had a ship in it
+
+        :param index: int, index of the cell
+        :return: bool, True if the cell is a hit
+        """
+
+        return index in self.__hits
+
+    def shoot(self, index):
+        """Shoots a cell and records the shot
+
+        :param index: int, index of the cell
+        :return: bool, True if the shot hit a ship
+        """
+
+        self.__shots.add(index)
+
+        if index in self.__occupied:
+            self.__hits.add(index)
+            return True
+
+        return False
+
+    def set_shot(self, index, hit=False):
+        """Records a shot in a cell regardless of the ships on the board
+
+        :param index: int, index of the cell
+        :param hit: bool, True if the shot should be recorded as a hit
+        :return:
+        """
+
+        self.__shots.add(index)
+
+        if hit:
+            self.__hits.add(index)
+        else:
+            self.__hits.discard(index)
+
+    def clear_shot(self, index):
+        """Removes a shot from a cell
+
+        :param index: int, index of the cell
+        :return:
+        """
+
+        self.__shots.discard(index)
+        self.__hits.discard(index)
+
+    def all_sunk(self):
+        """Checks if every occupied cell has been hit
+
+        :return: bool, True if there are no cells left to hit
+        """
+
+        return self.__occupied <= self.__hits
+
+    def get_shot_bitmap(self):
+        """Getter for the shot cells as a bitmap, one bit per cell starting
+        from the lowest bit of the first byte. The bitmap is as large as the
+        board, unlike the engine itself
+
+        :return: bytes, bitmap of the shot cells
+        """
+
+        return self.__cells_to_bitmap(self.__shots)
+
+    def get_hit_bitmap(self):
+        """Getter for the hit cells as a bitmap, laid out like
+        get_shot_bitmap
+
+        :return: bytes, bitmap of the hit cells
+        """
+
+        return self.__cells_to_bitmap(self.__hits)
+
+    def set_bitmaps(self, shot_bitmap, hit_bitmap):
+        """Replaces every shot with the shots of bitmaps laid out like
+        get_shot_bitmap
+
+        :param shot_bitmap: bytes, bitmap of the shot cells
+        :param hit_bitmap: bytes, bitmap of the hit cells
+        :return:
+        """
+
+        self.__shots = self.__bitmap_to_cells(shot_bitmap)
+        self.__hits = self.__bitmap_to_cells(hit_bitmap)
+
+    def __cells_to_bitmap(self, cells):
+        """Turns a set of cell indices into a bitmap
+
+        :param cells: set, indices of the cells
+        :return: bytes, bitmap with the bits of the cells set
+        """
+
+        bitmap = bytearray((self.__width * self.__height + 7) // 8)
+        for index in cells:
+            bitmap[index >> 3] |= 1 << (index & 7)
+
+        return bytes(bitmap)
+
+    def __bitmap_to_cells(self, bitmap):
+        """Turns a bitmap back into a set of cell indices
+
+        :param bitmap: bytes, bitmap laid out like get_shot_bitmap
+        :return: set, indices of the set bits
+        """
+
+        cells = set()
+        # the bitmap of a sparse board is mostly zero bytes
+        for byte_number, byte in enumerate(bitmap):
+            if byte:
+                for bit in range(0, 8):
+                    if byte >> bit & 1:
+                        cells.add(byte_number * 8 + bit)
+
+        return cells
+
+
+class Coordinate:
+    """
+    A coordinate that has already been parsed: its column and row number and
+    the index of its cell. Coordinates never change, so the same object can
+    be shared by every board of the same size.
+    """
+
+    # no __dict__ per object, since a table has one for every cell
+    __slots__ = ("__column_number", "__row_number", "__index")
+
+    def __init__(self, column_number, row_number, width):
+        """Initializes a coordinate
+
+        :param column_number: int, position of the column on the board
+        :param row_number: int, row number
+        :param width: int, width of the board, for the cell index
+        """
+
+        self.__column_number = column_number
+        self.__row_number = row_number
+        self.__index = row_number * width + column_number
+
+    def get_column_number(self):
+        """Getter for the column number
+
+        :return: int, position of the column on the board
+        """
+
+        return self.__column_number
+
+    def get_row_number(self):
+        """Getter for the row number
+
+        :return: int, row number
+        """
+
+        return self.__row_number
+
+    def get_index(self):
+        """Getter for the cell index
+
+        :return: int, index of the cell (row_number * width + column_number)
+        """
+
+        return self.__index
+
+
+# coordinate tables by board size, shared by the boards of the same size.
+# Only the latest COORDINATE_TABLE_CACHE_SIZE sizes are kept
+COORDINATE_TABLES = {}
+COORDINATE_TABLE_CACHE_SIZE = 8
+
+
+def coordinate_table(number_of_rows, board_columns):
+    """Getter for the table of every coordinate on a board, built on the
+    first call for each board size
+
+    :param number_of_rows: int, number of rows
+    :param board_columns: list, list of column names
+    :return: dict, coordinate strings (ex. "A1") mapped to Coordinates
+    """
+
+    table_key = (number_of_rows, tuple(board_columns))
+
+    if table_key in COORDINATE_TABLES:
+        return COORDINATE_TABLES[table_key]
+
+    width = len(board_columns)
+    table = {}
+    for row_number in range(0, number_of_rows):
+        for column_number, column_letter in enumerate(board_columns):
+            table[f"{column_letter}{row_number}"] = Coordinate(
+                column_number, row_number, width)
+
+    # dicts remember their insertion order, so the first key is the oldest
+    if len(COORDINATE_TABLES) >= COORDINATE_TABLE_CACHE_SIZE:
+        del COORDINATE_TABLES[next(iter(COORDINATE_TABLES))]
+    COORDINATE_TABLES[table_key] = table
+
+    return table
+
 
 class Board:
 
@@ -112,26 +627,77 @@ class Board:
     # 8                     8
     # 9                     9
     #   A B C D E F G H I J
+    #
+    # The cells themselves are kept in a BitBoard, or in a SparseBoard for
+    # very large boards. This class only translates coordinates and markers
+    # to and from it.
+
+    # markers the BitBoard can represent on its own
+    MISS_MARK = "*"
+    HIT_MARK = "X"
+    EMPTY_MARK = " "
 
     def __init__(self, number_of_rows=NUMBER_OF_ROWS,
-                 board_columns=BOARD_COLUMNS):
+                 board_columns=BOARD_COLUMNS, sparse=None):
         """Initializes a board of width len(board_columns) and height of
         number_of_rows
 
         :param number_of_rows: int, number of rows
-        :param board_columns: list, list of row letters
+        :param board_columns: list, list of column names. Names can be more
+        than one letter long (see column_names), but not contain digits
+        :param sparse: bool, True to store only the cells in use, False to
+        store the whole board as bitmasks. By default boards larger than
+        SPARSE_BOARD_AREA are sparse
         """
 
-        self.__dict_of_columns = {}
         self.__board_columns = board_columns
         self.__number_of_rows = number_of_rows
 
-        # constructs dictionary where keys are column letters and payloads are
-        # lists with as many values as there are rows
-        for column_letter in self.__board_columns:
-            self.__dict_of_columns[column_letter] = []
-            for row_number in range(0, self.__number_of_rows):
-                self.__dict_of_columns[column_letter].append(" ")
+        # column letters mapped to their position on the board, so that a
+        # coordinate can be turned into a cell index without a list search
+        self.__column_numbers = {}
+        for column_number, column_letter in enumerate(self.__board_columns):
+            self.__column_numbers[column_letter] = column_number
+
+        # every coordinate of the board parsed in advance, so that input is
+        # turned into a cell index with one lookup. Boards too large for a
+        # table parse their coordinates when they are used
+        if len(self.__board_columns) * self.__number_of_rows <= \
+                SPARSE_BOARD_AREA:
+            self.__coordinate_table = coordinate_table(
+                self.__number_of_rows, self.__board_columns)
+        else:
+            self.__coordinate_table = {}
+
+        if sparse is None:
+            sparse = len(self.__board_columns) * self.__number_of_rows > \
+                SPARSE_BOARD_AREA
+
+        if sparse:
+            self.__engine = SparseBoard(len(self.__board_columns),
+                                        self.__number_of_rows)
+        else:
+            self.__engine = BitBoard(len(self.__board_columns),
+                                     self.__number_of_rows)
+
+        # markers other than hits and misses (sunken ship initials), by index
+        self.__other_marks = {}
+
+        # fleet index: every occupied cell index mapped to the Ship in it, so
+        # that a shot finds its ship without going through the fleet
+        self.__ships_by_index = {}
+        # and the other way around, the cell indices of every placed Ship
+        self.__ship_cells = {}
+
+        # ships are counted down as they sink, so the game knows when it's
+        # over without checking the fleet
+        self.__ships_left = 0
+        self.__sunken_ships = []
+        self.__sink_listeners = []
+        self.__shot_listeners = []
+
+        # cells marked since a renderer last asked for them
+        self.__changed_cells = set()
 
     def get_columns(self):
         """Getter for column letter list
@@ -149,40 +715,130 @@ class Board:
 
         return self.__number_of_rows
 
+    def get_engine(self):
+        """Getter for the engine of the board
+
+        :return: BitBoard or SparseBoard, engine holding the board state
+        """
+
+        return self.__engine
+
+    def parse_coordinate(self, coordinate):
+        """Turns a coordinate string into a Coordinate. Looked up from the
+        coordinate table when possible, parsed otherwise
+
+        :param coordinate: str, format "XY", where X=column letter(s),
+        Y=row num
+        :return: Coordinate, the parsed coordinate
+        :raises: ValueError, if the coordinate isn't on the board
+        """
+
+        parsed_coordinate = self.__coordinate_table.get(coordinate)
+        if parsed_coordinate is not None:
+            return parsed_coordinate
+
+        # not in the table: either the board is too large for one or the
+        # coordinate is written unusually (ex. A01) or is invalid
+        if coordinate.strip() == "":
+            raise ValueError("Empty coordinate!")
+
+        # the column name is every letter before the row number
+        row_start = 1
+        while row_start < len(coordinate) and coordinate[row_start].isalpha():
+            row_start += 1
+
+        # int() raises a ValueError by itself if the row isn't a number
+        x_coord = coordinate[:row_start]
+        y_coord = int(coordinate[row_start:])
+
+        if x_coord not in self.__column_numbers or \
+                not 0 <= y_coord < self.__number_of_rows:
+            raise ValueError("Coordinate is not on the board!")
+
+        return Coordinate(self.__column_numbers[x_coord], y_coord,
+                          self.__engine.get_width())
+
+    def coordinate_to_index(self, coordinate):
+        """Turns a coordinate into the index of its cell
+
+        :param coordinate: str, format "XY", where X=column letter(s),
+        Y=row num
+        :return: int, index of the cell
+        :raises: ValueError, if the coordinate isn't on the board
+        """
+
+        return self.parse_coordinate(coordinate).get_index()
+
+    def index_to_coordinate(self, index):
+        """Turns the index of a cell back into a coordinate
+
+        :param index: int, index of the cell
+        :return: str, coordinate (ex. A1)
+        """
+
+        row_number, column_number = divmod(index, self.__engine.get_width())
+        return f"{self.__board_columns[column_number]}{row_number}"
+
+    def index_mark(self, index):
+        """Getter for the mark in a cell
+
+        :param index: int, index of the cell
+        :return: str, mark in the cell
+        """
+
+        if index in self.__other_marks:
+            return self.__other_marks[index]
+        elif self.__engine.is_hit(index):
+            return Board.HIT_MARK
+        elif self.__engine.is_shot(index):
+            return Board.MISS_MARK
+        else:
+            return Board.EMPTY_MARK
+
+    def frame_lines(self):
+        """Builds the printout of the board as lines of text, without the
+        blank lines around it
+
+        :return: list, lines of the board printout
+        """
+
+        width = len(self.get_columns())
+
+        # first column letter to last letter, above and below the board
+        column_line = " " + "".join(f" {column_letter}"
+                                    for column_letter in self.get_columns())
+
+        frame = [column_line]
+        for row_number in range(0, self.get_number_of_rows()):
+            row_start = row_number * width
+            # the row number first, then each value in the row followed by a
+            # space, and finally the row number again
+            row_marks = " ".join(self.index_mark(index) for index
+                                 in range(row_start, row_start + width))
+            frame.append(f"{row_number} {row_marks} {row_number}")
+        frame.append(column_line)
+
+        return frame
+
     def printout(self):
-        """Prints a board
+        """Prints a board. The whole board is built in one string first and
+        written with a single print
 
         :return:
         """
 
-        # blank line before board
-        print()
+        # blank lines before and after the board
+        print("\n" + "\n".join(self.frame_lines()) + "\n")
 
-        # prints first column letter to last letter
-        print(" ", end="")
-        for column_letter in self.get_columns():
-            print(f" {column_letter}", end="")
-        print("")
+    def pop_changed_cells(self):
+        """Getter for the cells whose mark has changed since the last call
 
-        # loop for each row
-        for row_number in range(0, self.get_number_of_rows()):
-            # print the row number first followed by a space
-            print(f"{row_number} ", end="")
-            # then each value in the row followed by a space
-            for column_letter in self.get_columns():
-                print(f"{self.__dict_of_columns[column_letter][row_number]} ",
-                      end="")
-            # and finally the row number again
-            print(f"{row_number}")
-
-        # prints first column letter to last letter
-        print(" ", end="")
-        for column_letter in self.get_columns():
-            print(f" {column_letter}", end="")
-        print("")
-
-        # blank line after board
-        print()
+        :return: set, indices of the changed cells
+        """
+
+        changed_cells = self.__changed_cells
+        self.__changed_cells = set()
+        return changed_cells
 
     def mark_on_board(self, coordinate, marker):
         """Set column list coordinate to marker
@@ -192,14 +848,35 @@ class Board:
         :return:
         """
 
-        x_coord = coordinate[0]
-        y_coord = int(coordinate[1:])
+        try:
+            index = self.coordinate_to_index(coordinate)
+        except ValueError:
+            print("Invalid coordinate!")
+            return
+
+        self.mark_index(index, marker)
+
+    def mark_index(self, index, marker):
+        """Sets the mark of a cell
+
+        :param index: int, index of the cell
+        :param marker: str, marker to write on board. Preferably one character
+        :return:
+        """
 
-        # if the given coordinate is on the board
-        if not self.bad_coordinate(coordinate):
-            self.__dict_of_columns[x_coord][y_coord] = marker
+        # hits and misses live in the engine, everything else is stored on
+        # the side
+        self.__changed_cells.add(index)
+        self.__other_marks.pop(index, None)
+        if marker == Board.MISS_MARK:
+            self.__engine.set_shot(index)
+        elif marker == Board.HIT_MARK:
+            self.__engine.set_shot(index, hit=True)
+        elif marker == Board.EMPTY_MARK:
+            self.__engine.clear_shot(index)
         else:
-            print("Invalid coordinate!")
+            self.__engine.set_shot(index, self.__engine.is_occupied(index))
+            self.__other_marks[index] = marker
 
     def get_mark(self, coordinate):
         """Getter for a mark in given coordinate
@@ -208,12 +885,7 @@ class Board:
         :raises: ValueError, if the given coordinate isn't on the board
         """
 
-        if not self.bad_coordinate(coordinate):
-            x_coord = coordinate[0]
-            y_coord = int(coordinate[1:])
-            return self.__dict_of_columns[x_coord][y_coord]
-        else:
-            raise ValueError()
+        return self.index_mark(self.coordinate_to_index(coordinate))
 
     def mark_ship_on_board(self, ship_to_mark):
         """Prints a given ship on the board
@@ -224,113 +896,506 @@ class Board:
 
         # capital initial of Ship type
         sunken_mark = ship_to_mark.get_ship_type()[0].upper()
+
+        # ships placed on the board have their cells indexed already
+        if ship_to_mark in self.__ship_cells:
+            for index in self.__ship_cells[ship_to_mark]:
+                self.mark_index(index, sunken_mark)
+            return
+
         # marks each one of the sunken Ship's coordinates on the
         # board as sunken_mark
         for coordinate in ship_to_mark.get_coordinate_list():
             self.mark_on_board(coordinate, sunken_mark)
 
-    def bad_coordinate(self, coordinate):
-        """Checks if a coordinate is on the board
+    def place_ship(self, ship_to_place):
+        """Marks the cells of a ship as occupied in the engine
+
+        :param ship_to_place: Ship, ship to place on the board
+        :return:
+        :raises: ValueError, if a coordinate of the ship isn't on the board
+        """
+
+        self.place_ships([ship_to_place])
+
+    def place_ships(self, ships_to_place, cell_indices=None):
+        """Marks the cells of many ships as occupied in the engine
+
+        :param ships_to_place: list, Ships to place on the board
+        :param cell_indices: list, a list of cell indices for each ship if
+        they are already known. Coordinates are parsed again if not given
+        :return:
+        :raises: ValueError, if a coordinate of a ship isn't on the board
+        """
+
+        if cell_indices is None:
+            cell_indices = []
+            for a_ship in ships_to_place:
+                cell_indices.append([self.coordinate_to_index(coordinate)
+                                     for coordinate
+                                     in a_ship.get_coordinate_list()])
+
+        for a_ship, ship_indices in zip(ships_to_place, cell_indices):
+            for index in ship_indices:
+                self.__ships_by_index[index] = a_ship
+            # copied, since the indices can be a view into a file
+            self.__ship_cells[a_ship] = list(ship_indices)
+
+            a_ship.add_sink_listener(self.__ship_sunk)
+            if not a_ship.is_sunken():
+                self.__ships_left += 1
+
+        # the whole fleet goes to the engine in one go
+        self.__engine.place_cells(index for ship_indices in cell_indices
+                                  for index in ship_indices)
+
+    def get_ship_at(self, coordinate):
+        """Getter for the ship in given coordinate
 
         :param coordinate: str, coordinate (ex. A1)
-        :return: bool, True if the coordinate isn't on the board
+        :return: Ship, ship in the coordinate or None if there is no ship
+        :raises: ValueError, if the given coordinate isn't on the board
         """
 
-        # an empty coordinate is a bad coordinate
-        if coordinate.strip() == "":
-            return True
+        return self.__ships_by_index.get(self.coordinate_to_index(coordinate))
 
-        # tests if the coordinates are within the board's range
-        try:
-            x = coordinate[0]
-            y = int(coordinate[1:])
+    def get_ship_indices(self, a_ship):
+        """Getter for the cell indices of a ship placed on the board
+
+        :param a_ship: Ship, ship placed on the board
+        :return: list, indices of the cells of the ship
+        :raises: ValueError, if a coordinate of the ship isn't on the board
+        """
+
+        if a_ship in self.__ship_cells:
+            return self.__ship_cells[a_ship]
+
+        return [self.coordinate_to_index(coordinate)
+                for coordinate in a_ship.get_coordinate_list()]
+
+    def shoot(self, coordinate):
+        """Shoots at a coordinate, damaging the ship in it if there is one
 
-            if x not in self.get_columns() or \
-                    y not in range(0, self.get_number_of_rows()):
-                return True
+        :param coordinate: str, coordinate (ex. A1)
+        :return: str, one of SHOT_MISS, SHOT_HIT, SHOT_SUNK or
+        SHOT_ALREADY_SHOT
+        :raises: ValueError, if the given coordinate isn't on the board
+        """
+
+        return self.shoot_index(self.coordinate_to_index(coordinate))
+
+    def shoot_index(self, index):
+        """Shoots at a cell, damaging the ship in it if there is one. Tells
+        the shot listeners about every shot that isn't already shot
+
+        :param index: int, index of the cell, as from coordinate_to_index
+        :return: str, one of SHOT_MISS, SHOT_HIT, SHOT_SUNK or
+        SHOT_ALREADY_SHOT
+        """
+
+        if self.__engine.is_shot(index):
+            return SHOT_ALREADY_SHOT
+
+        self.__changed_cells.add(index)
+        if not self.__engine.shoot(index):
+            shot_result = SHOT_MISS
+        else:
+            # the engine only knows that some ship was hit, the index tells
+            # which
+            ship_hit = self.__ships_by_index[index]
+            ship_hit.take_damage(index)
+
+            if ship_hit.is_sunken():
+                shot_result = SHOT_SUNK
             else:
-                return False
+                shot_result = SHOT_HIT
+
+        for listener in self.__shot_listeners:
+            listener(index, shot_result)
+
+        return shot_result
+
+    def is_shot(self, coordinate):
+        """Checks if a coordinate has already been shot at
+
+        :param coordinate: str, coordinate (ex. A1)
+        :return: bool, True if the coordinate has been shot at
+        :raises: ValueError, if the given coordinate isn't on the board
+        """
+
+        return self.__engine.is_shot(self.coordinate_to_index(coordinate))
+
+    def add_sink_listener(self, listener):
+        """Adds a function to be called when a ship on the board sinks
+
+        :param listener: function, called with the sunken Ship as parameter
+        :return:
+        """
+
+        self.__sink_listeners.append(listener)
+
+    def add_shot_listener(self, listener):
+        """Adds a function to be called after every new shot on the board
+
+        :param listener: function, called with the cell index and the shot
+        result as parameters
+        :return:
+        """
+
+        self.__shot_listeners.append(listener)
+
+    def __ship_sunk(self, sunken_ship):
+        """Sink listener of the ships on the board. Marks the ship on the
+        board and passes the event on to the board's own listeners
+
+        :param sunken_ship: Ship, ship that sank
+        :return:
+        """
+
+        self.__ships_left -= 1
+        self.__sunken_ships.append(sunken_ship)
+        self.mark_ship_on_board(sunken_ship)
+
+        for listener in self.__sink_listeners:
+            listener(sunken_ship)
+
+    def get_shot_bitmap(self):
+        """Getter for the cells that have been shot at, as a bitmap with one
+        bit per cell index
+
+        :return: bytes, bitmap of the shot cells
+        """
+
+        return self.__engine.get_shot_bitmap()
+
+    def get_hit_bitmap(self):
+        """Getter for the cells where a shot hit a ship, as a bitmap with one
+        bit per cell index
+
+        :return: bytes, bitmap of the hit cells
+        """
+
+        return self.__engine.get_hit_bitmap()
+
+    def restore_shots(self, shot_bitmap, hit_bitmap, sunken_ships):
+        """Sets the shots of a saved game without shooting them again. The
+        ships must already be placed, carrying the damage they had
+
+        :param shot_bitmap: bytes, bitmap of the shot cells, laid out like
+        get_shot_bitmap
+        :param hit_bitmap: bytes, bitmap of the hit cells
+        :param sunken_ships: list, placed Ships that have sunk, in the order
+        they sank
+        :return:
+        """
+
+        self.__engine.set_bitmaps(shot_bitmap, hit_bitmap)
+
+        # sunken ships weren't counted as left when they were placed
+        for sunken_ship in sunken_ships:
+            self.__sunken_ships.append(sunken_ship)
+            self.mark_ship_on_board(sunken_ship)
+
+    def get_ships_left(self):
+        """Getter for the number of ships on the board that haven't sunk
+
+        :return: int, number of ships left
+        """
+
+        return self.__ships_left
+
+    def get_sunken_ships(self):
+        """Getter for the ships on the board that have sunk
+
+        :return: list, Ships in the order they sank
+        """
+
+        return self.__sunken_ships
+
+    def all_ships_sunk(self):
+        """Checks if every ship placed on the board has sunk
+
+        :return: bool, True if all ships on the board are sunk
+        """
+
+        return self.__ships_left == 0
+
+    def bad_coordinate(self, coordinate):
+        """Checks if a coordinate is on the board
+
+        :param coordinate: str, coordinate (ex. A1)
+        :return: bool, True if the coordinate isn't on the board
+        """
 
         # a ValueError always means a bad coordinate. Either x or y is just not
-        # the right datatype
+        # the right datatype or the coordinate is outside the board
+        try:
+            self.coordinate_to_index(coordinate)
         except ValueError:
             return True
 
+        return False
+
+
+class AnsiBoardRenderer:
+    """
+    Draws a board on an ANSI terminal. The first frame is drawn whole at the
+    top of the screen, after that only the cells changed since the last frame
+    are redrawn by moving the cursor straight to them. Everything is written
+    with a single write per frame.
+    """
+
+    def __init__(self, game_board, output=sys.stdout):
+        """Initializes a renderer for a board
+
+        :param game_board: Board, board to draw
+        :param output: file, terminal to draw on
+        """
+
+        self.__game_board = game_board
+        self.__output = output
+        self.__frame_drawn = False
+
+        # the board takes the first line of the screen for the column letters
+        # and one line per row, followed by the column letters again
+        self.__frame_height = game_board.get_number_of_rows() + 2
+
+    def render(self):
+        """Draws the board, or only its changed cells if it has been drawn
+        already. The cursor is left where it was
+
+        :return:
+        """
+
+        changed_cells = self.__game_board.pop_changed_cells()
+
+        if not self.__frame_drawn:
+            self.__frame_drawn = True
+            # clear the screen, draw from the top left and leave the cursor
+            # under the board
+            self.__output.write("\x1b[2J\x1b[H" +
+                                "\n".join(self.__game_board.frame_lines()) +
+                                "\n\n")
+            self.__output.flush()
+            return
+
+        if not changed_cells:
+            return
+
+        width = len(self.__game_board.get_columns())
+
+        # save the cursor, redraw the cells and restore the cursor
+        frame = ["\x1b7"]
+        for index in changed_cells:
+            row_number, column_number = divmod(index, width)
+            # terminal lines and columns start from 1. Each row starts with
+            # its number and a space, and each cell takes two characters
+            screen_line = row_number + 2
+            screen_column = len(str(row_number)) + 2 * column_number + 2
+            frame.append(f"\x1b[{screen_line};{screen_column}H"
+                         f"{self.__game_board.index_mark(index)}")
+        frame.append("\x1b8")
+
+        self.__output.write("".join(frame))
+        self.__output.flush()
+
+    def clear_messages(self):
+        """Clears everything printed under the board and moves the cursor
+        there
+
+        :return:
+        """
+
+        self.__output.write(f"\x1b[{self.__frame_height + 2};1H\x1b[J")
+        self.__output.flush()
 
-def read_lines_from_file(file_name):
-    """Reads lines from file and returns a list of them
+
+def iterate_lines_from_file(file_name, use_mmap=False):
+    """Reads lines from file one at a time without keeping the whole file in
+    memory
 
     :param file_name: str, name of file to read
-    :return: list, list of lines in file as strings
+    :param use_mmap: bool, True to memory map the file instead of reading it
+    through a buffer. Works best for very large files
+    :return: generator, lines in file as stripped strings
     :raises: OSError, if the file can't be read
     """
 
-    list_of_lines = []
-
     try:
         # open the file
-        ship_file = open(file_name, mode="r")
+        if use_mmap:
+            ship_file = open(file_name, mode="rb")
+        else:
+            ship_file = open(file_name, mode="r", buffering=READ_BUFFER_SIZE)
     except OSError:
         raise OSError("File can not be read!")
 
-    # operate on the file
-    for line in ship_file:
-        # strip each file of empty spaces. Especially important considering
-        # line break at the end of each line.
-        line_stripped = line.strip()
-        # add the stripped line to the list of lines
-        list_of_lines.append(line_stripped)
+    with ship_file:
+        if not use_mmap:
+            # strip each line of empty spaces. Especially important
+            # considering line break at the end of each line.
+            for line in ship_file:
+                yield line.strip()
+            return
 
-    # close the file
-    ship_file.close()
+        # an empty file can't be memory mapped, and has no lines anyway
+        if ship_file.seek(0, 2) == 0:
+            return
 
-    return list_of_lines
+        with mmap.mmap(ship_file.fileno(), 0,
+                       access=mmap.ACCESS_READ) as mapped_file:
+            for line in iter(mapped_file.readline, b""):
+                yield line.decode().strip()
 
 
-def lines_to_ship_list(list_of_strings, game_board):
-    """Compile a list of ships from input list of strings
+def read_lines_from_file(file_name):
+    """Reads lines from file and returns a list of them
 
-    :param list_of_strings: list, list of ships in string format
-    ship_type;coordinates (example "battleship;A1;A2;A3;A4")
+    :param file_name: str, name of file to read
+    :return: list, list of lines in file as strings
+    :raises: OSError, if the file can't be read
+    """
+
+    return list(iterate_lines_from_file(file_name))
+
+
+def iterate_ships(list_of_strings, game_board, file_name=None):
+    """Parses and validates ships one line at a time. Lines are only read as
+    the ships are asked for, so the lines can come straight from a file.
+
+    Once every line has been read, the ships are placed on game_board.
+
+    :param list_of_strings: iterable, ships in string format
+    ship_type;coordinates (example "battleship;A1;A2;A3;A4"). Empty lines are
+    skipped
     :param game_board: Board, board to check coordinate validity in relation to
-    :return: list, list of Ships
-    :raises: ValueError: if there is an error in ship coordinates or there are
-    overlapping ships in the file
+    :param file_name: str, name of the file the lines come from. Only used in
+    error messages
+    :return: generator, Ships in the order they were read
+    :raises: ValueError: if a line can't be read as a ship, a ship repeats a
+    coordinate or there are overlapping ships. The error tells the file name
+    and line number.
+    Every overlapping coordinate is listed in the error with the line numbers
+    of the ships in it
     """
 
+    if file_name is None:
+        error_location = "line {line_number}"
+    else:
+        error_location = f"{file_name}, line {{line_number}}"
+
     ship_list = []
+    cell_indices = []
+
+    # every occupied cell index mapped to the line of the first ship in it.
+    # Each cell is checked once against this instead of every ship against
+    # every other ship
+    occupied_cells = {}
+    # cells claimed more than once mapped to their coordinate and the lines
+    # claiming them
+    conflicts = {}
+
+    for line_number, ship_unit in enumerate(list_of_strings, start=1):
+        if ship_unit == "":
+            continue
+
+        location = error_location.format(line_number=line_number)
 
-    for ship_unit in list_of_strings:
         # first splits the string into ship type and coordinates
+        if ";" not in ship_unit:
+            raise ValueError(f"{location}: Ship has no coordinates!")
         ship_type, coord_string = ship_unit.split(";", maxsplit=1)
         # then splits all the coordinates into a list
         coord_list = coord_string.split(";")
 
+        if ship_type not in SHIP_TYPES:
+            raise ValueError(f"{location}: Unknown ship type {ship_type}!")
+
         # checks if all coordinates are on the board
-        for coordinate in coord_list:
-            if not game_board.bad_coordinate(coordinate):
-                pass
+        try:
+            ship_indices = [game_board.coordinate_to_index(coordinate)
+                            for coordinate in coord_list]
+        except ValueError:
+            raise ValueError(f"{location}: Error in ship coordinates!")
+
+        # a ship can't cover the same cell twice. Checked before the cells
+        # are claimed, so the ship isn't reported overlapping itself
+        ship_cells = set()
+        for coordinate, index in zip(coord_list, ship_indices):
+            if index in ship_cells:
+                raise ValueError(f"{location}: Ship repeats {coordinate}!")
+            ship_cells.add(index)
+
+        # claims the cells of the ship, remembering every cell that was
+        # already taken
+        for coordinate, index in zip(coord_list, ship_indices):
+            if index in occupied_cells:
+                if index not in conflicts:
+                    conflicts[index] = (coordinate, [occupied_cells[index]])
+                # each line is listed once
+                if conflicts[index][1][-1] != line_number:
+                    conflicts[index][1].append(line_number)
             else:
-                raise ValueError("Error in ship coordinates!")
+                occupied_cells[index] = line_number
 
         # turns the ship type and coordinates into a ship
         ship_to_be_added = Ship(ship_type, coord_list)
+        ship_list.append(ship_to_be_added)
+        cell_indices.append(ship_indices)
 
-        # the resulting ship is then checked against other ships already added
-        # to the list
-        for ship_already_in_list in ship_list:
-            if ship_to_be_added.overlap(ship_already_in_list):
-                raise ValueError("There are overlapping ships in the "
-                                 "input file!")
+        yield ship_to_be_added
 
-        ship_list.append(ship_to_be_added)
+    if conflicts:
+        error_message = "There are overlapping ships in the input file!"
+        if file_name is not None:
+            error_message = f"{file_name}: {error_message}"
+        for coordinate, line_numbers in conflicts.values():
+            lines_text = ", ".join(str(line_number)
+                                   for line_number in line_numbers)
+            error_message += f"\n{coordinate} on lines {lines_text}"
+        raise ValueError(error_message)
 
-    return ship_list
+    game_board.place_ships(ship_list, cell_indices)
+
+
+def lines_to_ship_list(list_of_strings, game_board, file_name=None):
+    """Compile a list of ships from input list of strings
+
+    :param list_of_strings: iterable, ships in string format
+    ship_type;coordinates (example "battleship;A1;A2;A3;A4")
+    :param game_board: Board, board to check coordinate validity in relation
+    to. The ships are also placed on it, which builds its fleet index
+    :param file_name: str, name of the file the lines come from. Only used in
+    error messages
+    :return: list, list of Ships
+    :raises: ValueError: if there is an error in ship coordinates or there are
+    overlapping ships in the file. See iterate_ships
+    """
+
+    return list(iterate_ships(list_of_strings, game_board, file_name))
+
+
+def load_ships_from_file(file_name, game_board, use_mmap=False):
+    """Streams ships from a file straight into a list of Ships. The file is
+    parsed as it is read, so only the fleet itself is kept in memory.
+
+    :param file_name: str, name of file to read
+    :param game_board: Board, board to place the ships on
+    :param use_mmap: bool, True to memory map the file instead of reading it
+    through a buffer
+    :return: list, list of Ships
+    :raises: OSError, if the file can't be read
+    :raises: ValueError, if there is an error in the ships of the file
+    """
+
+    return lines_to_ship_list(iterate_lines_from_file(file_name, use_mmap),
+                              game_board, file_name)
 
 
 def sunken_ships_check(list_of_ships, list_of_sunken_ships, game_board):
     """Updates list_of_sunken_ships according to sunken ships on list_of_ships
-    and marks newly sunken ships on the given board
+    and marks newly sunken ships on the given board. Goes through the whole
+    fleet, so the game itself uses the sink events of Board instead
 
     :param list_of_ships: list, list of all Ships in the game
     :param list_of_sunken_ships: list, list of Ships that have been sunken
@@ -353,35 +1418,49 @@ def sunken_ships_check(list_of_ships, list_of_sunken_ships, game_board):
             list_of_sunken_ships.append(a_ship)
 
 
-def main():
-    # a list to add sunken ships to as they sink
-    list_of_sunken_ships = []
+def play_in_terminal(game_board, ansi_rendering=False):
+    """Plays a game on a board that already has its ships, asking the player
+    for shots until every ship has sunk or the player quits
 
-    # initialize a board for the game
-    game_board = Board()
+    :param game_board: Board, board with the fleet placed on it
+    :param ansi_rendering: bool, True to draw the board once and only redraw
+    the cells that change, instead of printing the whole board every turn.
+    Needs an ANSI terminal
+    :return: bool, True if the game was won
+    """
 
-    # read all the ship info from the file
-    try:
-        list_of_ship_info = read_lines_from_file(input("Enter file name: "))
-    except OSError as error_message:
-        print(error_message)
-        return
+    def announce_sinking(sunken_ship):
+        """Local function for informing the player when the board tells that
+        a ship sank
 
-    # turn the lines into Ship objects
-    try:
-        list_of_ships = lines_to_ship_list(list_of_ship_info, game_board)
-    except ValueError as error_message:
-        print(error_message)
-        return
+        :param sunken_ship: Ship, ship that sank
+        :return:
+        """
+        print(f"You sank a {sunken_ship.get_ship_type()}!")
+
+    game_board.add_sink_listener(announce_sinking)
+
+    if ansi_rendering:
+        renderer = AnsiBoardRenderer(game_board)
+        # the board is drawn through the renderer instead
+        print_board = renderer.render
+    else:
+        renderer = None
+        print_board = game_board.printout
 
     # print the game board to start with
-    game_board.printout()
+    print_board()
 
     # flag variable for the upcoming loop
-    won = False
+    won = game_board.all_ships_sunk()
 
     # loop for playing the game itself
     while not won:
+        # the messages of the last turn would otherwise pile up under the
+        # board
+        if renderer is not None:
+            renderer.clear_messages()
+
         players_command = input("Enter place to shoot (q to quit): ")
 
         # change the player's command to uppercase to simplify handling it
@@ -389,27 +1468,16 @@ def main():
 
         if players_command == QUIT_COMMAND:
             print("Aborting game!")
-            return
+            return False
 
         try:
-            # if the coordinate on the board hasn't yet been marked
-            if game_board.get_mark(players_command) == " ":
-                # initialize marker to be placed on the board in given
-                # coordinate
-                marker = "*"
-                # if the shot hits a ship, change the marker to X and make the
-                # ship take damage
-                for a_ship in list_of_ships:
-                    if players_command in a_ship.get_coordinate_list():
-                        marker = "X"
-                        a_ship.take_damage()
-
-                    # mark appropriate marker on board
-                    game_board.mark_on_board(players_command, marker)
+            # the board marks the shot and damages the ship that was hit. If
+            # the ship sinks, the board marks it and announces it
+            shot_result = game_board.shoot(players_command)
 
             # if coordinate is valid but has a mark already on it, it has
             # already been shot at
-            else:
+            if shot_result == SHOT_ALREADY_SHOT:
                 print("Location has already been shot at!")
 
         # the previous try statement returns a ValueError if the coordinate
@@ -417,18 +1485,150 @@ def main():
         except ValueError:
             print("Invalid command!")
 
-        # updates sunken ships
-        sunken_ships_check(list_of_ships, list_of_sunken_ships, game_board)
         # prints the board
-        game_board.printout()
+        print_board()
 
-        # if as many Ships have been sunken as there are Ships in the game,
-        # the game has been won
-        if len(list_of_sunken_ships) == len(list_of_ships):
+        # if the board has no ships left, the game has been won
+        if game_board.all_ships_sunk():
             won = True
 
     print("Congratulations! You sank all enemy ships.", end="")
+    return True
+
+
+def play_scripted(game_board, shot_lines, output=sys.stdout):
+    """Plays a game from a stream of commands without asking anything or
+    printing the board after every shot. Writes one JSON object per line:
+    the result of each shot, the board when a PRINT_COMMAND asks for it and
+    finally a summary of the game
+
+    :param game_board: Board, board with the fleet placed on it
+    :param shot_lines: iterable, commands: coordinates to shoot,
+    PRINT_COMMAND or QUIT_COMMAND. Blank lines are skipped
+    :param output: file, where the JSON lines are written
+    :return: dict, the summary of the game
+    """
+
+    # results counted by kind for the summary
+    result_counts = {SHOT_MISS: 0, SHOT_HIT: 0, SHOT_SUNK: 0,
+                     SHOT_ALREADY_SHOT: 0, SHOT_INVALID: 0}
+    shots_fired = 0
+
+    for line_number, command in enumerate(shot_lines, start=1):
+        command = command.strip().upper()
+
+        if command == "":
+            continue
+        if command == QUIT_COMMAND:
+            break
+        if command == PRINT_COMMAND:
+            output.write(json.dumps({"line": line_number,
+                                     "board": game_board.frame_lines()}))
+            output.write("\n")
+            continue
+
+        shot_report = {"line": line_number, "shot": command}
+        try:
+            shot_result = game_board.shoot(command)
+        except ValueError:
+            shot_result = SHOT_INVALID
+
+        result_counts[shot_result] += 1
+        shot_report["result"] = shot_result
+        if shot_result == SHOT_SUNK:
+            shot_report["ship"] = \
+                game_board.get_sunken_ships()[-1].get_ship_type()
+        if shot_result in (SHOT_MISS, SHOT_HIT, SHOT_SUNK):
+            shots_fired += 1
+
+        output.write(json.dumps(shot_report))
+        output.write("\n")
+
+        # shots after the last ship sank wouldn't mean anything
+        if game_board.all_ships_sunk():
+            break
+
+    summary = {
+        "shots": shots_fired,
+        "misses": result_counts[SHOT_MISS],
+        "hits": result_counts[SHOT_HIT] + result_counts[SHOT_SUNK],
+        "already_shot": result_counts[SHOT_ALREADY_SHOT],
+        "invalid": result_counts[SHOT_INVALID],
+        "sunk": [sunken_ship.get_ship_type()
+                 for sunken_ship in game_board.get_sunken_ships()],
+        "ships_left": game_board.get_ships_left(),
+        "won": game_board.all_ships_sunk()
+    }
+    output.write(json.dumps({"summary": summary}))
+    output.write("\n")
+
+    return summary
+
+
+def main_scripted(arguments):
+    """Plays a game non-interactively, see play_scripted
+
+    :param arguments: list, the fleet file and optionally the file of shots.
+    The shots are read from standard input if there is no file or it is "-"
+    :return: bool, True if the game was played and every command of the
+    script was valid
+    """
+
+    if len(arguments) not in (1, 2):
+        print("Usage: python Laivanupotus_v3.py --script <fleet file> "
+              "[<shot file>]")
+        return False
+
+    game_board = Board()
+
+    try:
+        load_ships_from_file(arguments[0], game_board)
+    except (OSError, ValueError) as error_message:
+        print(error_message, file=sys.stderr)
+        return False
+
+    if len(arguments) == 1 or arguments[1] == "-":
+        summary = play_scripted(game_board, sys.stdin)
+    else:
+        try:
+            with open(arguments[1], mode="r") as shot_file:
+                summary = play_scripted(game_board, shot_file)
+        except OSError as error_message:
+            print(error_message, file=sys.stderr)
+            return False
+
+    return summary["invalid"] == 0
+
+
+def main(ansi_rendering=False):
+    """Plays a game in the terminal
+
+    :param ansi_rendering: bool, True to draw the board once and only redraw
+    the cells that change, instead of printing the whole board every turn.
+    Needs an ANSI terminal
+    :return:
+    """
+
+    # initialize a board for the game
+    game_board = Board()
+
+    # read the ship info from the file and place the Ship objects on the
+    # board, which keeps track of them from there on
+    try:
+        load_ships_from_file(input("Enter file name: "), game_board)
+    except OSError as error_message:
+        print(error_message)
+        return
+    except ValueError as error_message:
+        print(error_message)
+        return
+
+    play_in_terminal(game_board, ansi_rendering)
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["--script"]:
+        # the exit status tells scripts and CI whether the game went through
+        sys.exit(0 if main_scripted(sys.argv[2:]) else 1)
+    else:
+        main(ansi_rendering="--ansi" in sys.argv[1:])
@@ -0,0 +1,283 @@
+"""
+Compiled binary fleet files for Laivanupotus. Text fleet files have to be
+split and parsed for every coordinate on every load, so a fleet that is loaded
+many times can be compiled once into this format and memory mapped instead.
+
+File layout, all numbers little-endian:
+    header    magic b"LVUF", version (uint16), reserved (uint16),
+              board width (uint32), board height (uint32),
+              number of ships (uint32), number of cells (uint32)
+    offsets   uint32 * (number of ships + 1), where the cells of ship i are
+              cells[offsets[i]:offsets[i + 1]]
+    cells     uint32 * number of cells, cell indices as in Board
+    types     uint8 * number of ships, index of the type in SHIP_TYPES
+
+Usage: python binary_fleet.py ships.txt ships.fleet
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+
+from Laivanupotus_v3 import SHIP_TYPES, Board, Ship, load_ships_from_file
+
+FLEET_MAGIC = b"LVUF"
+FLEET_VERSION = 1
+HEADER_FORMAT = "<4sHHIIII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# ship types in the order their codes are stored in the file
+SHIP_TYPE_CODES = list(SHIP_TYPES)
+
+
+class BinaryFleet:
+    """
+    A memory mapped binary fleet file. Offsets, cells and types are
+    memoryviews straight into the mapped file, so reading them copies nothing.
+    Only the cells handed out by get_cell_indices are copies, so nothing
+    outside the fleet points into the mapping when it is closed.
+    """
+
+    def __init__(self, file_name):
+        """Opens and memory maps a binary fleet file
+
+        :param file_name: str, name of the binary fleet file
+        :raises: OSError, if the file can't be read
+        :raises: ValueError, if the file isn't a valid binary fleet file
+        """
+
+        try:
+            with open(file_name, mode="rb") as fleet_file:
+                self.__mapped_file = mmap.mmap(fleet_file.fileno(), 0,
+                                               access=mmap.ACCESS_READ)
+        except OSError:
+            raise OSError("File can not be read!")
+        except ValueError:
+            # mmap refuses empty files
+            raise ValueError(f"{file_name}: Not a binary fleet file!")
+
+        if len(self.__mapped_file) < HEADER_SIZE:
+            self.__mapped_file.close()
+            raise ValueError(f"{file_name}: Not a binary fleet file!")
+
+        magic, version, _, self.__width, self.__height, \
+            self.__number_of_ships, number_of_cells = \
+            struct.unpack_from(HEADER_FORMAT, self.__mapped_file)
+
+        expected_size = HEADER_SIZE + 4 * (self.__number_of_ships + 1) + \
+            4 * number_of_cells + self.__number_of_ships
+        if magic != FLEET_MAGIC or version != FLEET_VERSION or \
+                len(self.__mapped_file) != expected_size:
+            self.__mapped_file.close()
+            raise ValueError(f"{file_name}: Not a binary fleet file!")
+
+        whole_file = memoryview(self.__mapped_file)
+        cells_start = HEADER_SIZE + 4 * (self.__number_of_ships + 1)
+        types_start = cells_start + 4 * number_of_cells
+
+        if sys.byteorder == "little":
+            self.__offsets = whole_file[HEADER_SIZE:cells_start].cast("I")
+            self.__cells = whole_file[cells_start:types_start].cast("I")
+        else:
+            # the file is little-endian, so big-endian machines need a copy
+            self.__offsets = array("I", whole_file[HEADER_SIZE:cells_start])
+            self.__cells = array("I", whole_file[cells_start:types_start])
+            self.__offsets.byteswap()
+            self.__cells.byteswap()
+        self.__types = whole_file[types_start:]
+        whole_file.release()
+
+        # the offsets have to split the cells into ships from the first cell
+        # to the last one, or the ships would read past the cells
+        if self.__offsets[0] != 0 or \
+                self.__offsets[-1] != number_of_cells or \
+                any(ship_start > ship_end for ship_start, ship_end
+                    in zip(self.__offsets, self.__offsets[1:])):
+            self.close()
+            raise ValueError(f"{file_name}: Not a binary fleet file!")
+
+        # a cell outside the board would break the board the fleet goes on
+        if number_of_cells > 0 and \
+                max(self.__cells) >= self.__width * self.__height or \
+                self.__number_of_ships > 0 and \
+                max(self.__types) >= len(SHIP_TYPE_CODES):
+            self.close()
+            raise ValueError(f"{file_name}: Not a binary fleet file!")
+
+    def get_width(self):
+        """Getter for the width of the board the fleet was compiled for
+
+        :return: int, number of columns
+        """
+
+        return self.__width
+
+    def get_height(self):
+        """Getter for the height of the board the fleet was compiled for
+
+        :return: int, number of rows
+        """
+
+        return self.__height
+
+    def get_number_of_ships(self):
+        """Getter for the number of ships in the fleet
+
+        :return: int, number of ships
+        """
+
+        return self.__number_of_ships
+
+    def get_ship_type(self, ship_number):
+        """Getter for the type of a ship
+
+        :param ship_number: int, index of the ship in the file
+        :return: str, ship type
+        """
+
+        return SHIP_TYPE_CODES[self.__types[ship_number]]
+
+    def get_cell_indices(self, ship_number):
+        """Getter for the cells of a ship. They are copied out of the
+        mapping, so they stay usable after the fleet is closed
+
+        :param ship_number: int, index of the ship in the file
+        :return: list, cell indices of the ship
+        """
+
+        return self.__cells[self.__offsets[ship_number]:
+                            self.__offsets[ship_number + 1]].tolist()
+
+    def to_ship_list(self, game_board):
+        """Places the fleet on a board and makes Ships out of it. The fleet
+        was validated when it was compiled, so nothing is parsed or checked
+        for overlap here.
+
+        :param game_board: Board, board of the same size the fleet was
+        compiled for
+        :return: list, list of Ships
+        :raises: ValueError, if the board is the wrong size
+        """
+
+        if len(game_board.get_columns()) != self.__width or \
+                game_board.get_number_of_rows() != self.__height:
+            raise ValueError("The fleet was compiled for a board of "
+                             "different size!")
+
+        ship_list = []
+        cell_indices = []
+
+        for ship_number in range(0, self.__number_of_ships):
+            ship_indices = self.get_cell_indices(ship_number)
+            coordinates = [game_board.index_to_coordinate(index)
+                           for index in ship_indices]
+            ship_list.append(Ship(self.get_ship_type(ship_number),
+                                  coordinates))
+            cell_indices.append(ship_indices)
+
+        game_board.place_ships(ship_list, cell_indices)
+
+        return ship_list
+
+    def close(self):
+        """Unmaps the file. The fleet can't be used after this.
+
+        :return:
+        """
+
+        # the mapping can only be closed once nothing points into it
+        for view in (self.__offsets, self.__cells, self.__types):
+            if isinstance(view, memoryview):
+                view.release()
+        self.__mapped_file.close()
+
+
+def write_binary_fleet(file_name, list_of_ships, game_board):
+    """Writes ships into a binary fleet file
+
+    :param file_name: str, name of the file to write
+    :param list_of_ships: list, list of Ships, already validated
+    :param game_board: Board, board the ships are on
+    :return:
+    :raises: OSError, if the file can't be written
+    """
+
+    offsets = array("I", [0])
+    cells = array("I")
+    types = bytearray()
+
+    for a_ship in list_of_ships:
+        for coordinate in a_ship.get_coordinate_list():
+            cells.append(game_board.coordinate_to_index(coordinate))
+        offsets.append(len(cells))
+        types.append(SHIP_TYPE_CODES.index(a_ship.get_ship_type()))
+
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        cells.byteswap()
+
+    header = struct.pack(HEADER_FORMAT, FLEET_MAGIC, FLEET_VERSION, 0,
+                         len(game_board.get_columns()),
+                         game_board.get_number_of_rows(),
+                         len(list_of_ships), len(cells))
+
+    with open(file_name, mode="wb") as fleet_file:
+        fleet_file.write(header)
+        fleet_file.write(offsets.tobytes())
+        fleet_file.write(cells.tobytes())
+        fleet_file.write(types)
+
+
+def compile_fleet_file(text_file_name, binary_file_name, game_board):
+    """Converts a text fleet file into a binary fleet file. The ships are
+    validated exactly like when the text file is loaded for a game.
+
+    :param text_file_name: str, name of the text fleet file
+    :param binary_file_name: str, name of the binary file to write
+    :param game_board: Board, board to validate the ships against
+    :return: int, number of ships compiled
+    :raises: OSError, if either file can't be used
+    :raises: ValueError, if there is an error in the ships of the text file
+    """
+
+    list_of_ships = load_ships_from_file(text_file_name, game_board)
+    write_binary_fleet(binary_file_name, list_of_ships, game_board)
+
+    return len(list_of_ships)
+
+
+def load_binary_fleet(file_name, game_board):
+    """Loads the ships of a binary fleet file onto a board
+
+    :param file_name: str, name of the binary fleet file
+    :param game_board: Board, board to place the ships on
+    :return: list, list of Ships
+    :raises: OSError, if the file can't be read
+    :raises: ValueError, if the file is invalid or for another board size
+    """
+
+    binary_fleet = BinaryFleet(file_name)
+    try:
+        return binary_fleet.to_ship_list(game_board)
+    finally:
+        binary_fleet.close()
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python binary_fleet.py <text fleet> <binary fleet>")
+        return
+
+    try:
+        number_of_ships = compile_fleet_file(sys.argv[1], sys.argv[2],
+                                             Board())
+    except (OSError, ValueError) as error_message:
+        print(error_message)
+        return
+
+    print(f"Compiled {number_of_ships} ships into {sys.argv[2]}.")
+
+
+if __name__ == "__main__":
+    main()
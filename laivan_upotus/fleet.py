@@ -0,0 +1,425 @@
+"""
+Compact fleets for Laivanupotus. A Fleet keeps all of its ships in a few
+flat arrays instead of one Ship object each:
+
+    types      uint8 type code of each ship (see SHIP_TYPE_CODES)
+    health     int16 health left of each ship
+    offsets    uint32 position of the first cell of each ship in cells, plus
+               the end of the last ship
+    cells      uint32 cell indices of every ship, one ship after another
+    hit flags  one byte per cell in cells, 1 once the cell has been hit
+
+A ship costs a few bytes plus four bytes and a flag per cell, so millions of
+ships fit in memory. The arrays support the buffer protocol, so they can be
+wrapped with numpy.frombuffer without copying.
+
+ShipView gives the interface of Ship over one ship of a Fleet, so fleets can
+be placed on a Board and played like a list of Ships. Damage is counted per
+cell: hitting a cell that has already been hit does nothing.
+"""
+
+from array import array
+
+from Laivanupotus_v3 import BOARD_COLUMNS, SHIP_TYPES
+from binary_fleet import SHIP_TYPE_CODES
+
+
+class Fleet:
+    """
+    Ships stored as parallel flat arrays, see the module docstring.
+    """
+
+    def __init__(self, board_columns=BOARD_COLUMNS):
+        """Initializes an empty fleet
+
+        :param board_columns: list, column names of the board the fleet is on.
+        Used to turn cell indices back into coordinates
+        """
+
+        self.__board_columns = board_columns
+        self.__width = len(board_columns)
+
+        self.__types = array("B")
+        self.__health = array("h")
+        self.__offsets = array("I", [0])
+        self.__cells = array("I")
+        self.__hit_flags = bytearray()
+
+        # sink listeners by ship number. Most ships never get any, so they
+        # are only stored for the ships that do
+        self.__sink_listeners = {}
+        self.__ships_left = 0
+
+    def add_ship(self, ship_type, cell_indices):
+        """Adds a ship to the fleet
+
+        :param ship_type: str, ship type, one of SHIP_TYPES
+        :param cell_indices: iterable, indices of the cells of the ship
+        :return: int, number of the new ship
+        :raises: ValueError, if the ship type is unknown
+        """
+
+        if ship_type not in SHIP_TYPES:
+            raise ValueError(f"Unknown ship type {ship_type}!")
+
+        self.__types.append(SHIP_TYPE_CODES.index(ship_type))
+        self.__health.append(SHIP_TYPES[ship_type])
+        self.__cells.extend(cell_indices)
+        self.__offsets.append(len(self.__cells))
+        self.__hit_flags.extend(bytes(len(self.__cells) -
+                                      len(self.__hit_flags)))
+        self.__ships_left += 1
+
+        return len(self.__types) - 1
+
+    def get_board_columns(self):
+        """Getter for the column names of the board of the fleet
+
+        :return: list, column names
+        """
+
+        return self.__board_columns
+
+    def get_number_of_ships(self):
+        """Getter for the number of ships in the fleet
+
+        :return: int, number of ships
+        """
+
+        return len(self.__types)
+
+    def get_ships_left(self):
+        """Getter for the number of ships that haven't sunk
+
+        :return: int, number of ships left
+        """
+
+        return self.__ships_left
+
+    def get_ship_type(self, ship_number):
+        """Getter for the type of a ship
+
+        :param ship_number: int, number of the ship
+        :return: str, ship type
+        """
+
+        return SHIP_TYPE_CODES[self.__types[ship_number]]
+
+    def get_ship_health(self, ship_number):
+        """Getter for the health left of a ship
+
+        :param ship_number: int, number of the ship
+        :return: int, health left
+        """
+
+        return self.__health[ship_number]
+
+    def get_cell_indices(self, ship_number):
+        """Getter for the cells of a ship
+
+        :param ship_number: int, number of the ship
+        :return: array, cell indices of the ship
+        """
+
+        return self.__cells[self.__offsets[ship_number]:
+                            self.__offsets[ship_number + 1]]
+
+    def get_coordinate_list(self, ship_number):
+        """Getter for the cells of a ship as coordinates
+
+        :param ship_number: int, number of the ship
+        :return: list, coordinates of the ship (ex. ["A1", "A2"])
+        """
+
+        coordinates = []
+        for index in self.get_cell_indices(ship_number):
+            row_number, column_number = divmod(index, self.__width)
+            coordinates.append(
+                f"{self.__board_columns[column_number]}{row_number}")
+
+        return coordinates
+
+    def get_arrays(self):
+        """Getter for the arrays of the fleet. They are the fleet's own, not
+        copies, and must not be resized while exported
+
+        :return: tuple, (types, health, offsets, cells, hit flags)
+        """
+
+        return self.__types, self.__health, self.__offsets, self.__cells, \
+            self.__hit_flags
+
+    def copy(self):
+        """Makes an undamaged copy of the fleet without sink listeners, for
+        playing a fleet that is shared between games
+
+        :return: Fleet, the copy
+        """
+
+        fleet_copy = Fleet(self.__board_columns)
+        fleet_copy.__types = array("B", self.__types)
+        fleet_copy.__offsets = array("I", self.__offsets)
+        fleet_copy.__cells = array("I", self.__cells)
+        fleet_copy.__hit_flags = bytearray(len(self.__hit_flags))
+        fleet_copy.reset()
+
+        return fleet_copy
+
+    def get_ship(self, ship_number):
+        """Getter for a ship of the fleet as a Ship-like view
+
+        :param ship_number: int, number of the ship
+        :return: ShipView, view of the ship
+        """
+
+        return ShipView(self, ship_number)
+
+    def get_ships(self):
+        """Getter for every ship of the fleet as Ship-like views, in the
+        place of a list of Ships
+
+        :return: list, ShipViews in ship number order
+        """
+
+        return [ShipView(self, ship_number)
+                for ship_number in range(0, len(self.__types))]
+
+    def is_sunken(self, ship_number):
+        """Checks if a ship has sunk
+
+        :param ship_number: int, number of the ship
+        :return: bool, True if the ship has no health left
+        """
+
+        return self.__health[ship_number] < 1
+
+    def add_sink_listener(self, ship_number, listener):
+        """Adds a function to be called when a ship sinks
+
+        :param ship_number: int, number of the ship
+        :param listener: function, called with a ShipView of the sunken ship
+        as parameter
+        :return:
+        """
+
+        self.__sink_listeners.setdefault(ship_number, []).append(listener)
+
+    def damage_cell(self, ship_number, index):
+        """Hits a cell of a ship. Only the first hit on each cell does
+        damage. If the hit sinks the ship, tells its sink listeners
+
+        :param ship_number: int, number of the ship
+        :param index: int, index of the hit cell
+        :return: bool, True if the hit did damage
+        :raises: ValueError, if the cell isn't part of the ship
+        """
+
+        # ships are only a few cells long, so the cell is looked up in place
+        start = self.__offsets[ship_number]
+        end = self.__offsets[ship_number + 1]
+        for position in range(start, end):
+            if self.__cells[position] == index:
+                break
+        else:
+            raise ValueError("Cell is not part of the ship!")
+
+        if self.__hit_flags[position]:
+            return False
+
+        self.__hit_flags[position] = 1
+        self.__health[ship_number] -= 1
+
+        # only the hit that takes the last point of health sinks the ship
+        if self.__health[ship_number] == 0:
+            self.__ships_left -= 1
+            for listener in self.__sink_listeners.get(ship_number, []):
+                listener(ShipView(self, ship_number))
+
+        return True
+
+    def is_cell_hit(self, ship_number, index):
+        """Checks if a cell of a ship has been hit
+
+        :param ship_number: int, number of the ship
+        :param index: int, index of the cell
+        :return: bool, True if the cell has been hit
+        """
+
+        start = self.__offsets[ship_number]
+        end = self.__offsets[ship_number + 1]
+        for position in range(start, end):
+            if self.__cells[position] == index:
+                return self.__hit_flags[position] == 1
+
+        return False
+
+    def reset(self):
+        """Repairs every ship, so the fleet can be played again. Sink
+        listeners are kept
+
+        :return:
+        """
+
+        self.__health[:] = array("h", [SHIP_TYPES[SHIP_TYPE_CODES[type_code]]
+                                       for type_code in self.__types])
+        self.__hit_flags[:] = bytes(len(self.__hit_flags))
+        self.__ships_left = len(self.__types)
+
+
+class ShipView:
+    """
+    One ship of a Fleet with the interface of Ship. Holds only the fleet and
+    the ship number, so views can be made and thrown away freely. Two views
+    of the same ship are equal.
+    """
+
+    __slots__ = ("__fleet", "__ship_number")
+
+    def __init__(self, ship_fleet, ship_number):
+        """Initializes a view of a ship
+
+        :param ship_fleet: Fleet, fleet the ship is in
+        :param ship_number: int, number of the ship in the fleet
+        """
+
+        self.__fleet = ship_fleet
+        self.__ship_number = ship_number
+
+    def __eq__(self, other):
+        return isinstance(other, ShipView) and \
+            self.__fleet is other.get_fleet() and \
+            self.__ship_number == other.get_ship_number()
+
+    def __hash__(self):
+        return hash((id(self.__fleet), self.__ship_number))
+
+    def get_fleet(self):
+        """Getter for the fleet of the ship
+
+        :return: Fleet, fleet the ship is in
+        """
+
+        return self.__fleet
+
+    def get_ship_number(self):
+        """Getter for the number of the ship in its fleet
+
+        :return: int, ship number
+        """
+
+        return self.__ship_number
+
+    def get_ship_type(self):
+        """Getter for ship type
+
+        :return: str, ship type
+        """
+
+        return self.__fleet.get_ship_type(self.__ship_number)
+
+    def get_coordinate_list(self):
+        """Getter for coordinate list
+
+        :return: list, list of ship coordinates
+        """
+
+        return self.__fleet.get_coordinate_list(self.__ship_number)
+
+    def get_cell_indices(self):
+        """Getter for the cell indices of the ship
+
+        :return: array, cell indices of the ship
+        """
+
+        return self.__fleet.get_cell_indices(self.__ship_number)
+
+    def get_ship_health(self):
+        """Getter for the health left of the ship
+
+        :return: int, health left
+        """
+
+        return self.__fleet.get_ship_health(self.__ship_number)
+
+    def overlap(self, other_ship):
+        """Checks if self overlaps with other_ship
+
+        :param other_ship: Ship or ShipView, other ship
+        :return: bool, True if overlap is found
+        """
+
+        return not set(self.get_coordinate_list()).isdisjoint(
+            other_ship.get_coordinate_list())
+
+    def is_sunken(self):
+        """Determines whether all ship parts have been sunken
+
+        :return: bool, True if ship health is less than 1
+        """
+
+        return self.__fleet.is_sunken(self.__ship_number)
+
+    def add_sink_listener(self, listener):
+        """Adds a function to be called when the ship sinks
+
+        :param listener: function, called with the sunken ShipView as
+        parameter
+        :return:
+        """
+
+        self.__fleet.add_sink_listener(self.__ship_number, listener)
+
+    def take_damage(self, index=None):
+        """Hits a cell of the ship. A cell that has already been hit takes no
+        more damage
+
+        :param index: int, index of the hit cell. By default the first cell
+        that hasn't been hit
+        :return:
+        """
+
+        if index is None:
+            for cell_index in self.get_cell_indices():
+                if not self.__fleet.is_cell_hit(self.__ship_number,
+                                                cell_index):
+                    index = cell_index
+                    break
+            else:
+                return
+
+        self.__fleet.damage_cell(self.__ship_number, index)
+
+
+def ships_to_fleet(list_of_ships, game_board):
+    """Packs a list of Ships into a Fleet
+
+    :param list_of_ships: list, list of Ships
+    :param game_board: Board, board the ships are on
+    :return: Fleet, fleet of the same ships in the same order
+    :raises: ValueError, if a coordinate of a ship isn't on the board
+    """
+
+    ship_fleet = Fleet(game_board.get_columns())
+
+    for a_ship in list_of_ships:
+        ship_fleet.add_ship(a_ship.get_ship_type(),
+                            [game_board.coordinate_to_index(coordinate)
+                             for coordinate in a_ship.get_coordinate_list()])
+
+    return ship_fleet
+
+
+def place_fleet(ship_fleet, game_board):
+    """Places every ship of a Fleet on a board
+
+    :param ship_fleet: Fleet, fleet to place
+    :param game_board: Board, board of the same size as the fleet's
+    :return: list, ShipViews of the fleet, in the place of a list of Ships
+    """
+
+    list_of_ships = ship_fleet.get_ships()
+    game_board.place_ships(list_of_ships,
+                           [ship_fleet.get_cell_indices(ship_number)
+                            for ship_number in range(0, len(list_of_ships))])
+
+    return list_of_ships
@@ -0,0 +1,394 @@
+"""
+Persistent cache of parsed fleets for Laivanupotus. Loading a text fleet file
+parses every coordinate and checks every ship for overlap, which is slow for
+big fleets that are loaded again and again. The cache keeps each fleet that
+has been validated once as a binary fleet file (see binary_fleet.py), so the
+next load of the same file for the same board size only maps the binary file.
+
+Entries are keyed by the SHA-256 of the text file's content, the board size
+and a short hash of the column names, so an edited file or a different board
+never gets a stale fleet:
+
+    <digest>-<width>x<height>-<columns>.fleet   the fleet, as a binary file
+    <digest>-<width>x<height>-<columns>.crc     CRC32 of the .fleet file
+
+Entries are written to temporary files and renamed into place, so a crash
+never leaves a half written entry behind. Temporary files left by a crash are
+deleted when the cache is opened, once they are STALE_FILE_AGE seconds old.
+An entry that can't be read, fails its checksum or isn't a valid binary fleet
+file is deleted and the text file is parsed instead, so a corrupt cache costs
+time but never a wrong fleet.
+
+The cache is kept under CACHE_SIZE_LIMIT bytes by deleting the least recently
+used entries. Every hit touches the modification time of its entry, so the
+times order the entries by last use.
+
+Usage: python fleet_cache.py ships.txt [--cache .fleet_cache]
+       python fleet_cache.py --clear [--cache .fleet_cache]
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+import zlib
+
+from Laivanupotus_v3 import NUMBER_OF_ROWS, BOARD_COLUMNS, READ_BUFFER_SIZE, \
+    Board, column_names, load_ships_from_file
+from binary_fleet import load_binary_fleet, write_binary_fleet
+
+CACHE_DIRECTORY = ".fleet_cache"
+CACHE_SIZE_LIMIT = 64 * 1024 * 1024
+
+FLEET_SUFFIX = ".fleet"
+TEMPORARY_SUFFIX = ".tmp"
+# hex digits of the column name hash in the name of an entry
+COLUMN_HASH_LENGTH = 8
+# seconds after which a temporary file can't belong to a write in progress
+STALE_FILE_AGE = 60 * 60
+CHECKSUM_SUFFIX = ".crc"
+
+
+def file_digest(file_name):
+    """Hashes the content of a file, reading it in blocks
+
+    :param file_name: str, name of the file
+    :return: str, SHA-256 of the content as hex
+    :raises: OSError, if the file can't be read
+    """
+
+    digest = hashlib.sha256()
+
+    try:
+        with open(file_name, mode="rb") as hashed_file:
+            for block in iter(lambda: hashed_file.read(READ_BUFFER_SIZE),
+                              b""):
+                digest.update(block)
+    except OSError:
+        raise OSError("File can not be read!")
+
+    return digest.hexdigest()
+
+
+def file_checksum(file_name):
+    """Counts the CRC32 of a file, reading it in blocks
+
+    :param file_name: str, name of the file
+    :return: int, CRC32 of the content
+    :raises: OSError, if the file can't be read
+    """
+
+    checksum = 0
+
+    with open(file_name, mode="rb") as checked_file:
+        for block in iter(lambda: checked_file.read(READ_BUFFER_SIZE), b""):
+            checksum = zlib.crc32(block, checksum)
+
+    return checksum
+
+
+class FleetCache:
+    """
+    A directory of validated fleets, see the module docstring.
+    """
+
+    def __init__(self, directory=CACHE_DIRECTORY,
+                 size_limit=CACHE_SIZE_LIMIT):
+        """Initializes a cache. The directory is made when the first fleet
+        is stored
+
+        :param directory: str, directory of the cache entries
+        :param size_limit: int, most bytes the entries may take together
+        """
+
+        self.__directory = directory
+        self.__size_limit = size_limit
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__corrupt_entries = 0
+
+        self.__remove_stale_files()
+
+    def __remove_stale_files(self):
+        """Deletes the temporary files of writes that never finished. They
+        aren't entries, so eviction would never delete them
+
+        :return:
+        """
+
+        if not os.path.isdir(self.__directory):
+            return
+
+        oldest_allowed = time.time() - STALE_FILE_AGE
+        for entry in os.scandir(self.__directory):
+            if not entry.name.endswith(TEMPORARY_SUFFIX):
+                continue
+            try:
+                if entry.stat().st_mtime < oldest_allowed:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def get_statistics(self):
+        """Getter for how the cache has done since it was made
+
+        :return: dict, counts of hits, misses and corrupt entries deleted
+        """
+
+        return {"hits": self.__hits, "misses": self.__misses,
+                "corrupt": self.__corrupt_entries}
+
+    def __entry_path(self, digest, game_board):
+        """Makes the path of an entry without its suffix
+
+        :param digest: str, content hash of the text fleet file
+        :param game_board: Board, board the fleet is for
+        :return: str, path of the entry
+        """
+
+        # the same coordinates are different cells if the columns are named
+        # differently, so the names are part of the key
+        column_hash = hashlib.sha256(
+            "\n".join(game_board.get_columns()).encode("utf-8")).hexdigest()
+
+        return os.path.join(self.__directory,
+                            f"{digest}-{len(game_board.get_columns())}x"
+                            f"{game_board.get_number_of_rows()}-"
+                            f"{column_hash[:COLUMN_HASH_LENGTH]}")
+
+    def load_ships(self, file_name, game_board):
+        """Loads the ships of a text fleet file onto a board, from the cache
+        if the same file has been loaded for the same board size before.
+        Otherwise the file is parsed and validated like load_ships_from_file
+        and the fleet is stored in the cache
+
+        :param file_name: str, name of the text fleet file
+        :param game_board: Board, board to place the ships on
+        :return: list, list of Ships
+        :raises: OSError, if the text file can't be read
+        :raises: ValueError, if there is an error in the ships of the file
+        """
+
+        entry_path = self.__entry_path(file_digest(file_name), game_board)
+
+        list_of_ships = self.__load_entry(entry_path, game_board)
+        if list_of_ships is not None:
+            self.__hits += 1
+            return list_of_ships
+
+        self.__misses += 1
+        list_of_ships = load_ships_from_file(file_name, game_board)
+        self.__store_entry(entry_path, list_of_ships, game_board)
+
+        return list_of_ships
+
+    def __load_entry(self, entry_path, game_board):
+        """Loads the ships of an entry onto a board. A corrupt entry is
+        deleted
+
+        :param entry_path: str, path of the entry without its suffix
+        :param game_board: Board, board to place the ships on
+        :return: list, list of Ships, or None if there is no usable entry
+        """
+
+        fleet_path = entry_path + FLEET_SUFFIX
+
+        try:
+            with open(entry_path + CHECKSUM_SUFFIX, mode="r") as checksum_file:
+                stored_checksum = int(checksum_file.read(), 16)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self.__remove_corrupt_entry(entry_path)
+            return None
+
+        try:
+            if file_checksum(fleet_path) != stored_checksum:
+                raise ValueError("Checksum does not match!")
+            # the binary file holds the fleet exactly as it was validated, so
+            # it is placed without parsing or overlap checks
+            list_of_ships = load_binary_fleet(fleet_path, game_board)
+        except (OSError, ValueError):
+            self.__remove_corrupt_entry(entry_path)
+            return None
+
+        try:
+            # marks the entry as the most recently used
+            os.utime(fleet_path)
+        except OSError:
+            pass
+
+        return list_of_ships
+
+    def __remove_corrupt_entry(self, entry_path):
+        """Deletes both files of an entry that can't be used
+
+        :param entry_path: str, path of the entry without its suffix
+        :return:
+        """
+
+        self.__corrupt_entries += 1
+        remove_entry(entry_path)
+
+    def __store_entry(self, entry_path, list_of_ships, game_board):
+        """Stores validated ships as an entry. The cache only saves time, so
+        a failure to write it is ignored
+
+        :param entry_path: str, path of the entry without its suffix
+        :param list_of_ships: list, list of Ships, already validated
+        :param game_board: Board, board the ships are on
+        :return:
+        """
+
+        temporary_fleet = None
+
+        try:
+            os.makedirs(self.__directory, exist_ok=True)
+
+            file_handle, temporary_fleet = tempfile.mkstemp(
+                dir=self.__directory, suffix=TEMPORARY_SUFFIX)
+            os.close(file_handle)
+            write_binary_fleet(temporary_fleet, list_of_ships, game_board)
+            checksum = file_checksum(temporary_fleet)
+
+            # the checksum goes in last, so an entry is never found before
+            # its fleet is complete
+            os.replace(temporary_fleet, entry_path + FLEET_SUFFIX)
+            temporary_fleet = None
+            replace_file(entry_path + CHECKSUM_SUFFIX, f"{checksum:08x}")
+
+            self.__evict()
+        except OSError:
+            if temporary_fleet is not None:
+                try:
+                    os.remove(temporary_fleet)
+                except OSError:
+                    pass
+
+    def __evict(self):
+        """Deletes the least recently used entries until the cache fits in
+        its size limit
+
+        :return:
+        """
+
+        entries = []
+        total_size = 0
+
+        for entry in os.scandir(self.__directory):
+            if not entry.name.endswith(FLEET_SUFFIX):
+                continue
+            try:
+                entry_stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((entry_stat.st_mtime, entry_stat.st_size,
+                            entry.path[:-len(FLEET_SUFFIX)]))
+            total_size += entry_stat.st_size
+
+        # the oldest modification time is the least recently used entry
+        entries.sort()
+        for _, entry_size, entry_path in entries:
+            if total_size <= self.__size_limit:
+                break
+            remove_entry(entry_path)
+            total_size -= entry_size
+
+    def clear(self):
+        """Deletes every entry of the cache
+
+        :return:
+        """
+
+        if not os.path.isdir(self.__directory):
+            return
+
+        for entry in os.scandir(self.__directory):
+            if entry.name.endswith(FLEET_SUFFIX):
+                remove_entry(entry.path[:-len(FLEET_SUFFIX)])
+
+
+def replace_file(file_name, content):
+    """Writes a small text file through a temporary file, so the file is
+    either the old one or the new one
+
+    :param file_name: str, name of the file to write
+    :param content: str, new content
+    :return:
+    :raises: OSError, if the file can't be written
+    """
+
+    # a unique temporary file, so two processes writing the same file don't
+    # write into each other's temporary file
+    file_handle, temporary_name = tempfile.mkstemp(
+        dir=os.path.dirname(file_name) or ".", suffix=TEMPORARY_SUFFIX)
+
+    try:
+        with os.fdopen(file_handle, mode="w") as temporary_file:
+            temporary_file.write(content)
+        os.replace(temporary_name, file_name)
+    except OSError:
+        try:
+            os.remove(temporary_name)
+        except OSError:
+            pass
+        raise
+
+
+def remove_entry(entry_path):
+    """Deletes both files of an entry, if they exist
+
+    :param entry_path: str, path of the entry without its suffix
+    :return:
+    """
+
+    # the checksum goes first, so a half deleted entry is never used
+    for suffix in (CHECKSUM_SUFFIX, FLEET_SUFFIX):
+        try:
+            os.remove(entry_path + suffix)
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load a Laivanupotus fleet through the fleet cache")
+    parser.add_argument("file", nargs="?", help="text fleet file")
+    parser.add_argument("--cache", default=CACHE_DIRECTORY,
+                        help="cache directory")
+    parser.add_argument("--clear", action="store_true",
+                        help="delete every entry of the cache")
+    parser.add_argument("--rows", type=int, default=NUMBER_OF_ROWS)
+    parser.add_argument("--columns", type=int, default=len(BOARD_COLUMNS))
+    arguments = parser.parse_args()
+
+    fleet_cache = FleetCache(arguments.cache)
+
+    if arguments.clear:
+        fleet_cache.clear()
+        print(f"Cleared {arguments.cache}.")
+        return
+
+    if arguments.file is None:
+        parser.print_usage()
+        return
+
+    game_board = Board(arguments.rows, column_names(arguments.columns))
+    start_time = time.perf_counter()
+
+    try:
+        list_of_ships = fleet_cache.load_ships(arguments.file, game_board)
+    except (OSError, ValueError) as error_message:
+        print(error_message)
+        return
+
+    elapsed_time = time.perf_counter() - start_time
+    source = "cache" if fleet_cache.get_statistics()["hits"] else "text file"
+    print(f"Loaded {len(list_of_ships)} ships from the {source} in "
+          f"{elapsed_time:.3f} s.")
+
+
+if __name__ == "__main__":
+    main()
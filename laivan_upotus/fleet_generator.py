@@ -0,0 +1,392 @@
+"""
+Random fleet generator for Laivanupotus. Makes legal, non-overlapping fleets
+for any board size and any mix of the ship types in SHIP_TYPES, as lists of
+Ships, as compact Fleets or in the fleet file format.
+
+For boards up to PLACEMENT_TABLE_AREA cells every possible placement of each
+ship length is computed once, together with its bitmask and its coordinates
+as text. Placing a ship is then picking a placement and checking its mask
+against the occupancy mask of the fleet. Every mask is as wide as the board,
+so the tables grow with the square of the board area, and larger boards pick
+placements straight from their row and column and keep the occupied cells in
+a set instead.
+
+Usage: python fleet_generator.py fleet.txt [number of rows] [number of
+columns]
+"""
+
+import random
+import sys
+
+from Laivanupotus_v3 import BOARD_COLUMNS, NUMBER_OF_ROWS, SHIP_TYPES, \
+    Ship, column_names
+from fleet import Fleet
+
+# how many random placements are tried for a ship before going through all of
+# them to find the ones that still fit
+QUICK_ATTEMPTS = 20
+
+# how many times a fleet is started over before deciding it doesn't fit
+FLEET_ATTEMPTS = 100
+
+# largest board area that gets placement tables. The tables of a 64x64 board
+# take a few megabytes, but a 256x256 board would need gigabytes
+PLACEMENT_TABLE_AREA = 64 * 64
+
+
+class PlacementTable:
+    """
+    Every placement of a ship of one length on a board. The placements are
+    stored as parallel lists: the bitmask of the cells, the cells as
+    coordinate text in the fleet file format, the coordinates as a list and
+    the cell indices as a list.
+    """
+
+    def __init__(self, length, number_of_rows, board_columns):
+        """Computes every placement of a ship on a board
+
+        :param length: int, length of the ship
+        :param number_of_rows: int, height of the board
+        :param board_columns: list, column names of the board
+        """
+
+        width = len(board_columns)
+
+        self.__masks = []
+        self.__texts = []
+        self.__coordinate_lists = []
+        self.__index_lists = []
+
+        # ships of one cell are the same placement both ways
+        if length == 1:
+            directions = [(0, 1)]
+        else:
+            directions = [(0, 1), (1, 0)]
+
+        for row_step, column_step in directions:
+            for row in range(0, number_of_rows - row_step * (length - 1)):
+                for column in range(0, width - column_step * (length - 1)):
+                    mask = 0
+                    coordinates = []
+                    indices = []
+                    for offset in range(0, length):
+                        cell_row = row + row_step * offset
+                        cell_column = column + column_step * offset
+                        mask |= 1 << (cell_row * width + cell_column)
+                        coordinates.append(
+                            f"{board_columns[cell_column]}{cell_row}")
+                        indices.append(cell_row * width + cell_column)
+
+                    self.__masks.append(mask)
+                    self.__texts.append(";".join(coordinates))
+                    self.__coordinate_lists.append(coordinates)
+                    self.__index_lists.append(indices)
+
+    def get_masks(self):
+        """Getter for the bitmasks of the placements
+
+        :return: list, int bitmasks, one per placement
+        """
+
+        return self.__masks
+
+    def get_texts(self):
+        """Getter for the placements as coordinate text
+
+        :return: list, coordinates joined with ";", one per placement
+        """
+
+        return self.__texts
+
+    def get_coordinate_lists(self):
+        """Getter for the coordinates of the placements
+
+        :return: list, list of coordinates for each placement
+        """
+
+        return self.__coordinate_lists
+
+    def get_index_lists(self):
+        """Getter for the cell indices of the placements
+
+        :return: list, list of cell indices for each placement
+        """
+
+        return self.__index_lists
+
+
+class FleetGenerator:
+    """
+    Makes random fleets of a fixed composition on a board of fixed size.
+    """
+
+    def __init__(self, number_of_rows=NUMBER_OF_ROWS,
+                 board_columns=BOARD_COLUMNS, fleet_composition=None,
+                 seed=None):
+        """Initializes a generator and computes its placement tables
+
+        :param number_of_rows: int, height of the board
+        :param board_columns: list, column names of the board
+        :param fleet_composition: list, ship types of each fleet. By default
+        one of each type in SHIP_TYPES
+        :param seed: int, seed of the generator
+        """
+
+        if fleet_composition is None:
+            fleet_composition = list(SHIP_TYPES)
+
+        self.__number_of_rows = number_of_rows
+        self.__board_columns = board_columns
+        self.__fleet_composition = list(fleet_composition)
+        self.__random_generator = random.Random(seed)
+
+        # the longest ships are the hardest to fit, so they are placed first
+        self.__placement_order = sorted(
+            range(0, len(self.__fleet_composition)),
+            key=lambda ship_number:
+            -SHIP_TYPES[self.__fleet_composition[ship_number]])
+
+        self.__placement_tables = None
+        # the placement masks of each ship in placement order, so placing a
+        # fleet needs no lookups
+        self.__ship_masks = []
+
+        if number_of_rows * len(board_columns) <= PLACEMENT_TABLE_AREA:
+            self.__placement_tables = {}
+            for ship_type in self.__fleet_composition:
+                length = SHIP_TYPES[ship_type]
+                if length not in self.__placement_tables:
+                    self.__placement_tables[length] = PlacementTable(
+                        length, number_of_rows, board_columns)
+
+            for ship_number in self.__placement_order:
+                length = SHIP_TYPES[self.__fleet_composition[ship_number]]
+                self.__ship_masks.append(
+                    (ship_number,
+                     self.__placement_tables[length].get_masks()))
+
+    def __place_from_tables(self):
+        """Picks a placement for every ship from the placement tables
+
+        :return: list, placement number for each ship in the fleet
+        composition, or None if the ships didn't fit
+        """
+
+        random_number = self.__random_generator.random
+        chosen_placements = [0] * len(self.__fleet_composition)
+        occupied = 0
+
+        for ship_number, masks in self.__ship_masks:
+            number_of_placements = len(masks)
+            if number_of_placements == 0:
+                return None
+
+            for _ in range(0, QUICK_ATTEMPTS):
+                placement = int(random_number() * number_of_placements)
+                if not masks[placement] & occupied:
+                    break
+            else:
+                # the board is getting full, so picks from the placements
+                # that still fit instead of guessing
+                fitting_placements = [
+                    placement for placement, mask in enumerate(masks)
+                    if not mask & occupied]
+                if not fitting_placements:
+                    return None
+                placement = self.__random_generator.choice(fitting_placements)
+
+            occupied |= masks[placement]
+            chosen_placements[ship_number] = placement
+
+        return chosen_placements
+
+    def __place_directly(self):
+        """Picks a placement for every ship without tables, for boards too
+        large for them
+
+        :return: list, list of cell indices for each ship in the fleet
+        composition, or None if the ships didn't fit
+        """
+
+        width = len(self.__board_columns)
+        height = self.__number_of_rows
+        chosen_placements = [None] * len(self.__fleet_composition)
+        occupied_cells = set()
+
+        for ship_number in self.__placement_order:
+            length = SHIP_TYPES[self.__fleet_composition[ship_number]]
+
+            # every placement is equally likely: the placement number is
+            # split into a direction, a row and a column
+            horizontal_placements = height * max(width - length + 1, 0)
+            if length == 1:
+                vertical_placements = 0
+            else:
+                vertical_placements = max(height - length + 1, 0) * width
+
+            if horizontal_placements + vertical_placements == 0:
+                return None
+
+            for _ in range(0, QUICK_ATTEMPTS):
+                placement = self.__random_generator.randrange(
+                    horizontal_placements + vertical_placements)
+                if placement < horizontal_placements:
+                    row, column = divmod(placement, width - length + 1)
+                    ship_cells = [(row, column + offset)
+                                  for offset in range(0, length)]
+                else:
+                    row, column = divmod(placement - horizontal_placements,
+                                         width)
+                    ship_cells = [(row + offset, column)
+                                  for offset in range(0, length)]
+
+                if occupied_cells.isdisjoint(ship_cells):
+                    break
+            else:
+                return None
+
+            occupied_cells.update(ship_cells)
+            chosen_placements[ship_number] = [row * width + column
+                                              for row, column in ship_cells]
+
+        return chosen_placements
+
+    def __generate_placements(self):
+        """Places a fleet, starting over if the ships don't fit
+
+        :return: list, placement number (with tables) or list of cell
+        indices (without tables) for each ship in the fleet composition
+        :raises: ValueError, if the fleet doesn't fit on the board
+        """
+
+        for _ in range(0, FLEET_ATTEMPTS):
+            if self.__placement_tables is not None:
+                chosen_placements = self.__place_from_tables()
+            else:
+                chosen_placements = self.__place_directly()
+
+            if chosen_placements is not None:
+                return chosen_placements
+
+        raise ValueError("The fleet doesn't fit on the board!")
+
+    def __index_to_coordinate(self, index):
+        """Turns a cell index into a coordinate
+
+        :param index: int, index of the cell
+        :return: str, coordinate (ex. A1)
+        """
+
+        row_number, column_number = divmod(index, len(self.__board_columns))
+        return f"{self.__board_columns[column_number]}{row_number}"
+
+    def generate_lines(self):
+        """Makes a random fleet in the fleet file format
+
+        :return: list, ships in string format ship_type;coordinates
+        :raises: ValueError, if the fleet doesn't fit on the board
+        """
+
+        chosen_placements = self.__generate_placements()
+        fleet_lines = []
+
+        for ship_type, placement in zip(self.__fleet_composition,
+                                        chosen_placements):
+            if self.__placement_tables is not None:
+                placement_text = self.__placement_tables[
+                    SHIP_TYPES[ship_type]].get_texts()[placement]
+            else:
+                placement_text = ";".join(self.__index_to_coordinate(index)
+                                          for index in placement)
+            fleet_lines.append(f"{ship_type};{placement_text}")
+
+        return fleet_lines
+
+    def generate_ships(self):
+        """Makes a random fleet of Ships
+
+        :return: list, list of Ships
+        :raises: ValueError, if the fleet doesn't fit on the board
+        """
+
+        chosen_placements = self.__generate_placements()
+        list_of_ships = []
+
+        for ship_type, placement in zip(self.__fleet_composition,
+                                        chosen_placements):
+            if self.__placement_tables is not None:
+                # copied, since the table is shared between fleets
+                coordinates = list(self.__placement_tables[
+                    SHIP_TYPES[ship_type]].get_coordinate_lists()[placement])
+            else:
+                coordinates = [self.__index_to_coordinate(index)
+                               for index in placement]
+            list_of_ships.append(Ship(ship_type, coordinates))
+
+        return list_of_ships
+
+    def generate_fleet(self):
+        """Makes a random Fleet. Cheaper than generate_ships, since the
+        fleet only stores the cell indices of the placements
+
+        :return: Fleet, the fleet
+        :raises: ValueError, if the fleet doesn't fit on the board
+        """
+
+        chosen_placements = self.__generate_placements()
+        ship_fleet = Fleet(self.__board_columns)
+
+        for ship_type, placement in zip(self.__fleet_composition,
+                                        chosen_placements):
+            if self.__placement_tables is not None:
+                ship_fleet.add_ship(ship_type, self.__placement_tables[
+                    SHIP_TYPES[ship_type]].get_index_lists()[placement])
+            else:
+                ship_fleet.add_ship(ship_type, placement)
+
+        return ship_fleet
+
+    def write_fleet_file(self, file_name):
+        """Writes a random fleet into a fleet file
+
+        :param file_name: str, name of the file to write
+        :return:
+        :raises: OSError, if the file can't be written
+        :raises: ValueError, if the fleet doesn't fit on the board
+        """
+
+        fleet_lines = self.generate_lines()
+
+        with open(file_name, mode="w") as fleet_file:
+            fleet_file.write("\n".join(fleet_lines))
+
+
+def main():
+    if len(sys.argv) not in (2, 4):
+        print("Usage: python fleet_generator.py <fleet file> "
+              "[<number of rows> <number of columns>]")
+        return
+
+    if len(sys.argv) == 4:
+        try:
+            number_of_rows = int(sys.argv[2])
+            board_columns = column_names(int(sys.argv[3]))
+        except ValueError:
+            print("Board size must be two integers!")
+            return
+    else:
+        number_of_rows = NUMBER_OF_ROWS
+        board_columns = BOARD_COLUMNS
+
+    try:
+        FleetGenerator(number_of_rows, board_columns).write_fleet_file(
+            sys.argv[1])
+    except (OSError, ValueError) as error_message:
+        print(error_message)
+        return
+
+    print(f"Wrote a random fleet into {sys.argv[1]}.")
+
+
+if __name__ == "__main__":
+    main()
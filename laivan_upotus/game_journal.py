@@ -0,0 +1,422 @@
+"""
+Journaled games of Laivanupotus. Every shot of a game is appended to a
+binary journal, and every now and then the state of the game is written into
+a compact snapshot. A game that was cut off can be resumed by loading the
+latest snapshot and replaying only the shots journaled after it.
+
+Files of a journal named "game":
+    game.journal   header (magic b"LVUJ", version, board width and height,
+                   length of the column names), the column names of the
+                   board as UTF-8 separated by newlines, then one uint32
+                   cell index per shot
+    game.snapshot  header (magic b"LVUS", version, board width and height,
+                   number of ships and cells, number of shots taken), then
+                   uint32 ship offsets, uint32 ship cells, uint8 ship types,
+                   uint16 damage of each ship, uint32 order each ship sank in
+                   (0 if it hasn't) and bitmaps of the shot and hit cells
+
+The number of shots in the snapshot is the sequence number of the last shot
+it includes, so resuming replays the journal from that record on. The
+snapshot only grows with the board and the fleet, not with the game.
+
+All numbers are little-endian. Journal writes are collected into batches, so
+at most JOURNAL_BATCH_SIZE shots are lost if the process dies. The journal is
+synced to disk before every snapshot, so a snapshot never counts shots the
+journal doesn't have.
+
+Usage: python game_journal.py <journal name>
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+from Laivanupotus_v3 import SHIP_TYPES, Board, Ship, load_ships_from_file, \
+    play_in_terminal
+from binary_fleet import SHIP_TYPE_CODES
+
+JOURNAL_MAGIC = b"LVUJ"
+SNAPSHOT_MAGIC = b"LVUS"
+JOURNAL_VERSION = 2
+SNAPSHOT_VERSION = 2
+JOURNAL_HEADER_FORMAT = "<4sHHIII"
+JOURNAL_HEADER_SIZE = struct.calcsize(JOURNAL_HEADER_FORMAT)
+SNAPSHOT_HEADER_FORMAT = "<4sHHIIIIQ"
+SNAPSHOT_HEADER_SIZE = struct.calcsize(SNAPSHOT_HEADER_FORMAT)
+SHOT_RECORD_SIZE = 4
+
+# shots collected before they are written into the journal
+JOURNAL_BATCH_SIZE = 64
+
+# shots between snapshots
+SNAPSHOT_INTERVAL = 1000
+
+
+def little_endian(numbers):
+    """Makes sure an array is stored little-endian, like in the files
+
+    :param numbers: array, array to fix in place
+    :return: array, the same array
+    """
+
+    if sys.byteorder != "little":
+        numbers.byteswap()
+
+    return numbers
+
+
+class GameJournal:
+    """
+    Journal and snapshots of one game. Listens to the shots of the board, so
+    once it is attached the game doesn't have to know about it.
+    """
+
+    def __init__(self, journal_name, game_board, list_of_ships,
+                 number_of_shots, batch_size=JOURNAL_BATCH_SIZE,
+                 snapshot_interval=SNAPSHOT_INTERVAL):
+        """Initializes a journal for a game whose files already exist. Use
+        start_journal or resume_journal to get one
+
+        :param journal_name: str, name of the journal files without suffix
+        :param game_board: Board, board of the game
+        :param list_of_ships: list, Ships on the board
+        :param number_of_shots: int, shots taken so far
+        :param batch_size: int, shots collected before writing them
+        :param snapshot_interval: int, shots between snapshots
+        """
+
+        self.__journal_name = journal_name
+        self.__game_board = game_board
+        self.__list_of_ships = list_of_ships
+        self.__number_of_shots = number_of_shots
+        self.__batch_size = batch_size
+        self.__snapshot_interval = snapshot_interval
+        self.__shots_since_snapshot = 0
+
+        self.__pending_shots = array("I")
+        self.__journal_file = open(journal_name + ".journal", mode="ab")
+
+        game_board.add_shot_listener(self.record_shot)
+
+    def record_shot(self, index, shot_result):
+        """Shot listener of the board. Adds a shot to the journal
+
+        :param index: int, index of the shot cell
+        :param shot_result: str, result of the shot. Not needed to replay it
+        :return:
+        """
+
+        self.__number_of_shots += 1
+        self.__pending_shots.append(index)
+
+        if len(self.__pending_shots) >= self.__batch_size:
+            self.flush()
+
+        self.__shots_since_snapshot += 1
+        if self.__shots_since_snapshot >= self.__snapshot_interval:
+            self.write_snapshot()
+
+    def flush(self):
+        """Writes the collected shots into the journal
+
+        :return:
+        """
+
+        if self.__pending_shots:
+            self.__journal_file.write(
+                little_endian(self.__pending_shots).tobytes())
+            self.__pending_shots = array("I")
+
+        self.__journal_file.flush()
+
+    def write_snapshot(self):
+        """Writes the state of the game into the snapshot file. The old
+        snapshot is replaced only once the new one is complete
+
+        :return:
+        """
+
+        # the snapshot counts every shot taken, so they have to be on disk in
+        # the journal before it
+        self.flush()
+        os.fsync(self.__journal_file.fileno())
+        write_snapshot_file(self.__journal_name + ".snapshot",
+                            self.__game_board, self.__list_of_ships,
+                            self.__number_of_shots)
+        self.__shots_since_snapshot = 0
+
+    def get_number_of_shots(self):
+        """Getter for the number of shots taken in the game
+
+        :return: int, shots taken so far
+        """
+
+        return self.__number_of_shots
+
+    def close(self):
+        """Writes the last shots and a snapshot, and closes the journal
+
+        :return:
+        """
+
+        self.write_snapshot()
+        self.__journal_file.close()
+
+
+def write_snapshot_file(file_name, game_board, list_of_ships,
+                        number_of_shots):
+    """Writes a snapshot of a game
+
+    :param file_name: str, name of the snapshot file
+    :param game_board: Board, board of the game
+    :param list_of_ships: list, Ships on the board
+    :param number_of_shots: int, shots taken so far, all of them already in
+    the journal
+    :return:
+    :raises: OSError, if the file can't be written
+    """
+
+    offsets = array("I", [0])
+    cells = array("I")
+    types = bytearray()
+    damage = array("H")
+    sink_order = array("I", bytes(4 * len(list_of_ships)))
+
+    for a_ship in list_of_ships:
+        cells.extend(game_board.get_ship_indices(a_ship))
+        offsets.append(len(cells))
+        types.append(SHIP_TYPE_CODES.index(a_ship.get_ship_type()))
+        damage.append(SHIP_TYPES[a_ship.get_ship_type()] -
+                      a_ship.get_ship_health())
+
+    ship_numbers = {a_ship: ship_number
+                    for ship_number, a_ship in enumerate(list_of_ships)}
+    for position, sunken_ship in enumerate(game_board.get_sunken_ships(),
+                                           start=1):
+        sink_order[ship_numbers[sunken_ship]] = position
+
+    header = struct.pack(SNAPSHOT_HEADER_FORMAT, SNAPSHOT_MAGIC,
+                         SNAPSHOT_VERSION, 0, len(game_board.get_columns()),
+                         game_board.get_number_of_rows(), len(list_of_ships),
+                         len(cells), number_of_shots)
+
+    # written next to the old snapshot and moved over it, so there is always
+    # a complete snapshot on disk
+    temporary_name = file_name + ".tmp"
+    with open(temporary_name, mode="wb") as snapshot_file:
+        snapshot_file.write(header)
+        snapshot_file.write(little_endian(offsets).tobytes())
+        snapshot_file.write(little_endian(cells).tobytes())
+        snapshot_file.write(types)
+        snapshot_file.write(little_endian(damage).tobytes())
+        snapshot_file.write(little_endian(sink_order).tobytes())
+        snapshot_file.write(game_board.get_shot_bitmap())
+        snapshot_file.write(game_board.get_hit_bitmap())
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temporary_name, file_name)
+
+
+def start_journal(journal_name, game_board, list_of_ships,
+                  batch_size=JOURNAL_BATCH_SIZE,
+                  snapshot_interval=SNAPSHOT_INTERVAL):
+    """Starts a new journal for a game that hasn't been played yet.
+    Overwrites an old journal of the same name
+
+    :param journal_name: str, name of the journal files without suffix
+    :param game_board: Board, board with the fleet placed on it
+    :param list_of_ships: list, Ships on the board
+    :param batch_size: int, shots collected before writing them
+    :param snapshot_interval: int, shots between snapshots
+    :return: GameJournal, journal attached to the board
+    :raises: OSError, if the files can't be written
+    """
+
+    # the column names go into the journal, so the board can be rebuilt
+    # with the same coordinates
+    board_columns = "\n".join(game_board.get_columns()).encode("utf-8")
+
+    with open(journal_name + ".journal", mode="wb") as journal_file:
+        journal_file.write(struct.pack(
+            JOURNAL_HEADER_FORMAT, JOURNAL_MAGIC, JOURNAL_VERSION, 0,
+            len(game_board.get_columns()), game_board.get_number_of_rows(),
+            len(board_columns)))
+        journal_file.write(board_columns)
+
+    journal = GameJournal(journal_name, game_board, list_of_ships, 0,
+                          batch_size, snapshot_interval)
+    journal.write_snapshot()
+
+    return journal
+
+
+def read_journal_header(journal_file, journal_name):
+    """Reads the header and the column names at the start of a journal
+
+    :param journal_file: file, journal opened in binary mode at its start
+    :param journal_name: str, name of the journal files without suffix. Only
+    used in error messages
+    :return: tuple, (board width, board height, list of column names, offset
+    of the first shot record)
+    :raises: ValueError, if the file doesn't start with a journal header
+    """
+
+    journal_header = journal_file.read(JOURNAL_HEADER_SIZE)
+    if len(journal_header) != JOURNAL_HEADER_SIZE:
+        raise ValueError(f"{journal_name}: Journal is broken!")
+
+    magic, version, _, width, height, columns_length = struct.unpack(
+        JOURNAL_HEADER_FORMAT, journal_header)
+    if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION:
+        raise ValueError(f"{journal_name}: Journal is broken!")
+
+    try:
+        board_columns = journal_file.read(columns_length).decode(
+            "utf-8").split("\n")
+    except UnicodeDecodeError:
+        raise ValueError(f"{journal_name}: Journal is broken!")
+    if len(board_columns) != width:
+        raise ValueError(f"{journal_name}: Journal is broken!")
+
+    return width, height, board_columns, \
+        JOURNAL_HEADER_SIZE + columns_length
+
+
+def resume_journal(journal_name, batch_size=JOURNAL_BATCH_SIZE,
+                   snapshot_interval=SNAPSHOT_INTERVAL):
+    """Rebuilds a game from its latest snapshot and the shots journaled
+    after it
+
+    :param journal_name: str, name of the journal files without suffix
+    :param batch_size: int, shots collected before writing them
+    :param snapshot_interval: int, shots between snapshots
+    :return: tuple, (Board, list of Ships, GameJournal attached to the board)
+    :raises: OSError, if the files can't be read
+    :raises: ValueError, if the files aren't a journal and a snapshot of the
+    same game
+    """
+
+    with open(journal_name + ".journal", mode="rb") as journal_file:
+        journal_width, journal_height, board_columns, records_start = \
+            read_journal_header(journal_file, journal_name)
+
+    with open(journal_name + ".snapshot", mode="rb") as snapshot_file:
+        snapshot = snapshot_file.read()
+
+    if len(snapshot) < SNAPSHOT_HEADER_SIZE:
+        raise ValueError(f"{journal_name}: Snapshot is broken!")
+
+    magic, version, _, width, height, number_of_ships, number_of_cells, \
+        number_of_shots = struct.unpack_from(SNAPSHOT_HEADER_FORMAT, snapshot)
+
+    bitmap_size = (width * height + 7) // 8
+    cells_start = SNAPSHOT_HEADER_SIZE + 4 * (number_of_ships + 1)
+    types_start = cells_start + 4 * number_of_cells
+    damage_start = types_start + number_of_ships
+    sink_order_start = damage_start + 2 * number_of_ships
+    shots_start = sink_order_start + 4 * number_of_ships
+    hits_start = shots_start + bitmap_size
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or \
+            len(snapshot) != hits_start + bitmap_size:
+        raise ValueError(f"{journal_name}: Snapshot is broken!")
+    if (width, height) != (journal_width, journal_height):
+        raise ValueError(f"{journal_name}: Snapshot is from another game!")
+
+    offsets = little_endian(array("I",
+                                  snapshot[SNAPSHOT_HEADER_SIZE:cells_start]))
+    cells = little_endian(array("I", snapshot[cells_start:types_start]))
+    types = snapshot[types_start:damage_start]
+    damage = little_endian(array("H", snapshot[damage_start:
+                                               sink_order_start]))
+    sink_order = little_endian(array("I", snapshot[sink_order_start:
+                                                   shots_start]))
+
+    game_board = Board(height, board_columns)
+    list_of_ships = []
+    cell_indices = []
+    try:
+        for ship_number in range(0, number_of_ships):
+            ship_indices = cells[offsets[ship_number]:
+                                 offsets[ship_number + 1]]
+            a_ship = Ship(SHIP_TYPE_CODES[types[ship_number]],
+                          [game_board.index_to_coordinate(index)
+                           for index in ship_indices])
+            # the damage goes in before the ship is placed, so nothing hears
+            # about it
+            for _ in range(0, damage[ship_number]):
+                a_ship.take_damage()
+            list_of_ships.append(a_ship)
+            cell_indices.append(ship_indices)
+    except IndexError:
+        raise ValueError(f"{journal_name}: Snapshot is broken!")
+    game_board.place_ships(list_of_ships, cell_indices)
+
+    sunken_ships = [list_of_ships[ship_number] for _, ship_number in sorted(
+        (position, ship_number)
+        for ship_number, position in enumerate(sink_order) if position > 0)]
+    game_board.restore_shots(snapshot[shots_start:hits_start],
+                             snapshot[hits_start:], sunken_ships)
+
+    # only the shots journaled after the snapshot are replayed
+    with open(journal_name + ".journal", mode="r+b") as journal_file:
+        journal_length = records_start + SHOT_RECORD_SIZE * number_of_shots
+        if journal_file.seek(0, 2) < journal_length:
+            raise ValueError(f"{journal_name}: Journal is broken!")
+
+        journal_file.seek(journal_length)
+        journal_tail = journal_file.read()
+
+        # a shot cut in half by a crash is dropped from the journal
+        whole_records = len(journal_tail) // SHOT_RECORD_SIZE * \
+            SHOT_RECORD_SIZE
+        journal_file.truncate(journal_length + whole_records)
+        shots = little_endian(array("I", journal_tail[:whole_records]))
+
+    area = width * height
+    for index in shots:
+        if index >= area:
+            raise ValueError(f"{journal_name}: Journal is broken!")
+        game_board.shoot_index(index)
+
+    journal = GameJournal(journal_name, game_board, list_of_ships,
+                          number_of_shots + len(shots), batch_size,
+                          snapshot_interval)
+
+    return game_board, list_of_ships, journal
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python game_journal.py <journal name>")
+        return
+
+    journal_name = sys.argv[1]
+
+    # an existing snapshot means there is a game to continue
+    if os.path.exists(journal_name + ".snapshot"):
+        try:
+            game_board, list_of_ships, journal = resume_journal(journal_name)
+        except (OSError, ValueError) as error_message:
+            print(error_message)
+            return
+        print(f"Resuming game with {journal.get_number_of_shots()} shots "
+              f"taken.")
+    else:
+        game_board = Board()
+        try:
+            list_of_ships = load_ships_from_file(input("Enter file name: "),
+                                                 game_board)
+            journal = start_journal(journal_name, game_board, list_of_ships)
+        except (OSError, ValueError) as error_message:
+            print(error_message)
+            return
+
+    try:
+        play_in_terminal(game_board)
+    finally:
+        journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+Multiplayer server for Laivanupotus. One asyncio event loop hosts the games
+of every connection, so thousands of games can run at once in one process.
+Each connection plays one game at a time on its own Board.
+
+The protocol is one line per request and one line per answer:
+    NEW                      starts a game against a random fleet
+    FLEET <ship> <ship> ...  starts a game against the given fleet, ships in
+                             the fleet file format (ex. battleship;A1;A2;A3;A4)
+    <coordinate>             shoots, with the same syntax as the terminal game
+    Q                        closes the connection
+
+and the answers are
+    READY <ships>            a game started with that many ships
+    MISS, HIT, ALREADY       result of a shot
+    SUNK <ship type>         the shot sank a ship
+    WON <shots>              the shot sank the last ship, after that many shots
+    ERROR <message>          the request wasn't understood
+    BYE                      the connection is closing
+
+A load generator is included: it opens many connections that play games as
+fast as the server answers and reports throughput and latency.
+
+Usage: python game_server.py serve [--port 5555 | --unix socket]
+       python game_server.py load [--port 5555 | --unix socket]
+           [--connections 100] [--games 10]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from Laivanupotus_v3 import NUMBER_OF_ROWS, BOARD_COLUMNS, QUIT_COMMAND, \
+    SHOT_ALREADY_SHOT, SHOT_HIT, SHOT_MISS, SHOT_SUNK, Board, column_names, \
+    lines_to_ship_list
+from fleet_generator import FleetGenerator
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5555
+
+NEW_COMMAND = "NEW"
+FLEET_COMMAND = "FLEET"
+
+# answers to shots, by shot result
+SHOT_ANSWERS = {
+    SHOT_MISS: "MISS",
+    SHOT_HIT: "HIT",
+    SHOT_ALREADY_SHOT: "ALREADY"
+}
+
+# longest request line the server accepts, so a client can't make it buffer
+# without end
+MAX_LINE_LENGTH = 1 << 16
+
+
+class GameSession:
+    """
+    The game of one connection. Turns request lines into answer lines and
+    knows nothing about the network, so it can be used without a server.
+    """
+
+    def __init__(self, number_of_rows, board_columns, fleet_generator):
+        """Initializes a session with no game going on
+
+        :param number_of_rows: int, height of the boards
+        :param board_columns: list, column names of the boards
+        :param fleet_generator: FleetGenerator, makes the fleets of NEW games.
+        Shared by every session of the server
+        """
+
+        self.__number_of_rows = number_of_rows
+        self.__board_columns = board_columns
+        self.__fleet_generator = fleet_generator
+        self.__game_board = None
+        self.__shots_fired = 0
+
+    def handle_request(self, request):
+        """Carries out one request
+
+        :param request: str, request line without the line break
+        :return: str, answer line without the line break
+        """
+
+        # the same as the terminal game, commands can be in any case
+        command = request.strip()
+        keyword = command.split(" ", 1)[0].upper()
+
+        if keyword == NEW_COMMAND:
+            return self.__start_game(None)
+        if keyword == FLEET_COMMAND:
+            return self.__start_game([normalize_fleet_line(fleet_line)
+                                      for fleet_line in command.split()[1:]])
+
+        if self.__game_board is None or self.__game_board.all_ships_sunk():
+            return "ERROR No game going on!"
+
+        try:
+            shot_result = self.__game_board.shoot(command.upper())
+        except ValueError:
+            return "ERROR Invalid command!"
+
+        if shot_result != SHOT_ALREADY_SHOT:
+            self.__shots_fired += 1
+
+        if shot_result != SHOT_SUNK:
+            return SHOT_ANSWERS[shot_result]
+        if self.__game_board.all_ships_sunk():
+            return f"WON {self.__shots_fired}"
+
+        sunken_ship = self.__game_board.get_sunken_ships()[-1]
+        return f"SUNK {sunken_ship.get_ship_type()}"
+
+    def __start_game(self, fleet_lines):
+        """Starts a new game, replacing the one going on
+
+        :param fleet_lines: list, ships in the fleet file format, or None for
+        a random fleet
+        :return: str, answer line
+        """
+
+        game_board = Board(self.__number_of_rows, self.__board_columns)
+
+        try:
+            if fleet_lines is None:
+                list_of_ships = self.__fleet_generator.generate_ships()
+                game_board.place_ships(list_of_ships)
+            else:
+                list_of_ships = lines_to_ship_list(fleet_lines, game_board)
+        except ValueError as error_message:
+            # an error can span many lines, for example one per overlapping
+            # coordinate, but every answer has to be exactly one line
+            return "ERROR " + str(error_message).replace("\n", "; ")
+
+        self.__game_board = game_board
+        self.__shots_fired = 0
+
+        return f"READY {len(list_of_ships)}"
+
+
+def normalize_fleet_line(fleet_line):
+    """Puts a ship of a FLEET request in the case the fleet file format uses.
+    Coordinates can be in any case, the same as shots
+
+    :param fleet_line: str, ship in the format ship_type;coordinates
+    :return: str, ship with the type in lower case and the coordinates in
+    upper case
+    """
+
+    ship_type, separator, coordinates = fleet_line.partition(";")
+    return f"{ship_type.lower()}{separator}{coordinates.upper()}"
+
+
+async def close_writer(writer):
+    """Closes a connection and waits until its transport is closed, so
+    nothing is left unsent or open when the caller returns
+
+    :param writer: asyncio.StreamWriter, writing end of the connection
+    :return:
+    """
+
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except ConnectionError:
+        # the other end was gone already
+        pass
+
+
+async def serve_connection(reader, writer, number_of_rows, board_columns,
+                           fleet_generator):
+    """Plays the games of one connection until it closes
+
+    :param reader: asyncio.StreamReader, requests of the client
+    :param writer: asyncio.StreamWriter, answers to the client
+    :param number_of_rows: int, height of the boards
+    :param board_columns: list, column names of the boards
+    :param fleet_generator: FleetGenerator, makes random fleets
+    :return:
+    """
+
+    session = GameSession(number_of_rows, board_columns, fleet_generator)
+
+    try:
+        while True:
+            request = await reader.readline()
+            # an empty read means the client closed the connection
+            if not request:
+                break
+
+            request = request.decode(errors="replace")
+            if request.strip().upper() == QUIT_COMMAND:
+                writer.write(b"BYE\n")
+                break
+
+            writer.write(session.handle_request(request).encode() + b"\n")
+
+            # only waits when the client reads slower than it asks, so
+            # pipelined requests are answered without a pause between them
+            await writer.drain()
+    except (ConnectionError, ValueError):
+        # the client vanished or sent a line longer than MAX_LINE_LENGTH
+        pass
+    finally:
+        await close_writer(writer)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None,
+                number_of_rows=NUMBER_OF_ROWS, board_columns=BOARD_COLUMNS,
+                seed=None):
+    """Runs the server until it is cancelled
+
+    :param host: str, address to listen on
+    :param port: int, TCP port to listen on
+    :param unix_path: str, path of a Unix socket to listen on instead of TCP
+    :param number_of_rows: int, height of the boards
+    :param board_columns: list, column names of the boards
+    :param seed: int, seed of the random fleets
+    :return:
+    """
+
+    # the placement tables are computed once and shared by every game
+    fleet_generator = FleetGenerator(number_of_rows, board_columns, seed=seed)
+
+    async def handle_client(reader, writer):
+        await serve_connection(reader, writer, number_of_rows, board_columns,
+                               fleet_generator)
+
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(handle_client, unix_path,
+                                                 limit=MAX_LINE_LENGTH)
+    else:
+        server = await asyncio.start_server(handle_client, host, port,
+                                            limit=MAX_LINE_LENGTH)
+
+    async with server:
+        await server.serve_forever()
+
+
+async def open_connection(host, port, unix_path):
+    """Opens a connection to the server
+
+    :param host: str, address of the server
+    :param port: int, TCP port of the server
+    :param unix_path: str, path of the Unix socket of the server, or None to
+    use TCP
+    :return: tuple, (asyncio.StreamReader, asyncio.StreamWriter)
+    """
+
+    if unix_path is not None:
+        return await asyncio.open_unix_connection(unix_path)
+
+    return await asyncio.open_connection(host, port)
+
+
+async def load_connection(host, port, unix_path, number_of_games,
+                          number_of_cells, board_columns, seed, latencies):
+    """Plays games on one connection, shooting cells in random order
+
+    :param host: str, address of the server
+    :param port: int, TCP port of the server
+    :param unix_path: str, path of the Unix socket, or None to use TCP
+    :param number_of_games: int, games to play
+    :param number_of_cells: int, cells on the board of the server
+    :param board_columns: list, column names of the board of the server
+    :param seed: int, seed of the shooting order
+    :param latencies: list, the time of every request in seconds is appended
+    here
+    :return: int, number of games won
+    """
+
+    reader, writer = await open_connection(host, port, unix_path)
+    random_generator = random.Random(seed)
+    width = len(board_columns)
+    games_won = 0
+
+    async def request(line):
+        """Sends a request and waits for its answer
+
+        :param line: str, request line without the line break
+        :return: str, answer line without the line break
+        """
+
+        start_time = time.perf_counter()
+        writer.write(line.encode() + b"\n")
+        answer = await reader.readline()
+        latencies.append(time.perf_counter() - start_time)
+        return answer.decode().strip()
+
+    try:
+        for _ in range(0, number_of_games):
+            if not (await request(NEW_COMMAND)).startswith("READY"):
+                break
+
+            cells = list(range(0, number_of_cells))
+            random_generator.shuffle(cells)
+            for index in cells:
+                row_number, column_number = divmod(index, width)
+                answer = await request(
+                    f"{board_columns[column_number]}{row_number}")
+                if answer.startswith("WON"):
+                    games_won += 1
+                    break
+
+        await request(QUIT_COMMAND)
+    finally:
+        await close_writer(writer)
+
+    return games_won
+
+
+async def generate_load(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None,
+                        number_of_connections=100, games_per_connection=10,
+                        number_of_rows=NUMBER_OF_ROWS,
+                        board_columns=BOARD_COLUMNS, seed=0):
+    """Plays games on many connections at once and measures the server
+
+    :param host: str, address of the server
+    :param port: int, TCP port of the server
+    :param unix_path: str, path of the Unix socket, or None to use TCP
+    :param number_of_connections: int, connections open at the same time
+    :param games_per_connection: int, games played on each connection
+    :param number_of_rows: int, height of the board of the server
+    :param board_columns: list, column names of the board of the server
+    :param seed: int, base seed of the shooting orders
+    :return: dict, games, requests, seconds, and latency percentiles in
+    milliseconds
+    """
+
+    latencies = []
+    start_time = time.perf_counter()
+
+    games_won = await asyncio.gather(*(
+        load_connection(host, port, unix_path, games_per_connection,
+                        number_of_rows * len(board_columns), board_columns,
+                        f"{seed}-{connection_number}", latencies)
+        for connection_number in range(0, number_of_connections)))
+
+    seconds = time.perf_counter() - start_time
+    latencies.sort()
+
+    report = {"games": sum(games_won), "requests": len(latencies),
+              "seconds": seconds}
+    for name, fraction in [("p50", 0.5), ("p90", 0.9), ("p99", 0.99),
+                           ("max", 1.0)]:
+        if latencies:
+            position = min(int(fraction * len(latencies)),
+                           len(latencies) - 1)
+            report[name] = latencies[position] * 1000
+        else:
+            report[name] = 0.0
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Multiplayer server for Laivanupotus")
+    parser.add_argument("mode", choices=["serve", "load"])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", default=None,
+                        help="Unix socket to use instead of TCP")
+    parser.add_argument("--rows", type=int, default=NUMBER_OF_ROWS)
+    parser.add_argument("--columns", type=int, default=len(BOARD_COLUMNS))
+    parser.add_argument("--connections", type=int, default=100,
+                        help="connections of the load generator")
+    parser.add_argument("--games", type=int, default=10,
+                        help="games per connection of the load generator")
+    parser.add_argument("--seed", type=int, default=None)
+    arguments = parser.parse_args()
+
+    board_columns = column_names(arguments.columns)
+
+    if arguments.mode == "serve":
+        try:
+            asyncio.run(serve(arguments.host, arguments.port, arguments.unix,
+                              arguments.rows, board_columns, arguments.seed))
+        except KeyboardInterrupt:
+            print("Server stopped.")
+        except OSError as error_message:
+            print(error_message)
+        return
+
+    try:
+        report = asyncio.run(generate_load(
+            arguments.host, arguments.port, arguments.unix,
+            arguments.connections, arguments.games, arguments.rows,
+            board_columns, arguments.seed or 0))
+    except OSError as error_message:
+        print(error_message)
+        return
+
+    print(f"{report['games']} games, {report['requests']} requests in "
+          f"{report['seconds']:.2f} s")
+    print(f"{report['games'] / report['seconds']:.1f} games/s, "
+          f"{report['requests'] / report['seconds']:.0f} requests/s")
+    print(f"latency ms: p50 {report['p50']:.2f}, p90 {report['p90']:.2f}, "
+          f"p99 {report['p99']:.2f}, max {report['max']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Headless Laivanupotus. HeadlessGame takes whole arrays of shots at once and
+resolves them with NumPy operations on a grid array, so recorded shot
+sequences can be replayed against many fleets without input() or printouts.
+
+Shots are cell indices as in Board (row_number * width + column_number).
+Results are codes, RESULT_NAMES turns them into the shot results of
+Laivanupotus_v3.
+"""
+
+import numpy as np
+
+from Laivanupotus_v3 import SHIP_TYPES, SHOT_ALREADY_SHOT, SHOT_HIT, \
+    SHOT_MISS, SHOT_SUNK
+
+# result codes of shoot_batch
+RESULT_MISS = 0
+RESULT_HIT = 1
+RESULT_SUNK = 2
+RESULT_ALREADY_SHOT = 3
+
+# result codes as the result strings Board.shoot returns
+RESULT_NAMES = [SHOT_MISS, SHOT_HIT, SHOT_SUNK, SHOT_ALREADY_SHOT]
+
+# marks the cells of the ship grid that have no ship in them
+NO_SHIP = -1
+
+
+def coordinates_to_indices(list_of_coordinates, game_board):
+    """Turns coordinates into an array of cell indices for shoot_batch
+
+    :param list_of_coordinates: list, coordinates (ex. ["A1", "B2"])
+    :param game_board: Board, board the coordinates are on
+    :return: numpy.ndarray, cell indices
+    :raises: ValueError, if a coordinate isn't on the board
+    """
+
+    return np.fromiter((game_board.coordinate_to_index(coordinate)
+                        for coordinate in list_of_coordinates),
+                       dtype=np.intp, count=len(list_of_coordinates))
+
+
+class HeadlessGame:
+    """
+    A game of Laivanupotus without a user interface. The fleet is a grid
+    array holding the number of the ship in each cell, and the shots taken so
+    far are a boolean grid array.
+    """
+
+    def __init__(self, game_board, list_of_ships):
+        """Builds the grid arrays for a fleet
+
+        :param game_board: Board, board the fleet is on. Only its size and
+        coordinates are used, shots aren't recorded on it
+        :param list_of_ships: list, list of Ships
+        :raises: ValueError, if a ship coordinate isn't on the board
+        """
+
+        self.__width = len(game_board.get_columns())
+        self.__height = game_board.get_number_of_rows()
+        self.__list_of_ships = list_of_ships
+
+        self.__ship_grid = np.full(self.__width * self.__height, NO_SHIP,
+                                   dtype=np.int32)
+        self.__ship_healths = np.zeros(len(list_of_ships), dtype=np.int32)
+
+        for ship_number, a_ship in enumerate(list_of_ships):
+            ship_indices = coordinates_to_indices(
+                a_ship.get_coordinate_list(), game_board)
+            self.__ship_grid[ship_indices] = ship_number
+            # like Ship, a ship sinks after as many hits as its type has
+            # health, whatever the number of its cells
+            self.__ship_healths[ship_number] = \
+                SHIP_TYPES[a_ship.get_ship_type()]
+
+        self.__shot_grid = None
+        self.__health_left = None
+        self.__ships_left = 0
+        self.reset()
+
+    def reset(self):
+        """Takes back every shot so the fleet can be played again
+
+        :return:
+        """
+
+        self.__shot_grid = np.zeros(self.__width * self.__height,
+                                    dtype=np.bool_)
+        self.__health_left = self.__ship_healths.copy()
+        self.__ships_left = len(self.__ship_healths)
+
+    def get_list_of_ships(self):
+        """Getter for the ships of the game
+
+        :return: list, list of Ships, in the order of the ship numbers
+        """
+
+        return self.__list_of_ships
+
+    def get_ships_left(self):
+        """Getter for the number of ships that haven't sunk yet
+
+        :return: int, number of ships left
+        """
+
+        return self.__ships_left
+
+    def is_won(self):
+        """Checks if every ship has sunk
+
+        :return: bool, True if the game has been won
+        """
+
+        return self.__ships_left == 0
+
+    def shoot_batch(self, shot_indices):
+        """Shoots many cells at once. The shots are resolved in the order
+        they are given, so a cell shot twice in the same batch is already shot
+        the second time and a ship sinks on the shot that takes its last
+        point of health. Like on Board, every cell of a sunken ship counts as
+        shot from then on.
+
+        :param shot_indices: array-like, cell indices to shoot
+        :return: tuple, (numpy.ndarray of result codes, numpy.ndarray of the
+        number of the ship hit by each shot or NO_SHIP)
+        :raises: ValueError, if a cell index isn't on the board
+        """
+
+        shots = np.asarray(shot_indices, dtype=np.intp).ravel()
+        number_of_shots = len(shots)
+
+        if number_of_shots == 0:
+            return np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.int32)
+        if shots.min() < 0 or shots.max() >= len(self.__shot_grid):
+            raise ValueError("Shot is not on the board!")
+
+        # a shot is new if the cell wasn't shot before the batch and this is
+        # its first appearance in the batch
+        shot_order = np.argsort(shots, kind="stable")
+        sorted_shots = shots[shot_order]
+        first_in_batch = np.ones(number_of_shots, dtype=np.bool_)
+        first_in_batch[shot_order[1:]] = sorted_shots[1:] != sorted_shots[:-1]
+        new_shot = first_in_batch & ~self.__shot_grid[shots]
+
+        ships_hit = self.__ship_grid[shots]
+        hit = new_shot & (ships_hit != NO_SHIP)
+        ships_hit = np.where(hit, ships_hit, NO_SHIP).astype(np.int32)
+
+        results = np.full(number_of_shots, RESULT_ALREADY_SHOT, dtype=np.int8)
+        results[new_shot] = RESULT_MISS
+        results[hit] = RESULT_HIT
+
+        # numbers each hit within the hits on the same ship, in shot order.
+        # The hit whose number equals the health the ship had left sinks it
+        hit_positions = np.flatnonzero(hit)
+        if len(hit_positions) > 0:
+            hit_ship_numbers = ships_hit[hit_positions]
+            ship_order = np.argsort(hit_ship_numbers, kind="stable")
+            sorted_ship_numbers = hit_ship_numbers[ship_order]
+            group_starts = np.flatnonzero(
+                np.r_[True,
+                      sorted_ship_numbers[1:] != sorted_ship_numbers[:-1]])
+            group_sizes = np.diff(np.r_[group_starts,
+                                        len(sorted_ship_numbers)])
+            hit_numbers = np.arange(1, len(sorted_ship_numbers) + 1) - \
+                np.repeat(group_starts, group_sizes)
+
+            ship_health_left = self.__health_left[sorted_ship_numbers]
+            sinking = hit_numbers == ship_health_left
+            results[hit_positions[ship_order[sinking]]] = RESULT_SUNK
+
+            # Board marks every cell of a sunken ship as shot, so the cells
+            # of a ship shot after it sank are already shot
+            after_sinking = hit_positions[ship_order[
+                hit_numbers > ship_health_left]]
+            results[after_sinking] = RESULT_ALREADY_SHOT
+            ships_hit[after_sinking] = NO_SHIP
+
+            damaging_hits = ships_hit[hit_positions]
+            self.__health_left -= np.bincount(
+                damaging_hits[damaging_hits != NO_SHIP],
+                minlength=len(self.__health_left)).astype(np.int32)
+
+            sunken_ships = sorted_ship_numbers[sinking]
+            self.__ships_left -= len(sunken_ships)
+            self.__shot_grid[np.isin(self.__ship_grid, sunken_ships)] = True
+
+        self.__shot_grid[shots] = True
+
+        return results, ships_hit
+
+    def replay(self, shot_indices):
+        """Plays a recorded shot sequence from the start of the game
+
+        :param shot_indices: array-like, cell indices in the order they were
+        shot
+        :return: tuple, as in shoot_batch
+        :raises: ValueError, if a cell index isn't on the board
+        """
+
+        self.reset()
+        return self.shoot_batch(shot_indices)
+
+
+def shots_to_win(results, number_of_ships):
+    """Finds how many shots of a replay it took to sink every ship
+
+    :param results: numpy.ndarray, result codes of a replay from the start
+    :param number_of_ships: int, number of ships in the fleet
+    :return: int, number of shots until the last ship sank, or None if the
+    shots didn't sink every ship
+    """
+
+    if number_of_ships == 0:
+        return 0
+
+    sinking_shots = np.flatnonzero(results == RESULT_SUNK)
+    if len(sinking_shots) < number_of_ships:
+        return None
+
+    return int(sinking_shots[number_of_ships - 1]) + 1
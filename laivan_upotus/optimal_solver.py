@@ -0,0 +1,629 @@
+"""
+Exact solver for small games of Laivanupotus. Works out the smallest
+expected number of shots needed to sink a fleet whose layout is picked
+uniformly at random from every legal layout, and the shot that reaches it.
+Meant as ground truth for judging the computer players on small boards.
+
+A state of the game is what the player sees on the board: a bitmask of the
+shot cells, a bitmask of the hits and a bitmask of the sunken cells of each
+ship type (the board shows sunken ships by their initials). The fleets that
+could still be on the board follow from the state, so the expected shots of a
+state only has to be worked out once. States are stored in a transposition
+table under their canonical form, the smallest of the state's mirror images
+and rotations, since mirroring the board doesn't change the game.
+
+The search goes through every cell in every state, so it is only practical
+up to about 4x4 boards with a couple of ships.
+
+Usage: python optimal_solver.py <number of rows> <number of columns>
+       <ship type> [<ship type> ...]
+"""
+
+import sys
+import time
+from collections import deque
+
+from Laivanupotus_v3 import SHIP_TYPES, Board, column_names
+from fleet_generator import PlacementTable
+
+# largest board the solver agrees to work on
+MAX_SOLVER_AREA = 36
+
+# states kept in the transposition table before old ones are evicted
+TABLE_SIZE = 1 << 20
+
+# share of the table evicted at once when it is full
+EVICTION_FRACTION = 0.25
+
+# outcomes of a shot, as the first item of an outcome key
+OUTCOME_MISS = 0
+OUTCOME_HIT = 1
+OUTCOME_SUNK = 2
+
+
+class TranspositionTable:
+    """
+    A size-bounded store of solved states. Every state is stored with the
+    number of fleets still possible in it, which tells roughly how much work
+    it would be to solve it again. When the table is full, EVICTION_FRACTION of
+    the states are thrown away, cheapest first and oldest first among equally
+    cheap ones. An evicted state is simply solved again if it comes up, so
+    eviction only costs time.
+    """
+
+    def __init__(self, max_entries=TABLE_SIZE):
+        """Initializes an empty table
+
+        :param max_entries: int, number of states kept at most
+        """
+
+        self.__max_entries = max(max_entries, 1)
+        self.__entries = {}
+        # keys of the stored states by their cost, in the order they were
+        # stored
+        self.__keys_by_cost = []
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def lookup(self, key):
+        """Getter for a solved state
+
+        :param key: int, canonical state
+        :return: float, expected shots of the state, or None if it isn't in
+        the table
+        """
+
+        value = self.__entries.get(key)
+        if value is None:
+            self.__misses += 1
+        else:
+            self.__hits += 1
+
+        return value
+
+    def store(self, key, value, cost):
+        """Stores a solved state, evicting cheap states if the table is full
+
+        :param key: int, canonical state
+        :param value: float, expected shots of the state
+        :param cost: int, number of fleets still possible in the state
+        :return:
+        """
+
+        if len(self.__entries) >= self.__max_entries:
+            self.__evict(max(int(self.__max_entries * EVICTION_FRACTION), 1))
+
+        while len(self.__keys_by_cost) <= cost:
+            self.__keys_by_cost.append(deque())
+
+        self.__entries[key] = value
+        self.__keys_by_cost[cost].append(key)
+
+    def __evict(self, number_evicted):
+        """Throws away states, the cheapest first
+
+        :param number_evicted: int, number of states to throw away
+        :return:
+        """
+
+        self.__evictions += number_evicted
+
+        for keys in self.__keys_by_cost:
+            while keys and number_evicted > 0:
+                del self.__entries[keys.popleft()]
+                number_evicted -= 1
+            if number_evicted == 0:
+                return
+
+    def get_statistics(self):
+        """Getter for the usage of the table
+
+        :return: dict, entries, hits, misses and evictions
+        """
+
+        return {"entries": len(self.__entries), "hits": self.__hits,
+                "misses": self.__misses, "evictions": self.__evictions}
+
+
+def board_symmetries(number_of_rows, number_of_columns):
+    """Lists the mirror images and rotations that turn the board onto itself
+
+    :param number_of_rows: int, height of the board
+    :param number_of_columns: int, width of the board
+    :return: list, for each symmetry a list mapping every cell index to the
+    index it moves to
+    """
+
+    def cell(row_number, column_number):
+        return row_number * number_of_columns + column_number
+
+    last_row = number_of_rows - 1
+    last_column = number_of_columns - 1
+    symmetries = []
+
+    # mirror images and rotations as functions of (row, column)
+    transforms = [
+        lambda row, column: cell(row, column),
+        lambda row, column: cell(row, last_column - column),
+        lambda row, column: cell(last_row - row, column),
+        lambda row, column: cell(last_row - row, last_column - column)
+    ]
+    # turning the board a quarter swaps its width and height
+    if number_of_rows == number_of_columns:
+        transforms += [
+            lambda row, column: cell(column, row),
+            lambda row, column: cell(last_column - column, last_row - row),
+            lambda row, column: cell(column, last_row - row),
+            lambda row, column: cell(last_column - column, row)
+        ]
+
+    for transform in transforms:
+        symmetries.append([transform(row, column)
+                           for row in range(0, number_of_rows)
+                           for column in range(0, number_of_columns)])
+
+    return symmetries
+
+
+def byte_tables(permutation):
+    """Builds lookup tables that apply a cell permutation to a bitmask one
+    byte at a time
+
+    :param permutation: list, index each cell index moves to
+    :return: list, for each byte of the mask a list of 256 permuted masks
+    """
+
+    tables = []
+
+    for byte_number in range(0, (len(permutation) + 7) // 8):
+        table = [0] * 256
+        for byte_value in range(1, 256):
+            mask = 0
+            for bit in range(0, 8):
+                index = byte_number * 8 + bit
+                if byte_value >> bit & 1 and index < len(permutation):
+                    mask |= 1 << permutation[index]
+            table[byte_value] = mask
+        tables.append(table)
+
+    return tables
+
+
+class OptimalSolver:
+    """
+    Solves the games of one board size and fleet composition. The
+    transposition table is kept between calls, so solving many states of the
+    same game gets cheaper as it goes.
+    """
+
+    def __init__(self, number_of_rows, board_columns, fleet_composition,
+                 table_size=TABLE_SIZE):
+        """Initializes a solver and lists every layout of the fleet
+
+        :param number_of_rows: int, height of the board
+        :param board_columns: list, column names of the board
+        :param fleet_composition: list, ship types of the fleet
+        :param table_size: int, states kept in the transposition table
+        :raises: ValueError, if the board is too large or the fleet doesn't
+        fit on it
+        """
+
+        area = number_of_rows * len(board_columns)
+        if area > MAX_SOLVER_AREA:
+            raise ValueError(f"The board is too large to solve, at most "
+                             f"{MAX_SOLVER_AREA} cells!")
+
+        self.__number_of_rows = number_of_rows
+        self.__board_columns = board_columns
+
+        # ships of the same type are kept next to each other, so that their
+        # order can be fixed when listing the layouts
+        self.__fleet_composition = sorted(fleet_composition,
+                                          key=list(SHIP_TYPES).index)
+        self.__ship_types = sorted(set(self.__fleet_composition),
+                                   key=list(SHIP_TYPES).index)
+        self.__number_of_ships = len(self.__fleet_composition)
+
+        self.__fleets = self.__list_fleets()
+        if not self.__fleets:
+            raise ValueError("The fleet doesn't fit on the board!")
+
+        # a state is packed into one int, the shot mask first, then the hit
+        # mask and the sunken cells of each type, area bits each. The tables
+        # move every part of the packed state at once
+        self.__area = area
+        number_of_parts = 2 + len(self.__ship_types)
+        self.__symmetry_tables = [
+            byte_tables([part * area + permutation[index]
+                         for part in range(0, number_of_parts)
+                         for index in range(0, area)])
+            for permutation
+            in board_symmetries(number_of_rows, len(board_columns))]
+        self.__table = TranspositionTable(table_size)
+
+    def __list_fleets(self):
+        """Lists every layout of the fleet. Ships of the same type are
+        interchangeable, so each set of their placements is listed once
+
+        :return: list, for each layout a tuple (occupied cells mask, tuple of
+        (ship type number, ship mask) pairs)
+        """
+
+        placement_masks = {}
+        for ship_type in self.__ship_types:
+            placement_masks[ship_type] = PlacementTable(
+                SHIP_TYPES[ship_type], self.__number_of_rows,
+                self.__board_columns).get_masks()
+
+        fleets = []
+
+        def place(ship_number, first_placement, occupied, ships):
+            if ship_number == self.__number_of_ships:
+                fleets.append((occupied, tuple(ships)))
+                return
+
+            ship_type = self.__fleet_composition[ship_number]
+            type_number = self.__ship_types.index(ship_type)
+            masks = placement_masks[ship_type]
+
+            for placement in range(first_placement, len(masks)):
+                if masks[placement] & occupied:
+                    continue
+
+                # the next ship of the same type starts after this one's
+                # placement, so the same pair isn't listed both ways
+                if ship_number + 1 < self.__number_of_ships and \
+                        self.__fleet_composition[ship_number + 1] == \
+                        ship_type:
+                    next_first = placement + 1
+                else:
+                    next_first = 0
+
+                ships.append((type_number, masks[placement]))
+                place(ship_number + 1, next_first,
+                      occupied | masks[placement], ships)
+                ships.pop()
+
+        place(0, 0, 0, [])
+
+        return fleets
+
+    def get_number_of_fleets(self):
+        """Getter for the number of layouts of the fleet
+
+        :return: int, number of layouts
+        """
+
+        return len(self.__fleets)
+
+    def get_table(self):
+        """Getter for the transposition table
+
+        :return: TranspositionTable, table of solved states
+        """
+
+        return self.__table
+
+    def __pack(self, shot_mask, hit_mask, sunk_masks):
+        """Packs a state into one int, area bits per mask
+
+        :param shot_mask: int, shot cells
+        :param hit_mask: int, hit cells
+        :param sunk_masks: tuple, sunken cells of each ship type
+        :return: int, packed state
+        """
+
+        packed = shot_mask | hit_mask << self.__area
+        shift = 2 * self.__area
+        for sunk_mask in sunk_masks:
+            packed |= sunk_mask << shift
+            shift += self.__area
+
+        return packed
+
+    def __canonical(self, packed):
+        """Turns a state into its canonical form, the smallest of its mirror
+        images and rotations
+
+        :param packed: int, state packed with __pack
+        :return: int, canonical state packed into one int
+        """
+
+        # the packed state split into bytes once, for every symmetry
+        packed_bytes = packed.to_bytes(len(self.__symmetry_tables[0]),
+                                       "little")
+
+        best = None
+        for tables in self.__symmetry_tables:
+            image = 0
+            for table, byte_value in zip(tables, packed_bytes):
+                image |= table[byte_value]
+
+            if best is None or image < best:
+                best = image
+
+        return best
+
+    def __split_outcomes(self, index, hit_mask, candidates):
+        """Sorts the possible fleets by what shooting a cell would show
+
+        :param index: int, index of the cell
+        :param hit_mask: int, hit cells before the shot
+        :param candidates: list, fleets that are still possible
+        :return: dict, outcome keys mapped to lists of fleets. The key is
+        (OUTCOME_MISS,), (OUTCOME_HIT,) or (OUTCOME_SUNK, ship type number,
+        ship mask)
+        """
+
+        cell_bit = 1 << index
+        new_hits = hit_mask | cell_bit
+        outcomes = {}
+
+        for candidate in candidates:
+            occupied, ships = candidate
+            if not occupied & cell_bit:
+                outcome = (OUTCOME_MISS,)
+            else:
+                for type_number, ship_mask in ships:
+                    if ship_mask & cell_bit:
+                        break
+                # the ship sinks if the shot hit its last cell
+                if ship_mask & ~new_hits:
+                    outcome = (OUTCOME_HIT,)
+                else:
+                    outcome = (OUTCOME_SUNK, type_number, ship_mask)
+
+            if outcome in outcomes:
+                outcomes[outcome].append(candidate)
+            else:
+                outcomes[outcome] = [candidate]
+
+        return outcomes
+
+    def __solve(self, shot_mask, hit_mask, sunk_masks, sunk_count,
+                candidates):
+        """Works out the smallest expected number of shots left in a state
+
+        :param shot_mask: int, shot cells
+        :param hit_mask: int, hit cells
+        :param sunk_masks: tuple, sunken cells of each ship type
+        :param sunk_count: int, number of ships sunk
+        :param candidates: list, fleets that are still possible
+        :return: tuple, (expected shots left, best cell index or None)
+        """
+
+        if sunk_count == self.__number_of_ships:
+            return 0.0, None
+
+        # cells that have a ship in some possible fleet. Shooting anywhere
+        # else is a sure miss and can't be part of the best play
+        possible_cells = 0
+        for occupied, _ in candidates:
+            possible_cells |= occupied
+        possible_cells &= ~shot_mask
+
+        number_of_candidates = len(candidates)
+        best_expected = None
+        best_index = None
+
+        while possible_cells:
+            cell_bit = possible_cells & -possible_cells
+            possible_cells ^= cell_bit
+            index = cell_bit.bit_length() - 1
+
+            expected = 1.0
+            for outcome, outcome_candidates in self.__split_outcomes(
+                    index, hit_mask, candidates).items():
+                if outcome[0] == OUTCOME_MISS:
+                    next_state = (shot_mask | cell_bit, hit_mask, sunk_masks,
+                                  sunk_count)
+                elif outcome[0] == OUTCOME_HIT:
+                    next_state = (shot_mask | cell_bit, hit_mask | cell_bit,
+                                  sunk_masks, sunk_count)
+                else:
+                    _, type_number, ship_mask = outcome
+                    next_sunk = list(sunk_masks)
+                    next_sunk[type_number] |= ship_mask
+                    next_state = (shot_mask | cell_bit, hit_mask | cell_bit,
+                                  tuple(next_sunk), sunk_count + 1)
+
+                expected += len(outcome_candidates) / number_of_candidates * \
+                    self.__expected(*next_state, outcome_candidates)
+
+                # already worse than the best cell, no need to finish it
+                if best_expected is not None and expected >= best_expected:
+                    break
+
+            if best_expected is None or expected < best_expected:
+                best_expected = expected
+                best_index = index
+
+        return best_expected, best_index
+
+    def __expected(self, shot_mask, hit_mask, sunk_masks, sunk_count,
+                   candidates):
+        """Expected shots left in a state, through the transposition table
+
+        :param shot_mask: int, shot cells
+        :param hit_mask: int, hit cells
+        :param sunk_masks: tuple, sunken cells of each ship type
+        :param sunk_count: int, number of ships sunk
+        :param candidates: list, fleets that are still possible
+        :return: float, expected shots left
+        """
+
+        if sunk_count == self.__number_of_ships:
+            return 0.0
+
+        key = self.__canonical(self.__pack(shot_mask, hit_mask, sunk_masks))
+        expected = self.__table.lookup(key)
+
+        if expected is None:
+            expected = self.__solve(shot_mask, hit_mask, sunk_masks,
+                                    sunk_count, candidates)[0]
+            self.__table.store(key, expected, len(candidates))
+
+        return expected
+
+    def __consistent_fleets(self, shot_mask, hit_mask, sunk_masks):
+        """Lists the fleets that agree with a state
+
+        :param shot_mask: int, shot cells
+        :param hit_mask: int, hit cells
+        :param sunk_masks: tuple, sunken cells of each ship type
+        :return: list, fleets that could be on the board
+        """
+
+        candidates = []
+
+        for candidate in self.__fleets:
+            occupied, ships = candidate
+            if occupied & shot_mask != hit_mask:
+                continue
+
+            # every ship that has been hit in all its cells has sunk, and
+            # only those
+            fleet_sunk = [0] * len(self.__ship_types)
+            for type_number, ship_mask in ships:
+                if not ship_mask & ~hit_mask:
+                    fleet_sunk[type_number] |= ship_mask
+            if tuple(fleet_sunk) == sunk_masks:
+                candidates.append(candidate)
+
+        return candidates
+
+    def solve(self, shot_mask=0, hit_mask=0, sunk_masks=None):
+        """Works out the best shot and the expected shots left in a state
+
+        :param shot_mask: int, shot cells. By default the start of the game
+        :param hit_mask: int, hit cells
+        :param sunk_masks: dict, ship types mapped to their sunken cells
+        :return: tuple, (expected shots left, best cell index or None if the
+        game is over)
+        :raises: ValueError, if no fleet agrees with the state
+        """
+
+        if sunk_masks is None:
+            sunk_masks = {}
+        sunk_tuple = tuple(sunk_masks.get(ship_type, 0)
+                           for ship_type in self.__ship_types)
+
+        candidates = self.__consistent_fleets(shot_mask, hit_mask,
+                                              sunk_tuple)
+        if not candidates:
+            raise ValueError("No fleet agrees with the board!")
+
+        # every possible fleet has the same ships sunk, so any will do
+        sunk_count = sum(1 for _, ship_mask in candidates[0][1]
+                         if not ship_mask & ~hit_mask)
+
+        return self.__solve(shot_mask, hit_mask, sunk_tuple, sunk_count,
+                            candidates)
+
+    def solve_board(self, game_board):
+        """Works out the best shot and the expected shots left on a board
+
+        :param game_board: Board, board of the solver's size
+        :return: tuple, (expected shots left, best cell index or None if the
+        game is over)
+        :raises: ValueError, if no fleet of the solver agrees with the board
+        """
+
+        sunk_masks = {}
+        for sunken_ship in game_board.get_sunken_ships():
+            ship_mask = 0
+            for index in game_board.get_ship_indices(sunken_ship):
+                ship_mask |= 1 << index
+            ship_type = sunken_ship.get_ship_type()
+            sunk_masks[ship_type] = sunk_masks.get(ship_type, 0) | ship_mask
+
+        return self.solve(
+            int.from_bytes(game_board.get_shot_bitmap(), "little"),
+            int.from_bytes(game_board.get_hit_bitmap(), "little"),
+            sunk_masks)
+
+
+# solvers of the OptimalPlayers by board size and fleet composition
+SOLVERS = {}
+
+
+class OptimalPlayer:
+    """
+    A computer player that always takes the best shot of the solver. Has the
+    same interface as the players of the simulation.
+    """
+
+    def __init__(self, game_board, fleet_composition=None, seed=None):
+        """Initializes the player for a board
+
+        :param game_board: Board, board to play on
+        :param fleet_composition: list, ship types of the fleet being shot
+        at. By default one of each type in SHIP_TYPES
+        :param seed: int, not used, the player has no randomness
+        :raises: ValueError, if the board is too large to solve
+        """
+
+        if fleet_composition is None:
+            fleet_composition = list(SHIP_TYPES)
+
+        self.__game_board = game_board
+
+        # players of the same game share a solver, so its table carries over
+        # from game to game
+        solver_key = (game_board.get_number_of_rows(),
+                      tuple(game_board.get_columns()),
+                      tuple(sorted(fleet_composition)))
+        if solver_key not in SOLVERS:
+            SOLVERS[solver_key] = OptimalSolver(
+                game_board.get_number_of_rows(), game_board.get_columns(),
+                fleet_composition)
+        self.__solver = SOLVERS[solver_key]
+
+    def choose_index(self):
+        """Picks the cell to shoot next
+
+        :return: int, index of the cell, or None if the game is over
+        """
+
+        return self.__solver.solve_board(self.__game_board)[1]
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("Usage: python optimal_solver.py <number of rows> "
+              "<number of columns> <ship type> [<ship type> ...]")
+        return
+
+    try:
+        number_of_rows = int(sys.argv[1])
+        board_columns = column_names(int(sys.argv[2]))
+    except ValueError:
+        print("Board size must be two integers!")
+        return
+
+    for ship_type in sys.argv[3:]:
+        if ship_type not in SHIP_TYPES:
+            print(f"Unknown ship type {ship_type}!")
+            return
+
+    start_time = time.perf_counter()
+    try:
+        solver = OptimalSolver(number_of_rows, board_columns, sys.argv[3:])
+        expected, best_index = solver.solve()
+    except ValueError as error_message:
+        print(error_message)
+        return
+    seconds = time.perf_counter() - start_time
+
+    game_board = Board(number_of_rows, board_columns)
+    statistics = solver.get_table().get_statistics()
+    print(f"{solver.get_number_of_fleets()} fleet layouts")
+    print(f"Expected shots with optimal play: {expected:.4f}")
+    print(f"Best first shot: {game_board.index_to_coordinate(best_index)}")
+    print(f"Solved in {seconds:.2f} s, {statistics['entries']} states in "
+          f"the table, {statistics['hits']} table hits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Monte Carlo simulation of Laivanupotus. Plays large numbers of headless games
+across a pool of processes and collects how many shots each strategy needs to
+sink every ship.
+
+Every game combines a fleet with a shooting strategy. Fleets are either
+generated at random with FleetGenerator as compact Fleets or given as fleet
+files, which are read once and parsed with lines_to_ship_list for each game.
+Games are split into chunks, and each chunk gets its own seed derived from the
+base seed and the chunk number, so the results don't depend on the number of
+workers.
+
+Usage: python simulation.py --games 100000 --strategy random probability
+"""
+
+import argparse
+import random
+from collections import Counter
+from multiprocessing import Pool
+
+from Laivanupotus_v3 import NUMBER_OF_ROWS, BOARD_COLUMNS, SHIP_TYPES, \
+    Board, column_names, lines_to_ship_list, read_lines_from_file
+from fleet import place_fleet
+from fleet_generator import FleetGenerator
+from targeting_ai import ProbabilityTargetingAI, play_game
+
+# how many games a worker plays before sending its results back
+GAMES_PER_CHUNK = 1000
+
+
+class RandomPlayer:
+    """
+    A player that shoots every cell of the board once, in random order.
+    """
+
+    def __init__(self, game_board, fleet_composition=None, seed=None):
+        """Initializes the player for a board
+
+        :param game_board: Board, board to play on
+        :param fleet_composition: list, not used. Here so that every strategy
+        can be made the same way
+        :param seed: int, seed for the shooting order
+        """
+
+        number_of_cells = len(game_board.get_columns()) * \
+            game_board.get_number_of_rows()
+        self.__cells_left = list(range(0, number_of_cells))
+        random.Random(seed).shuffle(self.__cells_left)
+
+    def choose_index(self):
+        """Picks the cell to shoot next
+
+        :return: int, index of the cell, or None if every cell has been shot
+        """
+
+        if not self.__cells_left:
+            return None
+
+        return self.__cells_left.pop()
+
+
+# shooting strategies by name. A strategy is made with a board, the ship types
+# of the fleet and a seed, and has a choose_index method
+STRATEGIES = {
+    "random": RandomPlayer,
+    "probability": ProbabilityTargetingAI
+}
+
+
+def simulate_chunk(task):
+    """Plays one chunk of games. Run by the worker processes
+
+    :param task: tuple, (chunk number, number of games, strategy name,
+    fleets, number of rows, number of columns, fleet composition, base seed).
+    fleets is a list of fleets in string format, or None to generate a fleet
+    for every game
+    :return: tuple, (strategy name, Counter of shots-to-win)
+    """
+
+    chunk_number, number_of_games, strategy_name, fleets, number_of_rows, \
+        number_of_columns, fleet_composition, base_seed = task
+
+    # seeded from the chunk, not the process, so that the same chunk always
+    # plays the same games
+    random_generator = random.Random(f"{base_seed}-{strategy_name}-"
+                                     f"{chunk_number}")
+    board_columns = column_names(number_of_columns)
+    strategy = STRATEGIES[strategy_name]
+    shots_to_win = Counter()
+
+    if fleets is None:
+        fleet_generator = FleetGenerator(number_of_rows, board_columns,
+                                         fleet_composition,
+                                         random_generator.getrandbits(32))
+
+    for _ in range(0, number_of_games):
+        game_board = Board(number_of_rows, board_columns)
+
+        if fleets is None:
+            # generated fleets skip the fleet file format altogether
+            list_of_ships = place_fleet(fleet_generator.generate_fleet(),
+                                        game_board)
+        else:
+            list_of_ships = lines_to_ship_list(
+                fleets[random_generator.randrange(len(fleets))], game_board)
+
+        player = strategy(game_board,
+                          [a_ship.get_ship_type() for a_ship in list_of_ships],
+                          seed=random_generator.getrandbits(32))
+
+        shots_to_win[play_game(game_board, player)] += 1
+
+    return strategy_name, shots_to_win
+
+
+def run_simulation(number_of_games, strategy_names, fleets=None,
+                   number_of_rows=NUMBER_OF_ROWS,
+                   number_of_columns=len(BOARD_COLUMNS),
+                   fleet_composition=None, seed=0, number_of_workers=None,
+                   games_per_chunk=GAMES_PER_CHUNK):
+    """Plays number_of_games games with each strategy across a process pool
+
+    :param number_of_games: int, games to play per strategy
+    :param strategy_names: list, names of strategies in STRATEGIES
+    :param fleets: list, fleets in string format to pick from at random, or
+    None to generate a fleet for every game
+    :param number_of_rows: int, height of the board
+    :param number_of_columns: int, width of the board
+    :param fleet_composition: list, ship types of generated fleets. By
+    default one of each type in SHIP_TYPES
+    :param seed: int, base seed of the simulation
+    :param number_of_workers: int, number of processes. By default one per
+    core, and 1 plays every game in this process
+    :param games_per_chunk: int, games a worker plays per task
+    :return: dict, strategy names mapped to Counters of shots-to-win
+    :raises: ValueError, if there are no games, a strategy is unknown or a
+    fleet is invalid
+    """
+
+    if number_of_games < 1:
+        raise ValueError("Needs at least one game!")
+
+    for strategy_name in strategy_names:
+        if strategy_name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy_name}!")
+
+    if fleet_composition is None:
+        fleet_composition = list(SHIP_TYPES)
+
+    tasks = []
+    for strategy_name in strategy_names:
+        for chunk_number, first_game in enumerate(
+                range(0, number_of_games, games_per_chunk)):
+            tasks.append((chunk_number,
+                          min(games_per_chunk, number_of_games - first_game),
+                          strategy_name, fleets, number_of_rows,
+                          number_of_columns, fleet_composition, seed))
+
+    results = {strategy_name: Counter() for strategy_name in strategy_names}
+
+    if number_of_workers == 1:
+        chunk_results = map(simulate_chunk, tasks)
+        for strategy_name, shots_to_win in chunk_results:
+            results[strategy_name].update(shots_to_win)
+    else:
+        with Pool(number_of_workers) as worker_pool:
+            for strategy_name, shots_to_win in worker_pool.imap_unordered(
+                    simulate_chunk, tasks):
+                results[strategy_name].update(shots_to_win)
+
+    return results
+
+
+def summarize(shots_to_win):
+    """Works out the statistics of a shots-to-win distribution
+
+    :param shots_to_win: Counter, number of games for each shots-to-win
+    :return: dict, games, mean, min, median, p90, p99 and max. Without any
+    games every statistic but games is None
+    """
+
+    number_of_games = sum(shots_to_win.values())
+    if number_of_games == 0:
+        return {"games": 0, "mean": None, "min": None, "median": None,
+                "p90": None, "p99": None, "max": None}
+
+    summary = {
+        "games": number_of_games,
+        "mean": sum(shots * games for shots, games in shots_to_win.items()) /
+        number_of_games,
+        "min": min(shots_to_win),
+        "max": max(shots_to_win)
+    }
+
+    # goes through the distribution in order until each percentile is reached
+    percentiles = [("median", 0.5), ("p90", 0.9), ("p99", 0.99)]
+    games_counted = 0
+    for shots in sorted(shots_to_win):
+        games_counted += shots_to_win[shots]
+        while percentiles and games_counted >= percentiles[0][1] * \
+                number_of_games:
+            summary[percentiles.pop(0)[0]] = shots
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo simulation of Laivanupotus")
+    parser.add_argument("--games", type=int, default=10000,
+                        help="games per strategy")
+    parser.add_argument("--strategy", nargs="+", default=["random"],
+                        choices=sorted(STRATEGIES), help="strategies to run")
+    parser.add_argument("--fleet", nargs="*", default=[],
+                        help="fleet files to play against instead of "
+                             "generated fleets")
+    parser.add_argument("--rows", type=int, default=NUMBER_OF_ROWS)
+    parser.add_argument("--columns", type=int, default=len(BOARD_COLUMNS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    arguments = parser.parse_args()
+
+    fleets = None
+    if arguments.fleet:
+        fleets = []
+        # every fleet is checked once here, so the workers can't fail on them
+        for file_name in arguments.fleet:
+            try:
+                fleet_lines = read_lines_from_file(file_name)
+                lines_to_ship_list(fleet_lines,
+                                   Board(arguments.rows,
+                                         column_names(arguments.columns)),
+                                   file_name)
+            except (OSError, ValueError) as error_message:
+                print(error_message)
+                return
+            fleets.append(fleet_lines)
+
+    try:
+        results = run_simulation(arguments.games, arguments.strategy, fleets,
+                                 arguments.rows, arguments.columns,
+                                 seed=arguments.seed,
+                                 number_of_workers=arguments.workers)
+    except ValueError as error_message:
+        print(error_message)
+        return
+
+    print(f"{'strategy':<12}{'games':>10}{'mean':>10}{'median':>8}"
+          f"{'p90':>6}{'p99':>6}{'max':>6}")
+    for strategy_name, shots_to_win in results.items():
+        summary = summarize(shots_to_win)
+        print(f"{strategy_name:<12}{summary['games']:>10}"
+              f"{summary['mean']:>10.2f}{summary['median']:>8}"
+              f"{summary['p90']:>6}{summary['p99']:>6}{summary['max']:>6}")
+
+
+if __name__ == "__main__":
+    main()
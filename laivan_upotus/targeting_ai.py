@@ -0,0 +1,322 @@
+"""
+Computer player for Laivanupotus. The player keeps a probability density over
+every legal placement of the ships it hasn't sunk yet and shoots the cell that
+the most placements cover.
+
+While there are hits on ships that haven't sunk, the player is in target
+mode and only counts placements that go through those hits. Otherwise it is in
+hunt mode and counts every placement that avoids misses and sunken ships.
+
+Placements are counted with NumPy sliding-window sums over the whole board,
+so a move stays fast on large boards.
+
+Usage: python targeting_ai.py ships.txt
+"""
+
+import sys
+
+import numpy as np
+
+from Laivanupotus_v3 import SHIP_TYPES, Board, load_ships_from_file
+
+HUNT_MODE = "HUNT"
+TARGET_MODE = "TARGET"
+
+# how much more a placement counts in target mode for every unresolved hit it
+# goes through. Placements through two hits line up with the ship, so they
+# should outweigh placements through one
+TARGET_WEIGHT = 100
+
+
+def bitmap_to_grid(bitmap, number_of_rows, number_of_columns):
+    """Turns a board bitmap into a grid array
+
+    :param bitmap: bytes, bitmap from Board.get_shot_bitmap or get_hit_bitmap
+    :param number_of_rows: int, height of the board
+    :param number_of_columns: int, width of the board
+    :return: numpy.ndarray, bool array of shape (rows, columns)
+    """
+
+    bits = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8),
+                         bitorder="little")
+    return bits[:number_of_rows * number_of_columns].reshape(
+        number_of_rows, number_of_columns).astype(np.bool_)
+
+
+def cumulative_sums(grid):
+    """Cumulative sums along the rows of a grid, with a zero in front of each
+    row so that the sum of any run of cells is one subtraction
+
+    :param grid: numpy.ndarray, 2D array
+    :return: numpy.ndarray, array one column wider than grid
+    """
+
+    cumulative = np.zeros((grid.shape[0], grid.shape[1] + 1), dtype=np.int32)
+    np.cumsum(grid, axis=1, out=cumulative[:, 1:])
+
+    return cumulative
+
+
+def window_sums(cumulative, length):
+    """Sums every run of length consecutive cells along the rows
+
+    :param cumulative: numpy.ndarray, cumulative sums from cumulative_sums
+    :param length: int, length of the runs
+    :return: numpy.ndarray, sum of each run, indexed by its first cell. The
+    rows are length - 1 cells shorter than in the original grid
+    """
+
+    return cumulative[:, length:] - cumulative[:, :-length]
+
+
+def spread_placements(differences, placements, length):
+    """Adds the weight of every placement to each cell it covers. The
+    reverse of window_sums.
+
+    The weights are added as differences between neighbouring cells, so
+    placements of every length can be collected into the same array and
+    turned into totals with a single cumulative sum at the end.
+
+    :param differences: numpy.ndarray, array one column wider than the grid.
+    Its cumulative sum along the rows, without the last column, gives the
+    total weight covering each cell
+    :param placements: numpy.ndarray, weight of each placement along the
+    rows, indexed by its first cell as returned by window_sums
+    :param length: int, length of the placed ship
+    :return:
+    """
+
+    differences[:, :-length] += placements
+    differences[:, length:] -= placements
+
+
+class ProbabilityTargetingAI:
+    """
+    A computer player that shoots the cell with the highest placement
+    density. It reads the hits, misses and sunken ships of the Board it plays
+    on, so it can be handed a game at any point.
+    """
+
+    def __init__(self, game_board, fleet_composition=None, seed=None):
+        """Initializes the player for a board
+
+        :param game_board: Board, board to play on
+        :param fleet_composition: list, ship types of the fleet being shot
+        at. By default one of each type in SHIP_TYPES
+        :param seed: int, seed for breaking ties between equally good cells
+        """
+
+        self.__game_board = game_board
+        self.__number_of_rows = game_board.get_number_of_rows()
+        self.__number_of_columns = len(game_board.get_columns())
+
+        if fleet_composition is None:
+            fleet_composition = list(SHIP_TYPES)
+        self.__fleet_composition = list(fleet_composition)
+
+        self.__random_generator = np.random.default_rng(seed)
+
+        # cells of the sunken ships. Updated as ships sink, so only new
+        # sinkings have to be looked at on each move
+        self.__sunken_grid = np.zeros(
+            (self.__number_of_rows, self.__number_of_columns), dtype=np.bool_)
+        self.__ships_processed = 0
+        self.__remaining_ships = list(self.__fleet_composition)
+
+    def __update_sunken_ships(self):
+        """Moves newly sunken ships from the remaining ships to the sunken
+        grid
+
+        :return:
+        """
+
+        sunken_ships = self.__game_board.get_sunken_ships()
+
+        for sunken_ship in sunken_ships[self.__ships_processed:]:
+            for index in self.__game_board.get_ship_indices(sunken_ship):
+                self.__sunken_grid.flat[index] = True
+
+            if sunken_ship.get_ship_type() in self.__remaining_ships:
+                self.__remaining_ships.remove(sunken_ship.get_ship_type())
+
+        self.__ships_processed = len(sunken_ships)
+
+    def get_remaining_ships(self):
+        """Getter for the ship types the player still has to sink
+
+        :return: list, ship types
+        """
+
+        self.__update_sunken_ships()
+        return self.__remaining_ships
+
+    def density(self):
+        """Counts the remaining ship placements covering each cell
+
+        :return: tuple, (numpy.ndarray of placement weights per cell, mode the
+        weights were counted in)
+        """
+
+        self.__update_sunken_ships()
+
+        shot_grid = bitmap_to_grid(self.__game_board.get_shot_bitmap(),
+                                   self.__number_of_rows,
+                                   self.__number_of_columns)
+        hit_grid = bitmap_to_grid(self.__game_board.get_hit_bitmap(),
+                                  self.__number_of_rows,
+                                  self.__number_of_columns)
+
+        # no ship can go through a miss or a ship that already sank
+        blocked_grid = (shot_grid & ~hit_grid) | self.__sunken_grid
+        # hits on ships that are still afloat
+        open_hit_grid = hit_grid & ~self.__sunken_grid
+
+        if open_hit_grid.any():
+            mode = TARGET_MODE
+        else:
+            mode = HUNT_MODE
+
+        density = np.zeros((self.__number_of_rows, self.__number_of_columns),
+                           dtype=np.int64)
+
+        # ships of the same length have the same placements
+        ship_counts = {}
+        for ship_type in self.__remaining_ships:
+            length = SHIP_TYPES[ship_type]
+            ship_counts[length] = ship_counts.get(length, 0) + 1
+
+        # horizontal placements run along the rows of the grids, vertical
+        # ones along the rows of the transposed grids
+        for transposed in (False, True):
+            if transposed:
+                blocked_rows = np.ascontiguousarray(blocked_grid.T)
+                hit_rows = np.ascontiguousarray(open_hit_grid.T)
+            else:
+                blocked_rows = blocked_grid
+                hit_rows = open_hit_grid
+
+            blocked_cumulative = cumulative_sums(blocked_rows)
+            if mode == TARGET_MODE:
+                hit_cumulative = cumulative_sums(hit_rows)
+
+            differences = np.zeros(blocked_cumulative.shape, dtype=np.int64)
+
+            for length, ship_count in ship_counts.items():
+                # a ship of one cell is the same placement both ways
+                if length > blocked_rows.shape[1] or \
+                        length == 1 and transposed:
+                    continue
+
+                legal = window_sums(blocked_cumulative, length) == 0
+
+                if mode == TARGET_MODE:
+                    hits_covered = window_sums(hit_cumulative,
+                                               length).astype(np.int64)
+                    weights = np.where(legal,
+                                       hits_covered * TARGET_WEIGHT **
+                                       np.maximum(hits_covered - 1, 0), 0)
+                else:
+                    weights = legal.astype(np.int64)
+
+                spread_placements(differences, ship_count * weights, length)
+
+            coverage = np.cumsum(differences[:, :-1], axis=1)
+            if transposed:
+                density += coverage.T
+            else:
+                density += coverage
+
+        # cells already shot at aren't worth shooting again
+        density[shot_grid] = 0
+
+        return density, mode
+
+    def get_mode(self):
+        """Getter for the mode the player is in
+
+        :return: str, HUNT_MODE or TARGET_MODE
+        """
+
+        return self.density()[1]
+
+    def choose_index(self):
+        """Picks the cell to shoot next
+
+        :return: int, index of the cell, or None if every cell has been shot
+        """
+
+        density, mode = self.density()
+        density = density.ravel()
+
+        best = density.max()
+        if best <= 0:
+            # no placement fits, which only happens if the fleet composition
+            # is wrong. Falls back to any cell not shot yet
+            shot_grid = bitmap_to_grid(self.__game_board.get_shot_bitmap(),
+                                       self.__number_of_rows,
+                                       self.__number_of_columns)
+            candidates = np.flatnonzero(~shot_grid.ravel())
+        else:
+            candidates = np.flatnonzero(density == best)
+
+        if len(candidates) == 0:
+            return None
+
+        return int(self.__random_generator.choice(candidates))
+
+    def choose_shot(self):
+        """Picks the coordinate to shoot next
+
+        :return: str, coordinate (ex. A1), or None if every cell has been shot
+        """
+
+        index = self.choose_index()
+        if index is None:
+            return None
+
+        return self.__game_board.index_to_coordinate(index)
+
+
+def play_game(game_board, player):
+    """Lets a computer player shoot until every ship on the board has sunk
+
+    :param game_board: Board, board with the fleet placed on it
+    :param player: object, player with a choose_index method
+    :return: int, number of shots it took
+    """
+
+    shots_fired = 0
+
+    while not game_board.all_ships_sunk():
+        index = player.choose_index()
+        if index is None:
+            break
+        game_board.shoot_index(index)
+        shots_fired += 1
+
+    return shots_fired
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python targeting_ai.py <fleet file>")
+        return
+
+    game_board = Board()
+
+    try:
+        list_of_ships = load_ships_from_file(sys.argv[1], game_board)
+    except (OSError, ValueError) as error_message:
+        print(error_message)
+        return
+
+    player = ProbabilityTargetingAI(
+        game_board, [a_ship.get_ship_type() for a_ship in list_of_ships])
+    shots_fired = play_game(game_board, player)
+
+    game_board.printout()
+    print(f"The computer sank all ships in {shots_fired} shots.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Tests for the binary fleet files of binary_fleet.
+"""
+
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+
+# the modules of the game import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from Laivanupotus_v3 import BOARD_COLUMNS, NUMBER_OF_ROWS, Board, \
+    lines_to_ship_list  # noqa: E402
+from binary_fleet import HEADER_SIZE, BinaryFleet, load_binary_fleet, \
+    write_binary_fleet  # noqa: E402
+
+FLEET_LINES = ["destroyer;A1;A2", "submarine;C3", "cruiser;E1;E2;E3"]
+
+
+class BinaryFleetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.fleet_name = os.path.join(self.directory, "ships.fleet")
+
+        game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        self.list_of_ships = lines_to_ship_list(FLEET_LINES, game_board)
+        write_binary_fleet(self.fleet_name, self.list_of_ships, game_board)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_offsets(self, offsets):
+        """Overwrites the offsets of the test fleet file
+
+        :param offsets: tuple, new offsets, one more than there are ships
+        :return:
+        """
+
+        with open(self.fleet_name, mode="r+b") as fleet_file:
+            fleet_file.seek(HEADER_SIZE)
+            fleet_file.write(struct.pack(f"<{len(offsets)}I", *offsets))
+
+    def test_round_trip(self):
+        game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        loaded_ships = load_binary_fleet(self.fleet_name, game_board)
+
+        self.assertEqual(
+            [(a_ship.get_ship_type(), a_ship.get_coordinate_list())
+             for a_ship in loaded_ships],
+            [(a_ship.get_ship_type(), a_ship.get_coordinate_list())
+             for a_ship in self.list_of_ships])
+        self.assertEqual(game_board.shoot("A1"), "HIT")
+        self.assertEqual(game_board.shoot("A2"), "SUNK")
+        self.assertEqual(game_board.get_ships_left(), 2)
+
+    def test_corrupt_offsets_are_rejected(self):
+        for offsets in [(1, 2, 3, 6), (0, 3, 2, 6), (0, 2, 3, 5)]:
+            self.write_offsets(offsets)
+            with self.assertRaises(ValueError):
+                BinaryFleet(self.fleet_name)
+
+    def test_close_while_cells_are_held(self):
+        binary_fleet = BinaryFleet(self.fleet_name)
+        ship_indices = binary_fleet.get_cell_indices(2)
+        self.assertEqual(list(ship_indices), [14, 24, 34])
+
+        binary_fleet.close()
+
+        # the cells were copied out, so they outlive the mapping
+        self.assertEqual(list(ship_indices), [14, 24, 34])
+
+
+if __name__ == "__main__":
+    unittest.main()
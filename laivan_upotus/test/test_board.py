@@ -0,0 +1,161 @@
+"""
+Tests for Board and its BitBoard and SparseBoard engines.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# the modules of the game import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from Laivanupotus_v3 import BOARD_COLUMNS, NUMBER_OF_ROWS, BitBoard, Board, \
+    Ship, SparseBoard, lines_to_ship_list  # noqa: E402
+from fleet_generator import FleetGenerator  # noqa: E402
+
+
+class BoardEngineTest(unittest.TestCase):
+
+    def test_engines_agree_on_every_shot(self):
+        random_generator = random.Random(1)
+        width = len(BOARD_COLUMNS)
+        number_of_cells = width * NUMBER_OF_ROWS
+        engines = [BitBoard(width, NUMBER_OF_ROWS),
+                   SparseBoard(width, NUMBER_OF_ROWS)]
+
+        occupied_cells = random_generator.sample(range(0, number_of_cells),
+                                                 17)
+        for engine in engines:
+            engine.place_cells(occupied_cells)
+
+        for index in random_generator.sample(range(0, number_of_cells),
+                                             number_of_cells):
+            self.assertEqual([engine.is_shot(index) for engine in engines],
+                             [False, False])
+            self.assertEqual(len({engine.shoot(index) for engine in engines}),
+                             1)
+            self.assertEqual(len({engine.all_sunk() for engine in engines}),
+                             1)
+
+        self.assertTrue(engines[0].all_sunk())
+        self.assertEqual(engines[0].get_shot_bitmap(),
+                         engines[1].get_shot_bitmap())
+        self.assertEqual(engines[0].get_hit_bitmap(),
+                         engines[1].get_hit_bitmap())
+
+    def test_boards_agree_on_every_shot(self):
+        fleet_generator = FleetGenerator(seed=2)
+        random_generator = random.Random(2)
+        number_of_cells = NUMBER_OF_ROWS * len(BOARD_COLUMNS)
+
+        for _ in range(0, 10):
+            list_of_ships = fleet_generator.generate_ships()
+            boards = [Board(NUMBER_OF_ROWS, BOARD_COLUMNS, sparse=sparse)
+                      for sparse in (False, True)]
+            # each board gets its own Ships, since Ships keep their damage
+            for game_board in boards:
+                game_board.place_ships(
+                    [Ship(a_ship.get_ship_type(),
+                          list(a_ship.get_coordinate_list()))
+                     for a_ship in list_of_ships])
+
+            shot_indices = random_generator.sample(range(0, number_of_cells),
+                                                   number_of_cells)
+            for index in shot_indices + shot_indices[:5]:
+                self.assertEqual(boards[0].shoot_index(index),
+                                 boards[1].shoot_index(index))
+
+            # a coordinate shot twice is already shot on both engines
+            self.assertEqual(boards[0].shoot("A0"), boards[1].shoot("A0"))
+            self.assertEqual(boards[0].get_shot_bitmap(),
+                             boards[1].get_shot_bitmap())
+            self.assertTrue(boards[0].all_ships_sunk())
+            self.assertTrue(boards[1].all_ships_sunk())
+
+
+class FleetIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        self.destroyer = Ship("destroyer", ["B1", "B2"])
+        self.submarine = Ship("submarine", ["D5"])
+        self.game_board.place_ships([self.destroyer, self.submarine])
+
+    def test_ship_at_every_cell(self):
+        self.assertIs(self.game_board.get_ship_at("B1"), self.destroyer)
+        self.assertIs(self.game_board.get_ship_at("B2"), self.destroyer)
+        self.assertIs(self.game_board.get_ship_at("D5"), self.submarine)
+        self.assertIsNone(self.game_board.get_ship_at("A1"))
+
+    def test_shots_damage_the_ship_in_the_cell(self):
+        sunken_ships = []
+        self.game_board.add_sink_listener(sunken_ships.append)
+
+        self.assertEqual(self.game_board.shoot("A1"), "MISS")
+        self.assertEqual(self.game_board.shoot("B1"), "HIT")
+        self.assertEqual(self.game_board.shoot("B1"), "ALREADY SHOT")
+        self.assertEqual(self.game_board.shoot("B2"), "SUNK")
+        self.assertEqual(sunken_ships, [self.destroyer])
+        self.assertEqual(self.submarine.get_ship_health(), 1)
+        self.assertEqual(self.game_board.get_ships_left(), 1)
+
+        self.assertEqual(self.game_board.shoot("D5"), "SUNK")
+        self.assertTrue(self.game_board.all_ships_sunk())
+
+    def test_shot_off_the_board(self):
+        with self.assertRaises(ValueError):
+            self.game_board.shoot("K1")
+
+
+class FleetValidationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+
+    def assert_error(self, fleet_lines, error_text):
+        """Checks that a fleet is rejected with given text in the error
+
+        :param fleet_lines: list, ships in string format
+        :param error_text: str, text the error has to contain
+        :return:
+        """
+
+        with self.assertRaises(ValueError) as raised:
+            lines_to_ship_list(fleet_lines, self.game_board, "ships.txt")
+        self.assertIn(error_text, str(raised.exception))
+
+    def test_valid_fleet_is_placed(self):
+        list_of_ships = lines_to_ship_list(
+            ["battleship;A1;A2;A3;A4", "", "submarine;C3"], self.game_board)
+
+        self.assertEqual(len(list_of_ships), 2)
+        self.assertEqual(self.game_board.get_ships_left(), 2)
+        self.assertIs(self.game_board.get_ship_at("A4"), list_of_ships[0])
+
+    def test_overlapping_ships(self):
+        self.assert_error(["destroyer;A1;A2", "submarine;C3",
+                           "cruiser;A2;A3;A4", "submarine;A1"],
+                          "ships.txt: There are overlapping ships in the "
+                          "input file!\nA2 on lines 1, 3\nA1 on lines 1, 4")
+
+    def test_ship_repeating_a_coordinate(self):
+        self.assert_error(["destroyer;B1;B2", "cruiser;A1;A1;A2"],
+                          "ships.txt, line 2: Ship repeats A1!")
+
+    def test_coordinate_off_the_board(self):
+        self.assert_error(["destroyer;J9;K9"],
+                          "ships.txt, line 1: Error in ship coordinates!")
+        self.assert_error(["destroyer;A9;A10"],
+                          "ships.txt, line 1: Error in ship coordinates!")
+
+    def test_unknown_ship_type(self):
+        self.assert_error(["carrier;A1;A2"],
+                          "ships.txt, line 1: Unknown ship type carrier!")
+        self.assert_error(["submarine"],
+                          "ships.txt, line 1: Ship has no coordinates!")
+
+
+if __name__ == "__main__":
+    unittest.main()
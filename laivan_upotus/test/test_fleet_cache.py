@@ -0,0 +1,159 @@
+"""
+Tests for the parsed fleet cache of fleet_cache.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+# the modules of the game import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from Laivanupotus_v3 import BOARD_COLUMNS, NUMBER_OF_ROWS, \
+    Board  # noqa: E402
+from fleet_cache import CHECKSUM_SUFFIX, FLEET_SUFFIX, STALE_FILE_AGE, \
+    FleetCache  # noqa: E402
+
+
+class FleetCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_directory = os.path.join(self.directory, "cache")
+        self.fleet_name = self.write_fleet("ships.txt",
+                                           ["destroyer;A1;A2", "submarine;C3"])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_fleet(self, file_name, fleet_lines):
+        """Writes a text fleet file into the test directory
+
+        :param file_name: str, name of the file in the test directory
+        :param fleet_lines: list, ships in string format
+        :return: str, path of the file
+        """
+
+        path = os.path.join(self.directory, file_name)
+        with open(path, mode="w") as fleet_file:
+            fleet_file.write("\n".join(fleet_lines) + "\n")
+
+        return path
+
+    def cache_files(self, suffix):
+        """Lists the files of the cache directory with a suffix
+
+        :param suffix: str, suffix of the files
+        :return: list, paths of the files
+        """
+
+        return sorted(os.path.join(self.cache_directory, file_name)
+                      for file_name in os.listdir(self.cache_directory)
+                      if file_name.endswith(suffix))
+
+    def load(self, fleet_cache, file_name=None):
+        """Loads the test fleet onto a new board through a cache
+
+        :param fleet_cache: FleetCache, cache to load through
+        :param file_name: str, fleet file. By default the test fleet
+        :return: list, list of Ships
+        """
+
+        return fleet_cache.load_ships(file_name or self.fleet_name,
+                                      Board(NUMBER_OF_ROWS, BOARD_COLUMNS))
+
+    def test_second_load_is_a_hit(self):
+        fleet_cache = FleetCache(self.cache_directory)
+        first_ships = self.load(fleet_cache)
+        second_ships = self.load(fleet_cache)
+
+        self.assertEqual(fleet_cache.get_statistics(),
+                         {"hits": 1, "misses": 1, "corrupt": 0})
+        self.assertEqual([a_ship.get_coordinate_list()
+                          for a_ship in second_ships],
+                         [a_ship.get_coordinate_list()
+                          for a_ship in first_ships])
+
+    def test_corrupt_entry_falls_back_to_the_text_file(self):
+        fleet_cache = FleetCache(self.cache_directory)
+        self.load(fleet_cache)
+
+        # one flipped byte in the middle of the fleet fails the checksum
+        fleet_path = self.cache_files(FLEET_SUFFIX)[0]
+        with open(fleet_path, mode="r+b") as fleet_file:
+            fleet_file.seek(os.path.getsize(fleet_path) // 2)
+            byte_value = fleet_file.read(1)
+            fleet_file.seek(-1, 1)
+            fleet_file.write(bytes([byte_value[0] ^ 0xFF]))
+
+        list_of_ships = self.load(fleet_cache)
+
+        self.assertEqual(fleet_cache.get_statistics(),
+                         {"hits": 0, "misses": 2, "corrupt": 1})
+        self.assertEqual([a_ship.get_coordinate_list()
+                          for a_ship in list_of_ships],
+                         [["A1", "A2"], ["C3"]])
+        # the entry was written again and is a hit next time
+        self.load(fleet_cache)
+        self.assertEqual(fleet_cache.get_statistics()["hits"], 1)
+
+    def test_unreadable_checksum_falls_back_to_the_text_file(self):
+        fleet_cache = FleetCache(self.cache_directory)
+        self.load(fleet_cache)
+
+        with open(self.cache_files(CHECKSUM_SUFFIX)[0], mode="w") as \
+                checksum_file:
+            checksum_file.write("not hex")
+
+        self.load(fleet_cache)
+        self.assertEqual(fleet_cache.get_statistics()["corrupt"], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        fleet_cache = FleetCache(self.cache_directory)
+        self.load(fleet_cache)
+        entry_size = os.path.getsize(self.cache_files(FLEET_SUFFIX)[0])
+
+        # room for two entries of the same size
+        fleet_cache = FleetCache(self.cache_directory, 2 * entry_size)
+        second_name = self.write_fleet("second.txt",
+                                       ["destroyer;B1;B2", "submarine;D3"])
+        third_name = self.write_fleet("third.txt",
+                                      ["destroyer;C1;C2", "submarine;E3"])
+
+        self.load(fleet_cache, second_name)
+        # the first fleet is used again, so the second one is the oldest
+        for path in self.cache_files(FLEET_SUFFIX):
+            os.utime(path, (time.time() - 100, time.time() - 100))
+        self.load(fleet_cache)
+        self.load(fleet_cache, third_name)
+
+        self.assertEqual(len(self.cache_files(FLEET_SUFFIX)), 2)
+        self.load(fleet_cache)
+        self.load(fleet_cache, third_name)
+        self.load(fleet_cache, second_name)
+        self.assertEqual(fleet_cache.get_statistics(),
+                         {"hits": 3, "misses": 3, "corrupt": 0})
+
+    def test_stale_temporary_files_are_deleted(self):
+        os.makedirs(self.cache_directory)
+        stale_path = os.path.join(self.cache_directory, "stale.tmp")
+        fresh_path = os.path.join(self.cache_directory, "fresh.tmp")
+        for path in (stale_path, fresh_path):
+            with open(path, mode="wb") as temporary_file:
+                temporary_file.write(b"half written")
+        stale_time = time.time() - STALE_FILE_AGE - 1
+        os.utime(stale_path, (stale_time, stale_time))
+
+        FleetCache(self.cache_directory)
+
+        self.assertFalse(os.path.exists(stale_path))
+        # a fresh one may belong to a write in progress
+        self.assertTrue(os.path.exists(fresh_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
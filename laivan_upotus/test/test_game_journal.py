@@ -0,0 +1,139 @@
+"""
+Tests for writing and resuming the journaled games of game_journal.
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+# the modules of the game import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from Laivanupotus_v3 import BOARD_COLUMNS, NUMBER_OF_ROWS, Board, Ship, \
+    lines_to_ship_list  # noqa: E402
+from fleet_generator import FleetGenerator  # noqa: E402
+from game_journal import resume_journal, start_journal  # noqa: E402
+
+
+class GameJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.journal_name = os.path.join(self.directory, "game")
+
+        self.game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        self.list_of_ships = FleetGenerator(seed=4).generate_ships()
+        self.game_board.place_ships(self.list_of_ships)
+
+        # the same game without a journal, to compare resumed games against
+        self.reference_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        self.reference_board.place_ships(
+            [Ship(a_ship.get_ship_type(), list(a_ship.get_coordinate_list()))
+             for a_ship in self.list_of_ships])
+
+        number_of_cells = NUMBER_OF_ROWS * len(BOARD_COLUMNS)
+        self.shot_indices = random.Random(4).sample(
+            range(0, number_of_cells), number_of_cells)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_resume_after_crash(self):
+        journal = start_journal(self.journal_name, self.game_board,
+                                self.list_of_ships, batch_size=7,
+                                snapshot_interval=13)
+        for index in self.shot_indices[:60]:
+            self.game_board.shoot_index(index)
+            self.reference_board.shoot_index(index)
+        journal.flush()
+
+        # the process dies in the middle of writing a shot
+        with open(self.journal_name + ".journal", mode="ab") as journal_file:
+            journal_file.write(b"\x01\x02")
+
+        resumed_board, resumed_ships, resumed_journal = resume_journal(
+            self.journal_name)
+
+        self.assertEqual(resumed_journal.get_number_of_shots(), 60)
+        self.assertEqual(resumed_board.get_shot_bitmap(),
+                         self.game_board.get_shot_bitmap())
+        self.assertEqual(resumed_board.get_hit_bitmap(),
+                         self.game_board.get_hit_bitmap())
+        self.assertEqual(resumed_board.get_ships_left(),
+                         self.game_board.get_ships_left())
+        self.assertEqual([a_ship.get_ship_health()
+                          for a_ship in resumed_ships],
+                         [a_ship.get_ship_health()
+                          for a_ship in self.list_of_ships])
+
+        # the resumed game goes on like the original one
+        for index in self.shot_indices[60:]:
+            self.assertEqual(resumed_board.shoot_index(index),
+                             self.reference_board.shoot_index(index))
+        resumed_journal.close()
+
+        finished_board, _, finished_journal = resume_journal(
+            self.journal_name)
+        self.assertTrue(finished_board.all_ships_sunk())
+        self.assertEqual(finished_journal.get_number_of_shots(),
+                         len(self.shot_indices))
+        finished_journal.close()
+
+    def test_snapshot_is_never_ahead_of_the_journal(self):
+        journal = start_journal(self.journal_name, self.game_board,
+                                self.list_of_ships, batch_size=64,
+                                snapshot_interval=10)
+        # the snapshot after shot 10 syncs the journal first, so resuming
+        # finds every shot the snapshot counts
+        for index in self.shot_indices[:15]:
+            self.game_board.shoot_index(index)
+
+        resumed_board, _, resumed_journal = resume_journal(self.journal_name)
+
+        self.assertEqual(resumed_journal.get_number_of_shots(), 10)
+        for index in self.shot_indices[:10]:
+            self.assertTrue(resumed_board.is_shot(
+                resumed_board.index_to_coordinate(index)))
+        resumed_journal.close()
+        journal.close()
+
+    def test_custom_columns_are_kept(self):
+        board_columns = ["X", "Y", "Z", "W"]
+        game_board = Board(3, board_columns)
+        list_of_ships = lines_to_ship_list(["destroyer;X0;Y0", "submarine;W2"],
+                                           game_board)
+        journal = start_journal(self.journal_name, game_board, list_of_ships)
+        game_board.shoot("X0")
+        journal.close()
+
+        resumed_board, resumed_ships, resumed_journal = resume_journal(
+            self.journal_name)
+
+        self.assertEqual(resumed_board.get_columns(), board_columns)
+        self.assertEqual(resumed_ships[0].get_coordinate_list(),
+                         ["X0", "Y0"])
+        self.assertEqual(resumed_board.shoot("Y0"), "SUNK")
+        resumed_journal.close()
+
+    def test_journal_shorter_than_snapshot(self):
+        journal = start_journal(self.journal_name, self.game_board,
+                                self.list_of_ships)
+        for index in self.shot_indices[:5]:
+            self.game_board.shoot_index(index)
+        journal.close()
+
+        journal_size = os.path.getsize(self.journal_name + ".journal")
+        with open(self.journal_name + ".journal", mode="r+b") as \
+                journal_file:
+            journal_file.truncate(journal_size - 8)
+
+        with self.assertRaises(ValueError):
+            resume_journal(self.journal_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for the request handling of game_server.GameSession.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# the modules of the game import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from Laivanupotus_v3 import BOARD_COLUMNS, NUMBER_OF_ROWS  # noqa: E402
+from fleet_generator import FleetGenerator  # noqa: E402
+from game_server import GameSession, load_connection, \
+    serve_connection  # noqa: E402
+
+
+class GameSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = GameSession(NUMBER_OF_ROWS, BOARD_COLUMNS,
+                                   FleetGenerator(seed=1))
+
+    def test_overlapping_fleet_is_one_error_line(self):
+        answer = self.session.handle_request(
+            "FLEET destroyer;A1;A2 cruiser;A1;A2;A3")
+
+        self.assertTrue(answer.startswith("ERROR "))
+        self.assertNotIn("\n", answer)
+        self.assertIn("A1 on lines 1, 2", answer)
+        self.assertIn("A2 on lines 1, 2", answer)
+
+    def test_fleet_coordinates_in_any_case(self):
+        self.assertEqual(self.session.handle_request(
+            "FLEET Destroyer;a1;A2 submarine;c3"), "READY 2")
+        self.assertEqual(self.session.handle_request("a1"), "HIT")
+        self.assertEqual(self.session.handle_request("a2"),
+                         "SUNK destroyer")
+        self.assertEqual(self.session.handle_request("C3"), "WON 3")
+
+    def test_shot_without_game(self):
+        self.assertEqual(self.session.handle_request("A1"),
+                         "ERROR No game going on!")
+
+
+class ServerConnectionTest(unittest.TestCase):
+
+    def test_games_over_a_connection(self):
+        closed_connections = []
+
+        async def handle_client(reader, writer):
+            await serve_connection(reader, writer, NUMBER_OF_ROWS,
+                                   BOARD_COLUMNS, FleetGenerator(seed=2))
+            # the handler only returns once the transport is closed
+            closed_connections.append(writer.transport.is_closing())
+
+        async def play():
+            server = await asyncio.start_server(handle_client, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                games_won = await load_connection(
+                    "127.0.0.1", port, None, 2,
+                    NUMBER_OF_ROWS * len(BOARD_COLUMNS), BOARD_COLUMNS, 0,
+                    [])
+                # gives the handler the time to see the connection close
+                while not closed_connections:
+                    await asyncio.sleep(0.01)
+            return games_won
+
+        self.assertEqual(asyncio.run(play()), 2)
+        self.assertEqual(closed_connections, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
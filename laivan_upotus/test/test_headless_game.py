@@ -0,0 +1,111 @@
+"""
+Tests that headless_game.HeadlessGame gives the same results as Board.shoot.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# the modules of the game import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from Laivanupotus_v3 import BOARD_COLUMNS, NUMBER_OF_ROWS, Board, \
+    Ship  # noqa: E402
+from fleet_generator import FleetGenerator  # noqa: E402
+from headless_game import RESULT_NAMES, HeadlessGame, \
+    shots_to_win  # noqa: E402
+
+
+def make_fleet(fleet_description):
+    """Makes new Ships, so every board gets ships with full health
+
+    :param fleet_description: list, (ship type, list of coordinates) pairs
+    :return: list, list of Ships
+    """
+
+    return [Ship(ship_type, list(list_of_coordinates))
+            for ship_type, list_of_coordinates in fleet_description]
+
+
+class HeadlessGameTest(unittest.TestCase):
+
+    def assert_same_as_board(self, fleet_description, shot_indices):
+        """Plays the shots on a Board and on a HeadlessGame and compares
+        every result and the ships left after the game
+
+        :param fleet_description: list, (ship type, list of coordinates)
+        pairs
+        :param shot_indices: list, cell indices to shoot
+        :return:
+        """
+
+        game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        game_board.place_ships(make_fleet(fleet_description))
+        board_results = [game_board.shoot_index(index)
+                         for index in shot_indices]
+
+        headless_game = HeadlessGame(Board(NUMBER_OF_ROWS, BOARD_COLUMNS),
+                                     make_fleet(fleet_description))
+        results, _ = headless_game.replay(shot_indices)
+
+        self.assertEqual([RESULT_NAMES[result] for result in results],
+                         board_results)
+        self.assertEqual(headless_game.get_ships_left(),
+                         game_board.get_ships_left())
+
+    def test_ship_longer_than_its_health(self):
+        game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        # a destroyer has 2 health, so it sinks before all 3 cells are hit
+        fleet_description = [("destroyer", ["A1", "A2", "A3"]),
+                             ("submarine", ["C3"])]
+        shot_indices = [game_board.coordinate_to_index(coordinate)
+                        for coordinate in ["A1", "A2", "A3", "C3", "A1"]]
+
+        self.assert_same_as_board(fleet_description, shot_indices)
+
+    def test_ship_with_repeated_coordinates(self):
+        game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        # a cruiser has 3 health but only 2 different cells, so it never
+        # sinks
+        fleet_description = [("cruiser", ["B1", "B2", "B2"]),
+                             ("destroyer", ["D4", "E4"])]
+        shot_indices = [game_board.coordinate_to_index(coordinate)
+                        for coordinate in ["B1", "B2", "D4", "E4", "B2"]]
+
+        self.assert_same_as_board(fleet_description, shot_indices)
+
+    def test_generated_fleets(self):
+        fleet_generator = FleetGenerator(seed=3)
+        random_generator = random.Random(3)
+        number_of_cells = NUMBER_OF_ROWS * len(BOARD_COLUMNS)
+
+        for _ in range(0, 20):
+            list_of_ships = fleet_generator.generate_ships()
+            fleet_description = [(a_ship.get_ship_type(),
+                                  a_ship.get_coordinate_list())
+                                 for a_ship in list_of_ships]
+            # shots in a random order, some of them twice
+            shot_indices = random_generator.sample(range(0, number_of_cells),
+                                                   number_of_cells)
+            shot_indices += shot_indices[:10]
+
+            self.assert_same_as_board(fleet_description, shot_indices)
+
+    def test_shots_to_win(self):
+        game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        fleet_description = [("destroyer", ["A1", "A2", "A3"])]
+        shot_indices = [game_board.coordinate_to_index(coordinate)
+                        for coordinate in ["J9", "A1", "A2", "A3"]]
+
+        headless_game = HeadlessGame(game_board,
+                                     make_fleet(fleet_description))
+        results, _ = headless_game.replay(shot_indices)
+
+        self.assertEqual(shots_to_win(results, 1), 3)
+        self.assertTrue(headless_game.is_won())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Tests optimal_solver.OptimalSolver against a brute force search.
+"""
+
+import os
+import sys
+import unittest
+from functools import lru_cache
+
+# the modules of the game import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from Laivanupotus_v3 import SHIP_TYPES, Board, Ship, \
+    column_names  # noqa: E402
+from optimal_solver import OptimalPlayer, OptimalSolver  # noqa: E402
+
+
+def list_layouts(number_of_rows, number_of_columns, fleet_composition):
+    """Lists every layout of a fleet of different ship types by trying every
+    position and direction of every ship
+
+    :param number_of_rows: int, height of the board
+    :param number_of_columns: int, width of the board
+    :param fleet_composition: list, ship types, each type once
+    :return: list, layouts as tuples of (ship type, frozenset of cells)
+    """
+
+    placements = {}
+    for ship_type in fleet_composition:
+        ship_length = SHIP_TYPES[ship_type]
+        ship_placements = set()
+        for row_number in range(0, number_of_rows):
+            for column_number in range(0, number_of_columns):
+                for row_step, column_step in ((0, 1), (1, 0)):
+                    cells = [(row_number + row_step * part,
+                              column_number + column_step * part)
+                             for part in range(0, ship_length)]
+                    if all(row < number_of_rows and column < number_of_columns
+                           for row, column in cells):
+                        ship_placements.add(frozenset(
+                            row * number_of_columns + column
+                            for row, column in cells))
+        placements[ship_type] = ship_placements
+
+    layouts = [()]
+    for ship_type in fleet_composition:
+        layouts = [layout + ((ship_type, ship_cells),)
+                   for layout in layouts
+                   for ship_cells in placements[ship_type]
+                   if all(ship_cells.isdisjoint(other_cells)
+                          for _, other_cells in layout)]
+
+    return layouts
+
+
+def brute_force_expected(number_of_cells, layouts):
+    """Works out the smallest expected number of shots to sink a fleet by
+    trying every cell in every state, without any of the solver's shortcuts
+
+    :param number_of_cells: int, number of cells on the board
+    :param layouts: list, layouts from list_layouts, all equally likely
+    :return: float, expected shots with the best play
+    """
+
+    @lru_cache(maxsize=None)
+    def expected(candidates, shot_cells):
+        # every candidate has the same ships sunk, so any tells if the game
+        # is over
+        if all(ship_cells <= shot_cells for _, ship_cells in candidates[0]):
+            return 0.0
+
+        best_expected = None
+        for cell in range(0, number_of_cells):
+            if cell in shot_cells:
+                continue
+
+            outcomes = {}
+            for layout in candidates:
+                outcome = "miss"
+                for ship_type, ship_cells in layout:
+                    if cell in ship_cells:
+                        outcome = "hit"
+                        if ship_cells <= shot_cells | {cell}:
+                            outcome = (ship_type, ship_cells)
+                outcomes.setdefault(outcome, []).append(layout)
+
+            cell_expected = 1.0 + sum(
+                len(outcome_layouts) / len(candidates) *
+                expected(tuple(outcome_layouts), shot_cells | {cell})
+                for outcome_layouts in outcomes.values())
+            if best_expected is None or cell_expected < best_expected:
+                best_expected = cell_expected
+
+        return best_expected
+
+    return expected(tuple(layouts), frozenset())
+
+
+class OptimalSolverTest(unittest.TestCase):
+
+    def assert_same_as_brute_force(self, number_of_rows, number_of_columns,
+                                   fleet_composition):
+        """Checks the layouts and the expected shots of the solver
+
+        :param number_of_rows: int, height of the board
+        :param number_of_columns: int, width of the board
+        :param fleet_composition: list, ship types, each type once
+        :return:
+        """
+
+        layouts = list_layouts(number_of_rows, number_of_columns,
+                               fleet_composition)
+        solver = OptimalSolver(number_of_rows,
+                               column_names(number_of_columns),
+                               fleet_composition)
+
+        self.assertEqual(solver.get_number_of_fleets(), len(layouts))
+        self.assertAlmostEqual(
+            solver.solve()[0],
+            brute_force_expected(number_of_rows * number_of_columns,
+                                 layouts))
+
+    def test_one_ship(self):
+        self.assert_same_as_brute_force(3, 3, ["destroyer"])
+
+    def test_two_ships(self):
+        self.assert_same_as_brute_force(2, 3, ["destroyer", "submarine"])
+
+    def test_non_square_board(self):
+        self.assert_same_as_brute_force(2, 4, ["cruiser", "submarine"])
+
+    def test_board_too_large(self):
+        with self.assertRaises(ValueError):
+            OptimalSolver(7, column_names(7), ["submarine"])
+
+    def test_player_wins(self):
+        game_board = Board(3, column_names(3))
+        game_board.place_ships([Ship("destroyer", ["B1", "B2"])])
+        optimal_player = OptimalPlayer(game_board, ["destroyer"])
+
+        for _ in range(0, 9):
+            if game_board.all_ships_sunk():
+                break
+            game_board.shoot_index(optimal_player.choose_index())
+
+        self.assertTrue(game_board.all_ships_sunk())
+        self.assertIsNone(optimal_player.choose_index())
+
+
+if __name__ == "__main__":
+    unittest.main()
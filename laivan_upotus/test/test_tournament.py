@@ -0,0 +1,45 @@
+"""
+Tests for tournament.run_tournament and tournament.rank.
+"""
+
+import os
+import sys
+import unittest
+
+# the modules of the game import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from Laivanupotus_v3 import BOARD_COLUMNS, NUMBER_OF_ROWS, \
+    Board  # noqa: E402
+from fleet import ships_to_fleet  # noqa: E402
+from fleet_generator import FleetGenerator  # noqa: E402
+from tournament import rank, run_tournament  # noqa: E402
+
+
+class TournamentTest(unittest.TestCase):
+
+    def setUp(self):
+        game_board = Board(NUMBER_OF_ROWS, BOARD_COLUMNS)
+        self.fleets = [ships_to_fleet(
+            FleetGenerator(seed=seed).generate_ships(), game_board)
+            for seed in range(0, 2)]
+
+    def test_no_games_is_an_error(self):
+        with self.assertRaises(ValueError):
+            run_tournament(self.fleets, ["random"], 0, number_of_workers=1)
+
+    def test_every_match_is_played_and_ranked(self):
+        results = run_tournament(self.fleets, ["random"], 3,
+                                 number_of_workers=1)
+        fleet_ranking, strategy_ranking, matches = rank(
+            results, ["first", "second"], ["random"])
+
+        self.assertEqual(len(matches), 2)
+        self.assertEqual(sorted(name for name, _ in fleet_ranking),
+                         ["first", "second"])
+        self.assertEqual(strategy_ranking[0][1]["games"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
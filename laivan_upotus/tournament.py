@@ -0,0 +1,274 @@
+"""
+Tournament of fleet layouts against shooting strategies. Every fleet file in
+a directory plays a number of games against every strategy of the
+simulation, and the results are ranked: fleets by how long they survive,
+strategies by how fast they win.
+
+The fleet files are parsed once with lines_to_ship_list, or loaded from a
+fleet cache when --cache is given, and packed into compact Fleets. The
+Fleets are handed to each worker process once when it starts, and every game
+plays a copy, so the shared Fleets are only read.
+
+Usage: python tournament.py <fleet directory> [--games 1000]
+       [--strategy random probability] [--cache .fleet_cache]
+"""
+
+import argparse
+import os
+import random
+from collections import Counter
+from multiprocessing import Pool
+
+from Laivanupotus_v3 import NUMBER_OF_ROWS, BOARD_COLUMNS, Board, \
+    column_names, load_ships_from_file
+from fleet import place_fleet, ships_to_fleet
+from fleet_cache import FleetCache
+from simulation import GAMES_PER_CHUNK, STRATEGIES, summarize
+from targeting_ai import play_game
+
+# fleets and board height of the tournament in the worker processes, set by
+# initialize_worker
+TOURNAMENT_FLEETS = []
+TOURNAMENT_ROWS = NUMBER_OF_ROWS
+
+
+def initialize_worker(fleets, number_of_rows):
+    """Stores the fleets of the tournament in a worker process. Run once per
+    worker when the pool starts
+
+    :param fleets: list, Fleets of the tournament
+    :param number_of_rows: int, height of the board
+    :return:
+    """
+
+    global TOURNAMENT_FLEETS, TOURNAMENT_ROWS
+
+    TOURNAMENT_FLEETS = fleets
+    TOURNAMENT_ROWS = number_of_rows
+
+
+def play_matches(task):
+    """Plays one chunk of games of a fleet against a strategy. Run by the
+    worker processes
+
+    :param task: tuple, (fleet number, strategy name, chunk number, number of
+    games, base seed)
+    :return: tuple, (fleet number, strategy name, Counter of shots-to-win)
+    """
+
+    fleet_number, strategy_name, chunk_number, number_of_games, base_seed = \
+        task
+
+    shared_fleet = TOURNAMENT_FLEETS[fleet_number]
+    board_columns = shared_fleet.get_board_columns()
+    strategy = STRATEGIES[strategy_name]
+    fleet_composition = [shared_fleet.get_ship_type(ship_number)
+                         for ship_number
+                         in range(0, shared_fleet.get_number_of_ships())]
+
+    # seeded from the match and chunk, so the results don't depend on which
+    # worker plays them
+    random_generator = random.Random(f"{base_seed}-{fleet_number}-"
+                                     f"{strategy_name}-{chunk_number}")
+    shots_to_win = Counter()
+
+    for _ in range(0, number_of_games):
+        game_board = Board(TOURNAMENT_ROWS, board_columns)
+        place_fleet(shared_fleet.copy(), game_board)
+        player = strategy(game_board, fleet_composition,
+                          seed=random_generator.getrandbits(32))
+
+        shots_to_win[play_game(game_board, player)] += 1
+
+    return fleet_number, strategy_name, shots_to_win
+
+
+def load_fleet_directory(directory_name, number_of_rows, board_columns,
+                         fleet_cache=None):
+    """Parses every fleet file in a directory
+
+    :param directory_name: str, name of the directory
+    :param number_of_rows: int, height of the board
+    :param board_columns: list, column names of the board
+    :param fleet_cache: FleetCache, cache to load the files through. By
+    default every file is parsed
+    :return: tuple, (list of file names, list of Fleets)
+    :raises: OSError, if the directory or a file can't be read
+    :raises: ValueError, if a file has an error in its ships or there are no
+    fleet files
+    """
+
+    file_names = []
+    fleets = []
+
+    for file_name in sorted(os.listdir(directory_name)):
+        path = os.path.join(directory_name, file_name)
+        if not os.path.isfile(path):
+            continue
+
+        game_board = Board(number_of_rows, board_columns)
+        if fleet_cache is None:
+            list_of_ships = load_ships_from_file(path, game_board)
+        else:
+            list_of_ships = fleet_cache.load_ships(path, game_board)
+        file_names.append(file_name)
+        fleets.append(ships_to_fleet(list_of_ships, game_board))
+
+    if not fleets:
+        raise ValueError(f"{directory_name}: No fleet files!")
+
+    return file_names, fleets
+
+
+def run_tournament(fleets, strategy_names, number_of_games,
+                   number_of_rows=NUMBER_OF_ROWS, seed=0,
+                   number_of_workers=None, games_per_chunk=GAMES_PER_CHUNK):
+    """Plays every fleet against every strategy across a process pool
+
+    :param fleets: list, Fleets to play against
+    :param strategy_names: list, names of strategies in STRATEGIES
+    :param number_of_games: int, games per fleet and strategy
+    :param number_of_rows: int, height of the board
+    :param seed: int, base seed of the tournament
+    :param number_of_workers: int, number of processes. By default one per
+    core, and 1 plays every game in this process
+    :param games_per_chunk: int, games a worker plays per task
+    :return: dict, (fleet number, strategy name) mapped to Counters of
+    shots-to-win
+    :raises: ValueError, if there are no games or a strategy is unknown
+    """
+
+    if number_of_games < 1:
+        raise ValueError("Needs at least one game!")
+
+    for strategy_name in strategy_names:
+        if strategy_name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy_name}!")
+
+    tasks = []
+    for fleet_number in range(0, len(fleets)):
+        for strategy_name in strategy_names:
+            for chunk_number, first_game in enumerate(
+                    range(0, number_of_games, games_per_chunk)):
+                tasks.append((fleet_number, strategy_name, chunk_number,
+                              min(games_per_chunk,
+                                  number_of_games - first_game), seed))
+
+    results = {(fleet_number, strategy_name): Counter()
+               for fleet_number in range(0, len(fleets))
+               for strategy_name in strategy_names}
+
+    if number_of_workers == 1:
+        initialize_worker(fleets, number_of_rows)
+        for fleet_number, strategy_name, shots_to_win in map(play_matches,
+                                                             tasks):
+            results[(fleet_number, strategy_name)].update(shots_to_win)
+    else:
+        # the fleets go to each worker once instead of with every task
+        with Pool(number_of_workers, initializer=initialize_worker,
+                  initargs=(fleets, number_of_rows)) as worker_pool:
+            for fleet_number, strategy_name, shots_to_win in \
+                    worker_pool.imap_unordered(play_matches, tasks):
+                results[(fleet_number, strategy_name)].update(shots_to_win)
+
+    return results
+
+
+def rank(results, fleet_names, strategy_names):
+    """Ranks the fleets and strategies of a tournament
+
+    :param results: dict, results from run_tournament
+    :param fleet_names: list, names of the fleets by fleet number
+    :param strategy_names: list, names of the strategies
+    :return: tuple, (list of (fleet name, summary) with the fleet that took
+    the most shots first, list of (strategy name, summary) with the strategy
+    that took the fewest shots first, list of ((fleet name, strategy name),
+    summary) with the hardest match first)
+    """
+
+    fleet_totals = [Counter() for _ in fleet_names]
+    strategy_totals = {strategy_name: Counter()
+                       for strategy_name in strategy_names}
+    matches = []
+
+    for (fleet_number, strategy_name), shots_to_win in results.items():
+        fleet_totals[fleet_number].update(shots_to_win)
+        strategy_totals[strategy_name].update(shots_to_win)
+        matches.append(((fleet_names[fleet_number], strategy_name),
+                        summarize(shots_to_win)))
+
+    fleet_ranking = sorted(
+        ((fleet_name, summarize(shots_to_win)) for fleet_name, shots_to_win
+         in zip(fleet_names, fleet_totals)),
+        key=lambda ranked: -ranked[1]["mean"])
+    strategy_ranking = sorted(
+        ((strategy_name, summarize(shots_to_win)) for strategy_name,
+         shots_to_win in strategy_totals.items()),
+        key=lambda ranked: ranked[1]["mean"])
+    matches.sort(key=lambda ranked: -ranked[1]["mean"])
+
+    return fleet_ranking, strategy_ranking, matches
+
+
+def print_ranking(title, ranking):
+    """Prints a ranked table of summaries
+
+    :param title: str, heading of the first column
+    :param ranking: list, (name, summary) pairs in ranked order
+    :return:
+    """
+
+    lines = [f"{'#':>3} {title:<30}{'games':>8}{'mean':>8}{'median':>8}"
+             f"{'p90':>6}{'p99':>6}{'max':>6}"]
+    for place, (name, summary) in enumerate(ranking, start=1):
+        lines.append(f"{place:>3} {name:<30}{summary['games']:>8}"
+                     f"{summary['mean']:>8.2f}{summary['median']:>8}"
+                     f"{summary['p90']:>6}{summary['p99']:>6}"
+                     f"{summary['max']:>6}")
+
+    print("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tournament of Laivanupotus fleets and strategies")
+    parser.add_argument("directory", help="directory of fleet files")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games per fleet and strategy")
+    parser.add_argument("--strategy", nargs="+", default=sorted(STRATEGIES),
+                        choices=sorted(STRATEGIES), help="strategies to run")
+    parser.add_argument("--rows", type=int, default=NUMBER_OF_ROWS)
+    parser.add_argument("--columns", type=int, default=len(BOARD_COLUMNS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=None,
+                        help="directory of a fleet cache to load through")
+    arguments = parser.parse_args()
+
+    fleet_cache = None
+    if arguments.cache is not None:
+        fleet_cache = FleetCache(arguments.cache)
+
+    try:
+        fleet_names, fleets = load_fleet_directory(
+            arguments.directory, arguments.rows,
+            column_names(arguments.columns), fleet_cache)
+        results = run_tournament(fleets, arguments.strategy, arguments.games,
+                                 arguments.rows, arguments.seed,
+                                 arguments.workers)
+    except (OSError, ValueError) as error_message:
+        print(error_message)
+        return
+
+    fleet_ranking, strategy_ranking, matches = rank(
+        results, fleet_names, arguments.strategy)
+
+    print_ranking("fleet", fleet_ranking)
+    print_ranking("strategy", strategy_ranking)
+    print_ranking("fleet vs strategy",
+                  [(f"{fleet_name} vs {strategy_name}", summary)
+                   for (fleet_name, strategy_name), summary in matches])
+
+
+if __name__ == "__main__":
+    main()